@@ -12,5 +12,13 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'TaskManager.settings')
+# Django runs the sync code of each request in a thread of its own, so a connection kept open
+# after a request is never reused. Return them instead: closed, or to the pool on PostgreSQL.
+os.environ.setdefault('DATABASE_CONN_MAX_AGE', '0')
+os.environ.setdefault('DATABASE_POOL_SIZE', '8')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from taskapp.events import EventStreamApplication  # noqa: E402 (needs the app registry)
+
+application = EventStreamApplication(django_application)
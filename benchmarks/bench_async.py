@@ -0,0 +1,133 @@
+"""
+Compares the throughput of the sync task views with their async variants under concurrent clients.
+
+Serves the app from this process three ways: the sync views through a threaded WSGI server
+(as `runserver` does), the sync views through uvicorn, and the async views (`/async/...`)
+through uvicorn. A child process then keeps `concurrency` requests in flight for `duration`
+seconds against each and reports requests per second and latency percentiles.
+
+Usage:
+    python benchmarks/bench_async.py [tasks] [duration] [concurrency ...]
+"""
+import asyncio
+import logging
+import multiprocessing
+import statistics
+import sys
+import threading
+import time
+
+from common import create_tasks, create_user, print_table, test_database
+
+import uvicorn
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.test import Client
+
+from taskapp.models import Task
+
+HOST = '127.0.0.1'
+WSGI_PORT = 8766
+ASGI_PORT = 8767
+
+ENDPOINTS = [
+    ('status page', 'tasks/in_progress/?priority=HI&page_size=20'),
+    ('detail', 'tasks/{pk}/'),
+]
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def start_wsgi():
+    server = ThreadedWSGIServer((HOST, WSGI_PORT), QuietRequestHandler)
+    server.set_app(WSGIHandler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.shutdown
+
+
+def start_asgi():
+    server = uvicorn.Server(uvicorn.Config(
+        'TaskManager.asgi:application', host=HOST, port=ASGI_PORT, log_level='warning', lifespan='off',
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+        thread.join()
+    return stop
+
+
+async def fetch(port, path, cookie):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write((
+        f'GET /{path} HTTP/1.1\r\nHost: {HOST}\r\nCookie: sessionid={cookie}\r\nConnection: close\r\n\r\n'
+    ).encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    if not response.startswith(b'HTTP/1.1 200'):
+        raise RuntimeError(response[:200])
+
+
+async def load(port, path, cookie, concurrency, duration):
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await fetch(port, path, cookie)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies
+
+
+def client_process(pipe, cookie):
+    while (job := pipe.recv()) is not None:
+        pipe.send(asyncio.run(load(*job[:2], cookie, *job[2:])))
+
+
+def main(tasks, duration, concurrencies):
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    rows = []
+    with test_database():
+        user = create_user('bench')
+        create_tasks(user, tasks)
+        pk = Task.objects.filter(assigned_to=user).values_list('pk', flat=True).first()
+        client = Client()
+        client.force_login(user)
+
+        stops = [start_wsgi(), start_asgi()]
+        parent, child = multiprocessing.Pipe()
+        clients = multiprocessing.Process(target=client_process, args=(child, client.cookies['sessionid'].value))
+        clients.start()
+
+        modes = [('wsgi', WSGI_PORT, ''), ('asgi', ASGI_PORT, ''), ('asgi async', ASGI_PORT, 'async/')]
+        for name, path in ENDPOINTS:
+            for concurrency in concurrencies:
+                for mode, port, prefix in modes:
+                    parent.send((port, prefix + path.format(pk=pk), concurrency, duration))
+                    latencies = sorted(parent.recv())
+                    rows.append((
+                        name, concurrency, mode, f'{len(latencies) / duration:.0f}',
+                        f'{statistics.median(latencies) * 1000:.1f}',
+                        f'{latencies[int(len(latencies) * 0.95)] * 1000:.1f}',
+                    ))
+        parent.send(None)
+        clients.join()
+        for stop in stops:
+            stop()
+
+    print_table(('endpoint', 'clients', 'server', 'req/s', 'p50 ms', 'p95 ms'), rows)
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 10_000, args[1] if len(args) > 1 else 5, args[2:] or [1, 16, 64])
@@ -0,0 +1,55 @@
+"""
+Measures the queries and time that cached sessions and users save on each authenticated request.
+
+Runs the same requests with database sessions and uncached users, then with `cached_db`
+sessions and `TASKAPP_USER_CACHE_TIMEOUT`, after one warm-up request each.
+
+Usage:
+    python benchmarks/bench_auth.py [tasks] [repeat]
+"""
+import sys
+
+from common import create_tasks, create_user, measure, print_table, test_database
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from taskapp.models import Task
+
+CONFIGURATIONS = [
+    ('db session, user query', {'SESSION_ENGINE': 'django.contrib.sessions.backends.db', 'TASKAPP_USER_CACHE_TIMEOUT': 0}),
+    ('cached_db session, cached user', {'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db', 'TASKAPP_USER_CACHE_TIMEOUT': 60}),
+]
+
+
+def main(tasks, repeat):
+    rows = []
+    with test_database():
+        user = create_user('bench')
+        create_tasks(user, tasks)
+        pk = Task.objects.filter(assigned_to=user).values_list('pk', flat=True).first()
+        endpoints = [
+            ('detail', reverse('task-detail', args=[pk])),
+            ('status page', reverse('inprogress-tasks') + '?page_size=20'),
+            ('board (cached)', reverse('task-board')),
+            ('stats', reverse('task-stats')),
+        ]
+        for name, url in endpoints:
+            for configuration, overrides in CONFIGURATIONS:
+                with override_settings(**overrides):
+                    cache.clear()
+                    client = Client()
+                    client.force_login(user)
+                    client.get(url)
+                    with CaptureQueriesContext(connection) as queries:
+                        client.get(url)
+                    rows.append((name, configuration, len(queries), f'{measure(lambda: client.get(url), repeat) * 1000:.2f}'))
+    print_table(('endpoint', 'auth', 'queries', 'ms'), rows)
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 1000, args[1] if len(args) > 1 else 200)
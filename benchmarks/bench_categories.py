@@ -0,0 +1,46 @@
+"""
+Compares filling the category filter from a download of every task with the `/categories/`
+autocomplete endpoint.
+
+Usage:
+    python benchmarks/bench_categories.py [tasks ...]
+"""
+import sys
+
+from common import create_tasks, create_user, measure, print_table, test_database
+
+from django.test import Client
+from django.urls import reverse
+
+
+def categories_from_tasks(client):
+    response = client.get(reverse('task-list'))
+    return len(response.content), sorted({task['category'] for task in response.json()}, key=str.casefold)
+
+
+def categories_from_endpoint(client, prefix=''):
+    response = client.get(reverse('category-list'), {'prefix': prefix})
+    return len(response.content), response.json()
+
+
+def main(sizes):
+    rows = []
+    with test_database():
+        for size in sizes:
+            user = create_user(f'bench{size}')
+            create_tasks(user, size)
+            client = Client()
+            client.force_login(user)
+            assert categories_from_tasks(client)[1] == categories_from_endpoint(client)[1]
+            for name, func in [
+                ('task download', lambda: categories_from_tasks(client)),
+                ('/categories/', lambda: categories_from_endpoint(client)),
+                ('/categories/?prefix=he', lambda: categories_from_endpoint(client, 'he')),
+            ]:
+                length = func()[0]
+                rows.append((size, name, f'{length / 1024:.1f}', f'{measure(func) * 1000:.1f}'))
+    print_table(('tasks', 'source', 'body KB', 'ms'), rows)
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or [1_000, 10_000, 100_000])
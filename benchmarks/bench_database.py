@@ -0,0 +1,135 @@
+"""
+Compares the requests per second of the database configurations under the board traffic of
+`load_driver.py`.
+
+Each configuration is served from a database seeded with `seed_tasks`, and driven by
+`load_driver.py` for `duration` seconds with `clients` concurrent users. It is served under WSGI
+by gunicorn (2 workers of 8 threads), and under ASGI as deployed, by gunicorn with 2
+`UvicornWorker`s:
+
+* WSGI on SQLite with the stock Django backend, opening a connection per request, then keeping
+  it (`DATABASE_CONN_MAX_AGE`), then with the `taskapp.db.sqlite3` backend.
+* ASGI on SQLite, keeping connections, then with the defaults of `TaskManager/asgi.py` (a
+  connection per request).
+* With a PostgreSQL URL (pointing at an empty database, or one seeded by an earlier run): under
+  WSGI a connection per request, persistent connections, and the pool of
+  `taskapp.db.postgresql`; under ASGI persistent connections and the default pool.
+
+Usage:
+    python benchmarks/bench_database.py [duration] [clients] [postgres-url]
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import print_table
+
+ROOT = Path(__file__).resolve().parent.parent
+HOST = '127.0.0.1'
+PORT = 8768
+USERS = 20
+TASKS = 300
+SERVERS = {
+    'wsgi': ['TaskManager.wsgi', '--workers', '2', '--threads', '8'],
+    'asgi': ['TaskManager.asgi:application', '--workers', '2', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+}
+
+# Swaps the backends of taskapp/db/ for the Django ones they extend.
+STOCK_SETTINGS = """
+from TaskManager.settings import *
+DATABASES['default']['ENGINE'] = DATABASES['default']['ENGINE'].replace('taskapp.db.', 'django.db.backends.')
+DATABASES['default'].get('OPTIONS', {}).pop('pool', None)
+"""
+
+
+def environment(directory, url, stock=False, **variables):
+    env = {**os.environ, 'DATABASE_URL': url, **variables}
+    if stock:
+        env.update(PYTHONPATH=directory, DJANGO_SETTINGS_MODULE='stock_settings')
+    return env
+
+
+def manage(env, *args):
+    return subprocess.run([sys.executable, 'manage.py', *args], cwd=ROOT, env=env, capture_output=True, text=True)
+
+
+def prepare(directory, url):
+    env = environment(directory, url)
+    manage(env, 'migrate', '--verbosity', '0').check_returncode()
+    seeded = manage(env, 'seed_tasks', '--users', str(USERS), '--tasks', str(TASKS), '--prefix', 'benchdb')
+    if seeded.returncode and 'already exist' not in seeded.stderr:
+        seeded.check_returncode()
+
+
+def wait_for_port():
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, PORT), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("gunicorn did not start.")
+
+
+def run(directory, server, env, duration, clients):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', *SERVERS[server], '--bind', f'{HOST}:{PORT}', '--log-level', 'warning'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port()
+        output = os.path.join(directory, 'results.json')
+        subprocess.run(
+            [sys.executable, 'benchmarks/load_driver.py', '--url', f'http://{HOST}:{PORT}', '--prefix', 'benchdb',
+             '--clients', str(clients), '--duration', str(duration), '--output', output],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, check=True,
+        )
+        with open(output) as results:
+            return json.load(results)['endpoints']['total']
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(duration, clients, postgres_url):
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, 'stock_settings.py'), 'w') as settings:
+            settings.write(STOCK_SETTINGS)
+        sqlite_url = f'sqlite:///{directory}/bench.sqlite3'
+        modes = [
+            ('sqlite', 'wsgi', 'connection per request', sqlite_url, {'stock': True, 'DATABASE_CONN_MAX_AGE': '0'}),
+            ('sqlite', 'wsgi', 'persistent', sqlite_url, {'stock': True, 'DATABASE_CONN_MAX_AGE': '60'}),
+            ('sqlite', 'wsgi', 'persistent, WAL + BEGIN IMMEDIATE', sqlite_url, {'DATABASE_CONN_MAX_AGE': '60'}),
+            ('sqlite', 'asgi', 'persistent, WAL + BEGIN IMMEDIATE', sqlite_url, {'DATABASE_CONN_MAX_AGE': '60'}),
+            ('sqlite', 'asgi', 'connection per request (default)', sqlite_url, {}),
+        ]
+        prepare(directory, sqlite_url)
+        if postgres_url:
+            modes += [
+                ('postgresql', 'wsgi', 'connection per request', postgres_url, {'DATABASE_CONN_MAX_AGE': '0'}),
+                ('postgresql', 'wsgi', 'persistent', postgres_url, {'DATABASE_CONN_MAX_AGE': '60'}),
+                ('postgresql', 'wsgi', 'pool of 8 per worker', postgres_url, {'DATABASE_POOL_SIZE': '8'}),
+                ('postgresql', 'asgi', 'persistent', postgres_url, {'DATABASE_CONN_MAX_AGE': '60', 'DATABASE_POOL_SIZE': '0'}),
+                ('postgresql', 'asgi', 'pool of 8 per worker (default)', postgres_url, {}),
+            ]
+            prepare(directory, postgres_url)
+
+        rows = []
+        for database, server, mode, url, variables in modes:
+            total = run(directory, server, environment(directory, url, **variables), duration, clients)
+            rows.append((
+                database, server, mode, f"{total['throughput']:.0f}", total['p50_ms'], total['p95_ms'],
+                f"{total['errors'] / total['requests'] * 100:.1f}%",
+            ))
+    print_table(('database', 'server', 'connections', 'req/s', 'p50 ms', 'p95 ms', 'errors'), rows)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 20, int(args[1]) if len(args) > 1 else 16, args[2] if len(args) > 2 else None)
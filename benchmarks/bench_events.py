@@ -0,0 +1,121 @@
+"""
+Measures the memory an ASGI server needs to hold idle live board streams.
+
+Starts uvicorn with `TaskManager.asgi` in this process, then opens event streams from a child
+process in steps and reports the server's resident memory and thread count after each step.
+The threads column should stay flat: idle streams wait on the event loop, not in a worker.
+Finally one event is published to every stream and the time until all of them received it is
+reported.
+
+Usage:
+    python benchmarks/bench_events.py [connections per step] [steps] [users]
+"""
+import asyncio
+import multiprocessing
+import resource
+import sys
+import threading
+import time
+
+from common import create_user, print_table, test_database
+
+import uvicorn
+from django.test import Client
+
+from taskapp.events import get_broker
+
+HOST = '127.0.0.1'
+PORT = 8765
+
+
+def process_status():
+    with open('/proc/self/status') as status:
+        fields = dict(line.split(':', 1) for line in status)
+    return int(fields['VmRSS'].split()[0]) / 1024, int(fields['Threads'])
+
+
+def raise_file_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def open_stream(cookie):
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    writer.write((
+        f'GET /tasks/events/ HTTP/1.1\r\nHost: {HOST}\r\nCookie: sessionid={cookie}\r\n'
+        'Accept: text/event-stream\r\n\r\n'
+    ).encode())
+    await writer.drain()
+    await reader.readuntil(b'retry: 5000\n\n')
+    return reader, writer
+
+
+async def run_clients(pipe, cookies, per_step, steps):
+    streams = []
+    for step in range(steps):
+        for start in range(0, per_step, 200):
+            batch = range(len(streams), len(streams) + min(200, per_step - start))
+            streams += await asyncio.gather(*(open_stream(cookies[i % len(cookies)]) for i in batch))
+        pipe.send(len(streams))
+        pipe.recv()
+
+    # Wait for the event published by the parent on every stream.
+    start = time.perf_counter()
+    await asyncio.gather(*(reader.readuntil(b'event: reset\n') for reader, _ in streams))
+    pipe.send(time.perf_counter() - start)
+    for _, writer in streams:
+        writer.close()
+
+
+def client_process(pipe, cookies, per_step, steps):
+    raise_file_limit()
+    asyncio.run(run_clients(pipe, cookies, per_step, steps))
+
+
+def main(per_step, steps, users):
+    raise_file_limit()
+    with test_database():
+        cookies, user_ids = [], []
+        for i in range(users):
+            user = create_user(f'bench{i}')
+            client = Client()
+            client.force_login(user)
+            cookies.append(client.cookies['sessionid'].value)
+            user_ids.append(user.pk)
+
+        server = uvicorn.Server(uvicorn.Config(
+            'TaskManager.asgi:application', host=HOST, port=PORT, log_level='warning', lifespan='off',
+            backlog=4096,
+        ))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+
+        parent, child = multiprocessing.Pipe()
+        clients = multiprocessing.Process(target=client_process, args=(child, cookies, per_step, steps))
+        clients.start()
+
+        base_rss, base_threads = process_status()
+        rows = [(0, f'{base_rss:.1f}', '-', base_threads)]
+        for _ in range(steps):
+            connections = parent.recv()
+            rss, threads = process_status()
+            rows.append((connections, f'{rss:.1f}', f'{(rss - base_rss) * 1024 / connections:.1f}', threads))
+            parent.send('next')
+
+        broker = get_broker()
+        for user_id in user_ids:
+            broker.publish(user_id, 'reset', {})
+        fan_out = parent.recv()
+        clients.join()
+        server.should_exit = True
+        thread.join()
+
+    print_table(('connections', 'rss MB', 'KB/conn', 'threads'), rows)
+    print(f'Delivered one event to {per_step * steps} streams in {fan_out * 1000:.1f} ms.')
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [1000, 5, 100][len(args):]))
@@ -0,0 +1,52 @@
+"""
+Compares the peak memory of downloading every task through the list endpoint and through the
+streaming export.
+
+Peak Python allocations are traced with tracemalloc while each response is produced and
+consumed chunk by chunk, the way a WSGI server sends it.
+
+Usage:
+    python benchmarks/bench_export.py [tasks ...]
+"""
+import sys
+import time
+import tracemalloc
+
+from common import create_tasks, create_user, print_table, test_database
+
+from django.test import Client
+from django.urls import reverse
+
+
+def download(client, url):
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url)
+    size = sum(len(chunk) for chunk in (response.streaming_content if response.streaming else [response.content]))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def main(sizes):
+    rows = []
+    with test_database():
+        for size in sizes:
+            user = create_user(f'bench{size}')
+            create_tasks(user, size)
+            client = Client()
+            client.force_login(user)
+            for name, url in [
+                ('list', reverse('task-list')),
+                ('export json', reverse('task-export', args=['json'])),
+                ('export ndjson', reverse('task-export', args=['ndjson'])),
+                ('export csv', reverse('task-export', args=['csv'])),
+            ]:
+                length, elapsed, peak = download(client, url)
+                rows.append((size, name, f'{length / 2**20:.1f}', f'{peak / 2**20:.1f}', f'{elapsed * 1000:.0f}'))
+    print_table(('tasks', 'endpoint', 'body MB', 'peak MB', 'ms'), rows)
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or [10_000, 100_000])
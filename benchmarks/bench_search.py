@@ -0,0 +1,50 @@
+"""
+Compares the server side search endpoint with the old client side search.
+
+The old approach downloads every task through `GET /tasks/` and filters title, description and
+category with a substring match, as `searchTasks()` in index.js used to do.
+
+Usage:
+    python benchmarks/bench_search.py [tasks per user ...]
+"""
+import json
+import sys
+
+from common import create_tasks, create_user, measure, print_table, test_database
+
+from django.test import Client
+from django.urls import reverse
+
+QUERIES = ['report', 'quarterly rev', 'garden']
+
+
+def full_download_search(client, query):
+    tasks = json.loads(client.get(reverse('task-list')).content)
+    query = query.lower()
+    return [
+        task for task in tasks
+        if query in task['title'].lower() or query in task['description'].lower() or query in task['category'].lower()
+    ]
+
+
+def indexed_search(client, query):
+    return json.loads(client.get(reverse('task-search'), {'q': query}).content)
+
+
+def main(sizes):
+    rows = []
+    with test_database():
+        for size in sizes:
+            user = create_user(f'bench{size}')
+            create_tasks(user, size)
+            client = Client()
+            client.force_login(user)
+            for query in QUERIES:
+                old = measure(lambda: full_download_search(client, query), repeat=3)
+                new = measure(lambda: indexed_search(client, query))
+                rows.append((size, query, f'{old * 1000:.1f}', f'{new * 1000:.1f}', f'{old / new:.0f}x'))
+    print_table(('tasks', 'query', 'download ms', 'search ms', 'speedup'), rows)
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or [10_000, 100_000])
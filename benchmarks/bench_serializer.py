@@ -0,0 +1,44 @@
+"""
+Compares TaskSerializer with the TaskValuesSerializer fast path on task lists.
+
+Both columns include fetching the rows and rendering the JSON response body, as a list view
+does.
+
+Usage:
+    python benchmarks/bench_serializer.py [rows ...]
+"""
+import sys
+
+from common import create_tasks, create_user, measure, print_table, test_database
+
+from rest_framework.renderers import JSONRenderer
+
+from taskapp.models import Task
+from taskapp.serializers import TaskSerializer, TaskValuesSerializer
+
+
+def model_serializer(queryset):
+    return JSONRenderer().render(TaskSerializer(queryset.all(), many=True).data)
+
+
+def values_serializer(queryset):
+    serializer = TaskValuesSerializer()
+    return JSONRenderer().render(serializer.format(queryset.values_list(*serializer.columns)))
+
+
+def main(sizes):
+    rows = []
+    with test_database():
+        for size in sizes:
+            user = create_user(f'bench{size}')
+            create_tasks(user, size)
+            queryset = Task.objects.filter(assigned_to=user)
+            assert model_serializer(queryset) == values_serializer(queryset)
+            old = measure(lambda: model_serializer(queryset), repeat=3)
+            new = measure(lambda: values_serializer(queryset), repeat=3)
+            rows.append((size, f'{old * 1000:.1f}', f'{new * 1000:.1f}', f'{old / new:.1f}x'))
+    print_table(('rows', 'TaskSerializer ms', 'fast path ms', 'speedup'), rows)
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or [1_000, 10_000, 100_000])
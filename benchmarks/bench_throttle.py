@@ -0,0 +1,70 @@
+"""
+Compares the cost of the throttle check with the database work of the endpoints it guards.
+
+The check is timed in a loop over `users` users, so the buckets do not all stay in the CPU
+cache, for each bucket store (`CacheBucketStore` on the local-memory cache). The queries are
+those of a status column page, a task list page and the filtered board, for a user with `tasks`
+tasks.
+
+Usage:
+    python benchmarks/bench_throttle.py [tasks] [users]
+"""
+import sys
+import time
+
+from common import create_tasks, create_user, measure, print_table, test_database
+
+from django.test import override_settings
+
+from taskapp import throttling
+from taskapp.models import Task
+from taskapp.serializers import serialize_tasks
+
+CHECKS = 200000
+RATES = {'task_list': '1000000/second'}
+
+
+class FakeUser:
+    is_authenticated = True
+
+    def __init__(self, pk):
+        self.pk = pk
+
+
+def time_checks(store, users):
+    """
+    Returns the mean time of a throttle check in seconds.
+    """
+    throttling._store = store
+    users = [FakeUser(pk) for pk in range(users)]
+    start = time.perf_counter()
+    for number in range(CHECKS):
+        throttling.throttle_wait('task_list', users[number % len(users)])
+    return (time.perf_counter() - start) / CHECKS
+
+
+def main(tasks, users):
+    rows = []
+    with override_settings(TASKAPP_THROTTLE_RATES=RATES, TASKAPP_THROTTLE_MAX_ENTRIES=users * 2):
+        for name, store in [('local memory', throttling.LocalMemoryBucketStore), ('django cache (locmem)', throttling.CacheBucketStore)]:
+            rows.append((f'throttle check, {name}', f'{time_checks(store(), users) * 1e6:.2f}'))
+        throttling._store = None
+
+    with test_database():
+        user = create_user('bench')
+        create_tasks(user, tasks)
+        page = Task.objects.filter(assigned_to=user, status='IP').order_by('-priority', 'id')
+        tasks = Task.objects.filter(assigned_to=user).order_by('-priority', 'id')
+        board = Task.objects.filter(assigned_to=user, priority='HI')
+        for name, func in [
+            ('column page of 20 (2 queries)', lambda: (page.count(), list(page[:20]))),
+            ('task list page of 20, serialized', lambda: serialize_tasks(tasks[:20])),
+            ('filtered board, serialized', lambda: serialize_tasks(board)),
+        ]:
+            rows.append((name, f'{measure(func, 50) * 1e6:.2f}'))
+    print_table(('work', 'us'), rows)
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 1000, args[1] if len(args) > 1 else 10000)
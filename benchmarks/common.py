@@ -0,0 +1,91 @@
+"""
+Shared helpers for the benchmark scripts in this directory.
+
+Importing this module sets up Django. Benchmarks run against a throwaway test database so they
+never touch `db.sqlite3`.
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'TaskManager.settings')
+
+import django
+
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from taskapp.models import Category, Task, User
+
+WORDS = [
+    'report', 'review', 'deploy', 'invoice', 'meeting', 'design', 'budget', 'release', 'backup',
+    'interview', 'migration', 'roadmap', 'feedback', 'audit', 'training', 'support', 'cleanup',
+    'quarterly', 'weekly', 'client', 'server', 'garden', 'groceries', 'dentist', 'travel',
+]
+CATEGORIES = ['Work', 'Personal', 'Home', 'Finance', 'Health', 'Errands', 'Learning']
+
+
+@contextmanager
+def test_database():
+    """
+    Creates a fresh test database for the duration of the block.
+    """
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def create_user(username):
+    return User.objects.create_user(username, f'{username}@tasky.com', 'benchmark-password')
+
+
+def create_tasks(user, count, batch_size=5000, seed=0):
+    """
+    Bulk inserts `count` tasks with randomised words for `user`.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    categories = list(Category.objects.for_names((user.pk, name) for name in CATEGORIES).values())
+    for start in range(0, count, batch_size):
+        Task.objects.bulk_create([
+            Task(
+                title=f'{rng.choice(WORDS)} {rng.choice(WORDS)} #{i}',
+                description=' '.join(rng.choices(WORDS, k=8)),
+                status=rng.choice(['IP', 'CO', 'OV']),
+                priority=rng.choice(['LO', 'ME', 'HI']),
+                due_date=now + timezone.timedelta(hours=rng.randint(-500, 500)),
+                category=rng.choice(categories),
+                assigned_to=user,
+            )
+            for i in range(start, min(start + batch_size, count))
+        ])
+
+
+def measure(func, repeat=5):
+    """
+    Runs `func` `repeat` times and returns the median wall time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print('  '.join(str(cell).rjust(width) for cell, width in zip(row, widths)))
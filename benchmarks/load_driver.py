@@ -0,0 +1,312 @@
+"""
+Replays the traffic of the task board (`frontend/static/frontend/js/index.js`) against a running
+server and reports the throughput and latency of every endpoint.
+
+Unlike the other benchmarks this one needs a server started separately, on the database the
+users were seeded into, for example:
+
+    python manage.py seed_tasks --users 100 --tasks 1000
+    uvicorn TaskManager.asgi:application --workers 4 --port 8000
+    # or: gunicorn TaskManager.wsgi --workers 4 --bind 127.0.0.1:8000
+
+Each client logs in as one of the seeded users (sessions are created directly in the database,
+so this script must use the same settings as the server) and then repeats, without think time,
+one of the actions of the page picked with the weights of `MIX`. Dragging, creating and deleting
+a task reload the board afterwards, as the page does. Deleted tasks are only ever ones the client
+created, so the data set stays the same size between runs.
+
+The results are written as JSON; `--compare` prints the change from an earlier run.
+
+Usage:
+    python benchmarks/load_driver.py --url http://127.0.0.1:8000 --clients 16 --duration 60 --output run.json
+    python benchmarks/load_driver.py --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import statistics
+import time
+from collections import Counter
+from datetime import timedelta
+from urllib.parse import urlencode, urlsplit
+
+from common import print_table
+
+from django.test import Client
+from django.utils import timezone
+
+from taskapp.models import Task, User
+
+# Relative frequency of the actions of the page.
+MIX = {
+    'board': 30,
+    'filter': 15,
+    'sort': 10,
+    'categories': 5,
+    'drag': 25,
+    'create': 10,
+    'delete': 5,
+}
+PRIORITIES = [priority for priority, _ in Task.PRIORITY_CHOICES]
+STATUSES = [status for status, _ in Task.STATUS_CHOICES]
+ORDERINGS = ['-priority', 'due_date', 'category']
+COLUMNS = ['in_progress', 'completed', 'overdue']
+
+
+class Connection:
+    """
+    A keep-alive HTTP/1.1 connection sending the session and CSRF cookies of one user.
+    """
+    def __init__(self, host, port, session):
+        self.host = host
+        self.port = port
+        self.csrf = secrets.token_hex(16)
+        self.cookie = f'sessionid={session}; csrftoken={self.csrf}'
+        self.reader = self.writer = None
+
+    async def request(self, method, path, data=None):
+        """
+        Returns the status code and the decoded JSON body (None if there is none).
+        """
+        body = json.dumps(data).encode() if data is not None else b''
+        head = (
+            f'{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nCookie: {self.cookie}\r\n'
+            f'X-CSRFToken: {self.csrf}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n'
+        )
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(head.encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("The server closed the connection.")
+        headers = {}
+        while (line := await self.reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if headers.get('transfer-encoding') == 'chunked':
+            content = b''
+            while size := int((await self.reader.readline()).split(b';')[0], 16):
+                content += (await self.reader.readexactly(size + 2))[:-2]
+            await self.reader.readline()
+        elif 'content-length' in headers:
+            content = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            content = await self.reader.read()
+            headers['connection'] = 'close'
+        if headers.get('connection') == 'close':
+            self.close()
+        status = int(status_line.split()[1])
+        return status, json.loads(content) if content and headers.get('content-type', '').startswith('application/json') else None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class VirtualUser:
+    """
+    Plays the page of one user, recording the latency of each request under `results`.
+    """
+    def __init__(self, connection, results, rng):
+        self.connection = connection
+        self.results = results
+        self.rng = rng
+        self.task_ids = []
+        self.created = []
+        self.category_names = []
+        self.number = 0
+
+    async def call(self, name, method, path, data=None, expected=200):
+        start = time.perf_counter()
+        try:
+            status, body = await self.connection.request(method, path, data)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            self.connection.close()
+            status, body = None, None
+        latencies, errors = self.results.setdefault(name, ([], []))
+        latencies.append(time.perf_counter() - start)
+        if status != expected:
+            errors.append(status)
+        return status == expected, body
+
+    async def load_board(self, name='board', query=None):
+        ok, board = await self.call(name, 'GET', '/tasks/board/' + (f'?{urlencode(query, doseq=True)}' if query else ''))
+        if ok and not query:
+            self.task_ids = [task['id'] for column in COLUMNS for task in board[column]]
+
+    async def run(self, deadline):
+        await self.load_board()
+        ok, categories = await self.call('categories', 'GET', '/categories/?limit=100')
+        self.category_names = categories if ok else []
+        actions, weights = list(MIX), list(MIX.values())
+        while time.perf_counter() < deadline:
+            await getattr(self, self.rng.choices(actions, weights)[0])()
+        for pk in self.created:
+            await self.call('cleanup', 'DELETE', f'/tasks/{pk}/delete/', expected=204)
+
+    async def board(self):
+        await self.load_board()
+
+    async def filter(self):
+        # Any combination of the three filters of the header.
+        query = {}
+        if self.rng.random() < 0.7:
+            query['priority'] = self.rng.choice(PRIORITIES)
+        if self.rng.random() < 0.4:
+            day = (timezone.now() + timedelta(days=self.rng.randint(-30, 30))).date().isoformat()
+            query.update(due_after=day, due_before=day)
+        if self.category_names and (not query or self.rng.random() < 0.5):
+            query['category'] = self.rng.choice(self.category_names)
+        await self.load_board('filter', query)
+
+    async def sort(self):
+        await self.load_board('sort', {'ordering': self.rng.choice(ORDERINGS)})
+
+    async def categories(self):
+        await self.call('categories', 'GET', '/categories/?limit=100')
+
+    async def drag(self):
+        if not self.task_ids:
+            return await self.create()
+        pk = self.rng.choice(self.task_ids)
+        await self.call('drag', 'PATCH', f'/tasks/{pk}/update/', {'status': self.rng.choice(STATUSES)})
+        await self.load_board()
+
+    async def create(self):
+        self.number += 1
+        ok, task = await self.call('create', 'POST', '/tasks/', {
+            'title': f'load test {secrets.token_hex(4)} #{self.number}',
+            'description': 'Created by the load driver.',
+            'status': 'IP',
+            'priority': self.rng.choice(PRIORITIES),
+            'due_date': (timezone.now() + timedelta(days=self.rng.randint(1, 14))).isoformat(),
+            'category': self.rng.choice(self.category_names or ['Work']),
+        }, expected=201)
+        if ok:
+            self.created.append(task['id'])
+        await self.load_board()
+
+    async def delete(self):
+        if not self.created:
+            return await self.create()
+        pk = self.rng.choice(self.created)
+        ok, _ = await self.call('delete', 'DELETE', f'/tasks/{pk}/delete/', expected=204)
+        if ok:
+            self.created.remove(pk)
+        await self.load_board()
+
+
+def login(users):
+    """
+    Returns a session key for each user.
+    """
+    client = Client()
+    sessions = []
+    for user in users:
+        client.force_login(user)
+        sessions.append(client.cookies['sessionid'].value)
+        client.cookies.clear()
+    return sessions
+
+
+async def drive(host, port, sessions, duration, seed):
+    results = {}
+    deadline = time.perf_counter() + duration
+    users = [VirtualUser(Connection(host, port, session), results, random.Random(seed + number)) for number, session in enumerate(sessions)]
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(user.run(deadline) for user in users))
+    finally:
+        for user in users:
+            user.connection.close()
+    return results, time.perf_counter() - start
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': len(errors),
+        # None stands for requests that got no response.
+        'error_statuses': dict(Counter(str(status) for status in errors)),
+        'throughput': round(len(ordered) / elapsed, 2),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 2),
+    }
+
+
+def compare(report, previous):
+    rows = []
+    for name, current in report['endpoints'].items():
+        before = previous['endpoints'].get(name)
+        if not before:
+            continue
+        rows.append((name, *(
+            f"{before[key]:g} -> {current[key]:g} ({(current[key] - before[key]) / before[key] * 100 if before[key] else 0:+.0f}%)"
+            for key in ['throughput', 'p50_ms', 'p95_ms', 'p99_ms']
+        )))
+    print_table(('endpoint', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays the task board traffic against a running server.")
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help="Base URL of the server.")
+    parser.add_argument('--clients', type=int, default=16, help="Number of concurrent users.")
+    parser.add_argument('--duration', type=float, default=30, help="Length of the run in seconds.")
+    parser.add_argument('--prefix', default='loaduser', help="Username prefix given to seed_tasks.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the random generator.")
+    parser.add_argument('--output', default='load-results.json', help="Where the results are written.")
+    parser.add_argument('--compare', help="Results of an earlier run to compare with.")
+    options = parser.parse_args()
+
+    users = list(User.objects.filter(username__startswith=options.prefix).order_by('pk')[:options.clients])
+    if not users:
+        parser.error(f"No users start with '{options.prefix}', run `manage.py seed_tasks` first.")
+    sessions = login(users[number % len(users)] for number in range(options.clients))
+
+    url = urlsplit(options.url)
+    results, elapsed = asyncio.run(drive(url.hostname, url.port or 80, sessions, options.duration, options.seed))
+
+    _, leftover = results.pop('cleanup', ([], []))
+    report = {
+        'started': timezone.now().isoformat(),
+        'url': options.url,
+        'clients': options.clients,
+        'users': len(users),
+        'duration': round(elapsed, 2),
+        'mix': MIX,
+        'endpoints': {name: summarize(*results[name], elapsed) for name in MIX if name in results},
+    }
+    report['endpoints']['total'] = summarize(
+        [latency for latencies, _ in results.values() for latency in latencies],
+        [error for _, errors in results.values() for error in errors],
+        elapsed,
+    )
+    with open(options.output, 'w') as output:
+        json.dump(report, output, indent=2)
+
+    print_table(
+        ('endpoint', 'requests', 'errors', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms'),
+        [(name, *(row[key] for key in ['requests', 'errors', 'throughput', 'p50_ms', 'p95_ms', 'p99_ms'])) for name, row in report['endpoints'].items()],
+    )
+    print(f"Results written to {options.output}.")
+    if leftover:
+        print(f"{len(leftover)} task(s) created during the run could not be deleted.")
+    if options.compare:
+        with open(options.compare) as previous:
+            compare(report, json.load(previous))
+
+
+if __name__ == '__main__':
+    main()
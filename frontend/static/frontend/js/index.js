@@ -1,9 +1,7 @@
 // This script handles the task management functionalities including loading tasks, updating task status, and handling UI interactions such as drag-and-drop, filtering, and sorting tasks.
 
 const base_url = `${window.location.protocol}//${window.location.hostname}`;
-const in_progress_url = `${base_url}/tasks/in_progress`;
-const completed_url = `${base_url}/tasks/completed`;
-const overdue_url = `${base_url}/tasks/overdue`;
+const board_url = `${base_url}/tasks/board`;
 const statusMap = {
   'IP': 'In Progress',
   'CO': 'Completed',
@@ -16,6 +14,13 @@ const priorityMap = {
   'ME': 'Medium'
 };
 
+// Maps each column of the board endpoint response onto its container and counter.
+const boardColumns = [
+  {key: 'in_progress', container: '#in_progress_task', count: 'inprogress_count'},
+  {key: 'completed', container: '#completed_task', count: 'completed_count'},
+  {key: 'overdue', container: '#overdue_task', count: 'overdue_count'}
+];
+
 const showAlert = (status, message)=>{
   if (status == 'success'){
     $("#message-success").text(message)
@@ -71,196 +76,247 @@ function updateTaskStatus(taskId, newStatus, callback) {
 
 
 /**
- * Loads tasks from a specified URL and updates the task container with the fetched tasks.
+ * Updates the status of several tasks with a single request.
  *
- * This function sends an AJAX GET request to the provided URL to fetch tasks. It then updates
- * the specified container with the fetched tasks, and updates the task count in the specified
- * element. If a task is in progress and its due date has passed, the task status is updated to
- * 'Overdue' and the tasks are reloaded.
+ * @param {number[]} taskIds - The IDs of the tasks to be updated.
+ * @param {string} newStatus - The new status to be assigned to the tasks.
+ * @param {function} [callback] - An optional callback function to be executed upon successful update.
+ */
+function updateTaskStatuses(taskIds, newStatus, callback) {
+  $.ajax({
+      url: `${base_url}/tasks/bulk/`,
+      method: 'PATCH',
+      contentType: 'application/json',
+      headers: {
+        'X-CSRFToken': getCookie('csrftoken')
+      },
+      data: JSON.stringify(taskIds.map(taskId => ({ id: taskId, status: newStatus }))),
+      success: function(data) {
+          console.log('Task statuses updated successfully');
+          if(callback){
+            callback();
+          }
+      },
+      error: function(error) {
+          console.error('Error updating task statuses:', error);
+      }
+  });
+}
+
+/**
+ * Builds the markup for a single task card on the board.
  *
- * @param {string} url - The URL to fetch tasks from.
- * @param {string} container - The selector for the container to update with the fetched tasks.
- * @param {string} id - The selector for the element to update with the task count.
+ * @param {Object} task - A serialized task as returned by the API.
+ * @returns {string} The HTML for the task card.
  */
-async function loadTasks(url, container, id) {
-  const statusMap = {
-    'IP': 'In Progress',
-    'CO': 'Completed',
-    'OV': 'Overdue'
-  };
-  
-  const priorityMap = {
-    'HI': 'High',
-    'LO': 'Low',
-    'ME': 'Medium'
-  };
+function renderTask(task) {
+  const priority = priorityMap[task.priority] || task.priority; // Default to original if no match
+  const time = date_converter(task.due_date)
+  return `<div class="space-y-2 rounded-md task" data-id="${task.id}" data-status="${task.status}">
+        <div class="flex justify-between">
+            <div class="bg-red-200 py-1 px-4 rounded-md text-red-900 font-bold">${priority}</div>
+            <div class="flex shadow-2xl shadow-black rounded-md space-x-2 text-center py-1 px-2 ">
+                <img src="static/frontend/img/clock.png" alt="" class="w-6 h-6">
+                <span class="text-violet-500 font-semibold">${time}</span>
+            </div>
+            <div class="bg-gray-500/20 text-center py-1 text-violet-500 font-medium rounded-md px-3">${task.category}</div>
+        </div>
+        <div class="bg-gray-500/20 px-2 py-4 space-y-3 shadow-xl">
+            <div class="flex justify-between">
+                <h1 class="font-medium text-xl">${task.title}</h1>
+                <img src="static/frontend/img/kebab-gray.png" alt="" class="w-6 h-6">
+            </div>
+            <div class="space-y-2">
+                <p class="text-gray-500">${task.description}</p>
+                <div class="border rounded-md border-gray-500/30 w-16 p-1 flex items-center justify-around">
+                    <img src="static/frontend/img/task2.png" alt="" class="w-4 h-4">
+                    <span class="text-gray-500">0/3</span>
+                </div>
+            </div>
+            <div class="flex items-center justify-around space-x-2">
+                <a href=""><img src="static/frontend/img/eye.png" alt="" class="w-8 h-8"></a>
+                <div class="delete-btn cursor-pointer" data-id="${task.id}"><img src="static/frontend/img/bin.png" alt="" class="w-8 h-8"></div>
+                <div class="edit-task-btn cursor-pointer" data-id="${task.id}"><img src="static/frontend/img/pen.png" alt="" class="w-8 h-8"></div>
+            </div>
+        </div>
+      </div>`;
+}
 
+/**
+ * Makes the task cards draggable and the status columns droppable.
+ *
+ * Dropping a card on a column updates the task status and reloads the board.
+ */
+function bindDragAndDrop() {
+  $(".task").draggable({
+      revert: "invalid",
+      start: function(event, ui) {
+          $(this).addClass("dragging");
+          console.log("Task started dragging");
+      },
+      stop: function(event, ui) {
+          $(this).removeClass("dragging");
+          console.log("Task stopped dragging");
+      }
+  });
+
+  $(".task-list").droppable({
+      accept: ".task",
+      drop: function(event, ui) {
+          var newStatus = $(this).attr("id");
+          var taskId = ui.draggable.data("id");
+
+          console.log("Task dropped on list " + newStatus);
+          console.log("Task ID: " + taskId);
+
+          // Send AJAX request to update task status
+          updateTaskStatus(taskId, newStatus, function() {
+            // Reload tasks after status update
+            refreshBoard()
+          });
+      }
+  });
+}
+
+/**
+ * Loads the whole board (all three status columns and their counts) in a single request.
+ *
+ * This function sends an AJAX GET request to the board endpoint, optionally with the filter or
+ * ordering query string built by `filter()` and `sort()`. Each column container is refilled with
+ * its tasks and the column counts are updated. Tasks that are still in progress but past their
+ * due date are moved to 'Overdue' with one bulk request and the board is then reloaded.
+ *
+ * @param {string} [query='/'] - The query string appended to the board URL, e.g. '/?ordering=due_date'.
+ */
+async function loadBoard(query = '/') {
+  currentQuery = query;
   try {
       const response = await $.ajax({
-          url: url,
+          url: board_url + query,
           method: 'GET'
       });
 
-      $(container).empty();
-
-      $(id).text(`(${response[id.replace("#", "")]})`)
-      if(response.length === 1){
-        task = response[0];
-        const currentTime = new Date();
-        const status = statusMap[task.status] || task.status; // Default to original if no match
-        const priority = priorityMap[task.priority] || task.priority;
-        const time = date_converter(task.due_date)
-        const dueDate = new Date(task.due_date);
-        if (task.status === 'IP' && dueDate < currentTime) {
-          updateTaskStatus(task.id, 'OV')// Update status to Overdue
-          loadTasks(in_progress_url, "#in_progress_task", "#inprogress_count")
-          loadTasks(completed_url, "#completed_task", "#completed_count")
-          loadTasks(overdue_url, "#overdue_task", "#overdue_count")
-        }
-        const taskElement = `<div class="space-y-2 rounded-md task" data-id="${task.id}" data-status="${task.status}">
-              <div class="flex justify-between">
-                  <div class="bg-red-200 py-1 px-4 rounded-md text-red-900 font-bold">${priority}</div>
-                  <div class="flex shadow-2xl shadow-black rounded-md space-x-2 text-center py-1 px-2 ">
-                      <img src="static/frontend/img/clock.png" alt="" class="w-6 h-6">
-                      <span class="text-violet-500 font-semibold">${time}</span>
-                  </div>
-                  <div class="bg-gray-500/20 text-center py-1 text-violet-500 font-medium rounded-md px-3">${task.category}</div>
-              </div>
-              <div class="bg-gray-500/20 px-2 py-4 space-y-3 shadow-xl">
-                  <div class="flex justify-between">
-                      <h1 class="font-medium text-xl">${task.title}</h1>
-                      <img src="static/frontend/img/kebab-gray.png" alt="" class="w-6 h-6">
-                  </div>
-                  <div class="space-y-2">
-                      <p class="text-gray-500">${task.description}</p>
-                      <div class="border rounded-md border-gray-500/30 w-16 p-1 flex items-center justify-around">
-                          <img src="static/frontend/img/task2.png" alt="" class="w-4 h-4">
-                          <span class="text-gray-500">0/3</span>
-                      </div>
-                  </div>
-                  <div class="flex items-center justify-around space-x-2">
-                      <a href=""><img src="static/frontend/img/eye.png" alt="" class="w-8 h-8"></a>
-                      <div class="delete-btn cursor-pointer" data-id="${task.id}"><img src="static/frontend/img/bin.png" alt="" class="w-8 h-8"></div>
-                      <div class="edit-task-btn cursor-pointer" data-id="${task.id}"><img src="static/frontend/img/pen.png" alt="" class="w-8 h-8"></div>
-                  </div>
-              </div>
-            </div>`;
-          $(container).append(taskElement);
-          $(".task").draggable({
-              revert: "invalid",
-              start: function(event, ui) {
-                  $(this).addClass("dragging");
-                  console.log("Task started dragging");
-              },
-              stop: function(event, ui) {
-                  $(this).removeClass("dragging");
-                  console.log("Task stopped dragging");
-              }
-          });
-        
-          $(".task-list").droppable({
-              accept: ".task",
-              drop: function(event, ui) {
-                  var newStatus = $(this).attr("id");
-                  var taskId = ui.draggable.data("id");
-        
-                  console.log("Task dropped on list " + newStatus);
-                  console.log("Task ID: " + taskId);
-        
-                  // Send AJAX request to update task status
-                  updateTaskStatus(taskId, newStatus, function() {
-                    // Reload tasks after status update
-                    loadTasks(in_progress_url, "#in_progress_task", "#inprogress_count")
-                    loadTasks(completed_url, "#completed_task", "#completed_count")
-                    loadTasks(overdue_url, "#overdue_task", "#overdue_count")
-                });
-                  
-              }
-          });
+      const currentTime = new Date();
+      const expired = [];
 
-      }
-      else{
-        response.tasks.forEach(function(task) {
-          const currentTime = new Date();
-          const status = statusMap[task.status] || task.status; // Default to original if no match
-          const priority = priorityMap[task.priority] || task.priority;
-          const time = date_converter(task.due_date)
+      boardColumns.forEach(function(column) {
+        $(column.container).empty();
+        $(`#${column.count}`).text(`(${response[column.count]})`)
+        response[column.key].forEach(function(task) {
           const dueDate = new Date(task.due_date);
           if (task.status === 'IP' && dueDate < currentTime) {
-            updateTaskStatus(task.id, 'OV')// Update status to Overdue
-            loadTasks(in_progress_url, "#in_progress_task", "#inprogress_count")
-            loadTasks(completed_url, "#completed_task", "#completed_count")
-            loadTasks(overdue_url, "#overdue_task", "#overdue_count")
+            expired.push(task.id);
           }
-          const taskElement = `<div class="space-y-2 rounded-md task" data-id="${task.id}" data-status="${task.status}">
-                <div class="flex justify-between">
-                    <div class="bg-red-200 py-1 px-4 rounded-md text-red-900 font-bold">${priority}</div>
-                    <div class="flex shadow-2xl shadow-black rounded-md space-x-2 text-center py-1 px-2 ">
-                        <img src="static/frontend/img/clock.png" alt="" class="w-6 h-6">
-                        <span class="text-violet-500 font-semibold">${time}</span>
-                    </div>
-                    <div class="bg-gray-500/20 text-center py-1 text-violet-500 font-medium rounded-md px-3">${task.category}</div>
-                </div>
-                <div class="bg-gray-500/20 px-2 py-4 space-y-3 shadow-xl">
-                    <div class="flex justify-between">
-                        <h1 class="font-medium text-xl">${task.title}</h1>
-                        <img src="static/frontend/img/kebab-gray.png" alt="" class="w-6 h-6">
-                    </div>
-                    <div class="space-y-2">
-                        <p class="text-gray-500">${task.description}</p>
-                        <div class="border rounded-md border-gray-500/30 w-16 p-1 flex items-center justify-around">
-                            <img src="static/frontend/img/task2.png" alt="" class="w-4 h-4">
-                            <span class="text-gray-500">0/3</span>
-                        </div>
-                    </div>
-                    <div class="flex items-center justify-around space-x-2">
-                        <a href=""><img src="static/frontend/img/eye.png" alt="" class="w-8 h-8"></a>
-                        <div class="delete-btn cursor-pointer" data-id="${task.id}"><img src="static/frontend/img/bin.png" alt="" class="w-8 h-8"></div>
-                        <div class="edit-task-btn cursor-pointer" data-id="${task.id}"><img src="static/frontend/img/pen.png" alt="" class="w-8 h-8"></div>
-                    </div>
-                </div>
-              </div>`;
-            $(container).append(taskElement);
-            $(".task").draggable({
-                revert: "invalid",
-                start: function(event, ui) {
-                    $(this).addClass("dragging");
-                    console.log("Task started dragging");
-                },
-                stop: function(event, ui) {
-                    $(this).removeClass("dragging");
-                    console.log("Task stopped dragging");
-                }
-            });
-          
-            $(".task-list").droppable({
-                accept: ".task",
-                drop: function(event, ui) {
-                    var newStatus = $(this).attr("id");
-                    var taskId = ui.draggable.data("id");
-          
-                    console.log("Task dropped on list " + newStatus);
-                    console.log("Task ID: " + taskId);
-          
-                    // Send AJAX request to update task status
-                    updateTaskStatus(taskId, newStatus, function() {
-                      // Reload tasks after status update
-                      loadTasks(in_progress_url, "#in_progress_task", "#inprogress_count")
-                      loadTasks(completed_url, "#completed_task", "#completed_count")
-                      loadTasks(overdue_url, "#overdue_task", "#overdue_count")
-                  });
-                    
-                }
-            });
+          $(column.container).append(renderTask(task));
         });
+      });
+      bindDragAndDrop();
+
+      if (expired.length) {
+        updateTaskStatuses(expired, 'OV', function() { // Update status to Overdue
+          loadBoard(query)
+        })
       }
-      
 
   } catch (error) {
+      if (error.status === 429) {
+        // Throttled: try again once the server allows it.
+        const retryAfter = Number(error.getResponseHeader('Retry-After')) || 1;
+        setTimeout(() => loadBoard(currentQuery), retryAfter * 1000);
+        return
+      }
       console.error('Error fetching tasks:', error);
   }
 }
 
+// The query string of the board on screen, so live events can reload the same view.
+let currentQuery = '/';
+let taskEvents = null;
+
+/**
+ * Reloads the board after a change made from this page, unless the live event stream is open
+ * and will deliver the change itself.
+ */
+function refreshBoard() {
+  if (!taskEvents || taskEvents.readyState !== EventSource.OPEN) {
+    loadBoard(currentQuery)
+  }
+}
+
+/**
+ * Updates the column counters from the cards currently on the board.
+ */
+function updateColumnCounts() {
+  boardColumns.forEach(function(column) {
+    $(`#${column.count}`).text(`(${$(column.container).children('.task').length})`)
+  });
+}
+
+/**
+ * Subscribes to the live task events of the user.
+ *
+ * On the unfiltered board, 'saved' and 'deleted' events patch the affected card in place.
+ * Filtered or sorted boards, and 'reset' events, reload the board through the (cheap,
+ * conditional) board request instead.
+ */
+function listenForTaskEvents() {
+  if (!window.EventSource) {
+    return
+  }
+  taskEvents = new EventSource(`${base_url}/tasks/events/`);
+  const columnFor = {'IP': '#in_progress_task', 'CO': '#completed_task', 'OV': '#overdue_task'};
+
+  taskEvents.addEventListener('saved', function(event) {
+    const task = JSON.parse(event.data);
+    if (currentQuery !== '/') {
+      return loadBoard(currentQuery)
+    }
+    $(`.task[data-id="${task.id}"]`).remove();
+    $(columnFor[task.status]).append(renderTask(task));
+    updateColumnCounts();
+    bindDragAndDrop();
+  });
+  taskEvents.addEventListener('deleted', function(event) {
+    $(`.task[data-id="${JSON.parse(event.data).id}"]`).remove();
+    updateColumnCounts();
+  });
+  taskEvents.addEventListener('reset', function() {
+    loadBoard(currentQuery)
+  });
+}
+
+/**
+ * Fills the category filter with the user's categories, keeping the current selection.
+ */
+function loadCategories() {
+  $.get(`${base_url}/categories/`, {limit: 100}, function(categories) {
+    const select = $('#filterCategory');
+    const selected = select.val();
+    select.find('option:not(:first)').remove();
+    categories.forEach(function(category) {
+      select.append($('<option>').val(category).text(category));
+    });
+    select.val(selected);
+  });
+}
+
+let categoryTimer = null;
+
+/**
+ * Suggests the user's categories starting with what was typed in a category input, through
+ * the shared `#categoryOptions` datalist.
+ *
+ * @param {string} prefix - The text typed so far.
+ */
+function suggestCategories(prefix) {
+  clearTimeout(categoryTimer);
+  categoryTimer = setTimeout(function() {
+    $.get(`${base_url}/categories/`, {prefix: prefix}, function(categories) {
+      $('#categoryOptions').empty().append(categories.map(category => $('<option>').val(category)));
+    });
+  }, 150);
+}
+
 function getCookie(name) {
   let cookieValue = null;
   if (document.cookie && document.cookie !== '') {
@@ -292,17 +348,21 @@ $(document).ready(function () {
     sort();
   })
   $('#refresh').click(function(){
-    loadTasks(in_progress_url, "#in_progress_task", "#inprogress_count")
-    loadTasks(completed_url, "#completed_task", "#completed_count")
-    loadTasks(overdue_url, "#overdue_task", "#overdue_count")
+    loadBoard()
   })
   const btn = document.getElementById('menu-btn');
   const menu = document.getElementById('menu');
   const cover = document.getElementById('cover');
 
-  loadTasks(in_progress_url, "#in_progress_task", "#inprogress_count")
-  loadTasks(completed_url, "#completed_task", "#completed_count")
-  loadTasks(overdue_url, "#overdue_task", "#overdue_count")
+  loadBoard()
+  listenForTaskEvents()
+  loadCategories()
+
+  // Categories are added as tasks are saved, so the filter is refreshed before it opens.
+  $('#filterCategory').on('focus', loadCategories)
+  $('#category, #editCategory').on('input focus', function() {
+    suggestCategories($(this).val())
+  })
 
   btn.addEventListener("click", navToggle)
   cover.addEventListener("click", navToggle)
@@ -366,9 +426,7 @@ $(document).ready(function () {
             $('#addtask-modal').hide();
             document.getElementById("createTaskForm").reset();
             // Reload the task list
-            loadTasks(in_progress_url, "#in_progress_task", "#inprogress_count")
-            loadTasks(completed_url, "#completed_task", "#completed_count")
-            loadTasks(overdue_url, "#overdue_task", "#overdue_count")  
+            refreshBoard()
         },
         error: function(xhr, status, error) {
             // Handle error
@@ -403,9 +461,7 @@ $(document).ready(function () {
               showAlert('success', 'Task updated successfully')
               $('#editTaskModal').hide();
               // Reload the task list
-              loadTasks(in_progress_url, "#in_progress_task", "#inprogress_count")
-              loadTasks(completed_url, "#completed_task", "#completed_count")
-              loadTasks(overdue_url, "#overdue_task", "#overdue_count")
+              refreshBoard()
           },
           error: function(xhr, status, error) {
               console.log('Error updating task: ' + error);
@@ -414,39 +470,34 @@ $(document).ready(function () {
       });
   });
 
-  let allTasks = [];
+  let searchTimer = null;
+  let searchRequest = null;
 
-  function fetchTasks() {
-    $.get(`${base_url}/tasks/`, function(data) {
-      allTasks = data; // Store the fetched tasks
-      console.log(allTasks)
-    });
-  }
   /**
-   * Searches for tasks based on the provided query and updates the task container with the results.
+   * Searches for tasks matching the provided query and updates the task container with the results.
    *
-   * This function filters the tasks stored in the `allTasks` array based on the provided query.
-   * If the query is an empty string, it clears the task container and fetches all tasks again.
-   * Otherwise, it filters the tasks by checking if the query is included in the task's title,
-   * description, or category (case-insensitive), and then displays the filtered tasks.
+   * The search runs on the server against the task search index (`/tasks/search/?q=`), which
+   * returns the best matches first. Requests are debounced while the user is typing and any
+   * request still in flight is aborted when a newer query comes in.
    *
-   * @param {string} query - The search query used to filter tasks.
+   * @param {string} query - The search query used to find tasks.
    */
   function searchTasks(query) {
     const container = $('#taskContainer');
-  
-    if (query === '') {
-      // Clear the container and fetch all tasks when search input is cleared
-      container.empty();
-      fetchTasks(); // Fetch all tasks again
-    } else {
-      const filteredTasks = allTasks.filter(task => {
-        return task.title.toLowerCase().includes(query.toLowerCase()) ||
-               task.description.toLowerCase().includes(query.toLowerCase()) ||
-               task.category.toLowerCase().includes(query.toLowerCase());
-      });
-      displayTasks(filteredTasks); // Display the filtered tasks
+
+    clearTimeout(searchTimer);
+    if (searchRequest) {
+      searchRequest.abort();
     }
+    if (query.trim() === '') {
+      container.empty(); // Clear the container when search input is cleared
+      return;
+    }
+    searchTimer = setTimeout(function() {
+      searchRequest = $.get(`${base_url}/tasks/search/`, {q: query}, function(data) {
+        displayTasks(data); // Display the matching tasks
+      });
+    }, 200);
   }
 
   /**
@@ -485,8 +536,6 @@ $(document).ready(function () {
     updateTaskColors()
   }
 
-  fetchTasks(); // Fetch tasks when the page loads
-
   $('#search').on('input', function() {
     const query = $(this).val();
     searchTasks(query); // Search tasks based on the input value
@@ -546,9 +595,7 @@ $(document).on('click', '.delete-btn', function(){
             success: function(response) {
                 showAlert('success', 'Task Deleted successfully')
                 // Reload the task list
-                loadTasks(in_progress_url, "#in_progress_task", "#inprogress_count")
-                loadTasks(completed_url, "#completed_task", "#completed_count")
-                loadTasks(overdue_url, "#overdue_task", "#overdue_count")
+                refreshBoard()
                 $('#deleteModal').hide()
             },
             error: function(xhr, status, error) {
@@ -602,7 +649,9 @@ function updateTaskColors() {
  * Filters tasks based on selected priority, due date, and category.
  *
  * This function constructs a URL with query parameters based on the selected filter criteria.
- * It then calls the loadTasks function to fetch and display the filtered tasks for each task status.
+ * The due date is a plain date sent as both `due_after` and `due_before`, which selects the
+ * tasks due at any time on that day.
+ * It then calls the loadBoard function to fetch and display the filtered tasks for every status column.
  *
  * @function
  */
@@ -617,16 +666,14 @@ function filter() {
       url += `priority=${priority}&`;
   }
   if (dueDate) {
-      url += `due_date=${dueDate}&`;
+      url += `due_after=${dueDate}&due_before=${dueDate}&`;
   }
   if (category) {
       url += `category=${category}&`;
   }
   
   if(url != '/?'){
-    loadTasks(in_progress_url+url, "#in_progress_task", "#inprogress_count")
-    loadTasks(completed_url+url, "#completed_task", "#completed_count")
-    loadTasks(overdue_url+url, "#overdue_task", "#overdue_count")
+    loadBoard(url)
   }
 }
 
@@ -634,12 +681,12 @@ function filter() {
  * Sorts tasks based on the selected sorting criteria.
  *
  * This function constructs a URL with a query parameter for sorting based on the selected criteria.
- * It then calls the loadTasks function to fetch and display the sorted tasks for each task status.
+ * It then calls the loadBoard function to fetch and display the sorted tasks for every status column.
  *
  * @function
  */
 function sort() {
-  const sortBy = $('#sortBy').val();
+  const sortBy = $('#sortby').val();
   let url = '/?';
 
   if (sortBy) {
@@ -647,9 +694,7 @@ function sort() {
   }
 
   if(url != '/?'){
-    console.log(in_progress_url+url)
-    loadTasks(in_progress_url+url, "#in_progress_task", "#inprogress_count")
-    loadTasks(completed_url+url, "#completed_task", "#completed_count")
-    loadTasks(overdue_url+url, "#overdue_task", "#overdue_count")
+    console.log(board_url+url)
+    loadBoard(url)
   }
 }
\ No newline at end of file
@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import User, Task
+from .models import User, Category, Task
 
 # Register your models here.
 admin.site.register(Task)
+admin.site.register(Category)
 admin.site.register(User)
\ No newline at end of file
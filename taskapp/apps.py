@@ -3,3 +3,12 @@ from django.apps import AppConfig
 class TaskappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'taskapp'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .metrics import install_query_recorder
+
+        # A no-op unless a request is being measured, see taskapp/metrics.py.
+        connection_created.connect(install_query_recorder, dispatch_uid='taskapp.metrics')
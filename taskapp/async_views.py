@@ -0,0 +1,228 @@
+"""
+Async variants of the task API views, served under `/async/` for the ASGI deployment.
+
+They take the same parameters and return the same payloads as their counterparts in
+`taskapp.views`, but talk to the database through Django's async ORM so a request waiting on a
+query does not hold a thread of the sync adapter. Saves are the exception: they need a
+savepoint, and `transaction.atomic` has no async form. DRF views cannot be async, so these
+are plain Django class-based views reusing the task serializer, filter backends and keyset
+pagination.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, QueryDict
+from django.views import View
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound, ParseError, Throttled
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .cache import aget_board
+from .filters import TaskFilterSet, TaskOrderingFilter
+from .models import Task
+from .pagination import KeysetPagination
+from .serializers import TaskSerializer, aserialize_tasks, set_categories
+from .throttling import throttle_wait
+from .views import DUPLICATE_TITLE_MESSAGE, CompletedTaskListView, InProgressTaskListView, OverdueTaskListView, title_taken
+
+
+@sync_to_async
+def save_atomic(task, data):
+    # A savepoint keeps a failed insert from breaking an enclosing transaction, as in `save_task`.
+    with transaction.atomic():
+        set_categories(task.assigned_to_id, [data])
+        for attr, value in data.items():
+            setattr(task, attr, value)
+        task.save()
+
+
+def json_response(data, status=200):
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+class AsyncTaskView(View):
+    """
+        Base view: authenticates the session user and renders API errors like DRF does.
+
+        `self.request` is wrapped in a DRF `Request` so the filter backends and the paginator
+        can read `query_params`; the user is loaded with `request.auser()`. Requests take a
+        token from the same buckets as the sync views of their `throttle_scope`.
+    """
+    throttle_scope = None
+    filter_backends = [DjangoFilterBackend, TaskOrderingFilter]
+    filterset_class = TaskFilterSet
+    ordering_fields = ['priority', 'due_date', 'category']
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.user = await request.auser()
+        self.request = Request(request)
+        try:
+            if not self.user.is_authenticated:
+                raise NotAuthenticated()
+            if wait := throttle_wait(self.throttle_scope, self.user):
+                raise Throttled(wait)
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            # Session authentication sends no WWW-Authenticate header, so DRF answers 403.
+            status = 403 if isinstance(exc, NotAuthenticated) else exc.status_code
+            response = json_response(detail, status)
+            if getattr(exc, 'wait', None):
+                response['Retry-After'] = '%d' % exc.wait
+            return response
+
+    def get_queryset(self):
+        return Task.objects.filter(assigned_to=self.user)
+
+    def filter_queryset(self, queryset):
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    async def get_object(self, pk):
+        try:
+            return await self.get_queryset().aget(pk=pk)
+        except Task.DoesNotExist:
+            raise NotFound("No Task matches the given query.")
+
+    def get_data(self, request):
+        if request.content_type == 'application/json':
+            try:
+                return json.loads(request.body or b'{}')
+            except ValueError as exc:
+                raise ParseError(f"JSON parse error - {exc}")
+        return QueryDict(request.body)
+
+    async def save(self, serializer, task):
+        """
+            Saves the validated data on `task`, reporting a duplicate title as a validation error.
+        """
+        if not serializer.is_valid():
+            return json_response(serializer.errors, 400)
+        try:
+            await save_atomic(task, dict(serializer.validated_data))
+        except IntegrityError:
+            if not await sync_to_async(title_taken)(task.assigned_to_id, [task.title], exclude=[task.pk] if task.pk else []):
+                raise
+            return json_response([DUPLICATE_TITLE_MESSAGE], 400)
+        return None
+
+
+class AsyncTaskListView(AsyncTaskView):
+    """
+        Lists all tasks or creates a new task.
+
+        Pass `page_size` (and then the returned `next` link) to page through the list.
+
+        Example:
+            curl -X GET "http://localhost:8000/async/tasks/?page_size=50&ordering=due_date"
+    """
+    replica_reads = True
+    throttle_scope = 'task_list'
+
+    async def get(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = KeysetPagination()
+        page = await paginator.apaginate_queryset(queryset, self.request, self)
+        if page is not None:
+            return json_response({'next': paginator.get_next_link(), 'results': TaskSerializer(page, many=True).data})
+        return json_response(await aserialize_tasks(queryset))
+
+    async def post(self, request):
+        serializer = TaskSerializer(data=self.get_data(request))
+        task = Task(assigned_to=self.user)
+        return await self.save(serializer, task) or json_response(TaskSerializer(task).data, 201)
+
+
+class AsyncTaskDetailView(AsyncTaskView):
+    """
+        Retrieves a single task of the user.
+    """
+    replica_reads = True
+
+    async def get(self, request, pk):
+        return json_response(TaskSerializer(await self.get_object(pk)).data)
+
+
+class AsyncUpdateTaskView(AsyncTaskView):
+    """
+        Retrieves or updates a task. PATCH updates only the fields sent.
+    """
+
+    async def get(self, request, pk):
+        return json_response(TaskSerializer(await self.get_object(pk)).data)
+
+    async def put(self, request, pk):
+        task = await self.get_object(pk)
+        serializer = TaskSerializer(task, data=self.get_data(request), partial=request.method == 'PATCH')
+        return await self.save(serializer, task) or json_response(TaskSerializer(task).data)
+
+    patch = put
+
+
+class AsyncDeleteTaskView(AsyncTaskView):
+    """
+        Deletes a task.
+    """
+
+    async def delete(self, request, pk):
+        deleted, _ = await self.get_queryset().filter(pk=pk).adelete()
+        if not deleted:
+            raise NotFound("No Task matches the given query.")
+        return HttpResponse(status=204)
+
+
+class AsyncStatusTaskListView(AsyncTaskView):
+    """
+        Base view for a single status column of the board.
+
+        The unfiltered column comes from the per-user board cache. When a page is requested
+        with `page_size`/`cursor`, the count of every matching task is queried before the page.
+        The async ORM runs both on the request's one connection, so they cannot overlap.
+
+        Returns:
+            The serialized tasks under 'tasks' and their number under `count_key`.
+    """
+    status = None
+    count_key = None
+    replica_reads = True
+    throttle_scope = 'task_column'
+
+    def get_queryset(self):
+        return Task.objects.filter(assigned_to=self.user, status=self.status)
+
+    async def get(self, request):
+        if not request.GET:
+            tasks = (await aget_board(self.user))[self.status]
+            return json_response({'tasks': tasks, self.count_key: len(tasks)})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = KeysetPagination()
+        if paginator.is_requested(self.request):
+            count = await queryset.acount()
+            page = await paginator.apaginate_queryset(queryset, self.request, self)
+            return json_response({
+                'tasks': TaskSerializer(page, many=True).data,
+                self.count_key: count,
+                'next': paginator.get_next_link(),
+            })
+
+        tasks = await aserialize_tasks(queryset)
+        return json_response({'tasks': tasks, self.count_key: len(tasks)})
+
+
+class AsyncInProgressTaskListView(AsyncStatusTaskListView):
+    status = InProgressTaskListView.status
+    count_key = InProgressTaskListView.count_key
+
+
+class AsyncCompletedTaskListView(AsyncStatusTaskListView):
+    status = CompletedTaskListView.status
+    count_key = CompletedTaskListView.count_key
+
+
+class AsyncOverdueTaskListView(AsyncStatusTaskListView):
+    status = OverdueTaskListView.status
+    count_key = OverdueTaskListView.count_key
@@ -0,0 +1,54 @@
+"""
+Authentication backend caching the signed in user.
+
+Every authenticated request loads its user by the id stored in the session. With
+`TASKAPP_USER_CACHE_TIMEOUT` set, `CachedModelBackend` keeps the users it loads in the
+`TASKAPP_CACHE` cache for that many seconds, saving that query. Saving or deleting a user (which
+includes changing the password or signing in, as `last_login` is saved) and signing out drop the
+cached copy, see taskapp/signals.py.
+
+Django still checks the password hash stored in the session against the cached user, so
+changing the password signs out the other sessions as soon as the cached copy is dropped. With
+several processes the cache must be shared for that to happen at once rather than within the
+timeout.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+
+from .cache import get_cache
+
+
+def user_key(user_id):
+    return f'taskapp:user:{user_id}'
+
+
+def invalidate_user(user_id):
+    get_cache().delete(user_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    `ModelBackend` that looks users up in the cache first.
+
+    Listed before `ModelBackend`, which only remains to load the users of the sessions it
+    started, so it ends a failed password check itself rather than letting `ModelBackend` hash
+    the same password again.
+    """
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username, password, **kwargs)
+        if user is None and password is not None:
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        timeout = getattr(settings, 'TASKAPP_USER_CACHE_TIMEOUT', 0)
+        if not timeout:
+            return super().get_user(user_id)
+        cache = get_cache()
+        user = cache.get(user_key(user_id))
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(user_key(user_id), user, timeout)
+        return user
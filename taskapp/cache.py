@@ -0,0 +1,150 @@
+"""
+Per-user cache of the unfiltered board.
+
+The snapshot holds every task of a user serialized and grouped by status, which also gives the
+column counts. It lives in the Django cache selected by `TASKAPP_CACHE` (the `default` cache,
+a local-memory LRU cache unless configured otherwise) and expires after
+`TASKAPP_BOARD_CACHE_TIMEOUT` seconds.
+
+Snapshots are keyed by a per-user version. Invalidating a user's board bumps the version, so a
+snapshot built from data read before a write can never be served after it.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+
+from .models import Task
+from .serializers import aserialize_tasks, serialize_tasks
+
+
+class CacheStats:
+    """
+    Thread-safe hit/miss/invalidation counters for the board cache of this process.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.hits = self.misses = self.invalidations = 0
+
+    def record(self, counter, amount=1):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def snapshot(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_ratio': self.hits / lookups if lookups else None,
+            }
+
+
+stats = CacheStats()
+
+
+def get_cache():
+    return caches[getattr(settings, 'TASKAPP_CACHE', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'TASKAPP_BOARD_CACHE_TIMEOUT', 300)
+
+
+def version_key(user_id):
+    return f'taskapp:board-version:{user_id}'
+
+
+def board_key(user_id, version):
+    return f'taskapp:board:{user_id}:{version}'
+
+
+def get_version(cache, user_id):
+    version = cache.get(version_key(user_id))
+    if version is None:
+        # A fresh, time based version cannot collide with the keys of an evicted one.
+        version = time.time_ns()
+        cache.add(version_key(user_id), version, get_timeout())
+        version = cache.get(version_key(user_id), version)
+    return version
+
+
+def group_board(tasks):
+    board = {status: [] for status, _ in Task.STATUS_CHOICES}
+    for task in tasks:
+        board[task['status']].append(dict(task))
+    return board
+
+
+def board_tasks(user):
+    # Snapshots outlive the request, so they are never built from a replica that may not have
+    # the latest writes yet.
+    return Task.objects.db_manager(router.db_for_write(Task)).filter(assigned_to=user)
+
+
+def build_board(user):
+    return group_board(serialize_tasks(board_tasks(user)))
+
+
+def get_board(user):
+    """
+    Returns the user's tasks serialized and grouped by status, from the cache when possible.
+
+    Example:
+        >>> board = get_board(user)
+        >>> len(board['IP'])
+        3
+    """
+    cache = get_cache()
+    key = board_key(user.pk, get_version(cache, user.pk))
+    board = cache.get(key)
+    if board is not None:
+        stats.record('hits')
+        return board
+
+    stats.record('misses')
+    board = build_board(user)
+    cache.set(key, board, get_timeout())
+    return board
+
+
+async def aget_version(cache, user_id):
+    version = await cache.aget(version_key(user_id))
+    if version is None:
+        version = time.time_ns()
+        await cache.aadd(version_key(user_id), version, get_timeout())
+        version = await cache.aget(version_key(user_id), version)
+    return version
+
+
+async def aget_board(user):
+    """
+    Same as `get_board`, for async views. The board is built with the async ORM on a miss.
+    """
+    cache = get_cache()
+    key = board_key(user.pk, await aget_version(cache, user.pk))
+    board = await cache.aget(key)
+    if board is not None:
+        stats.record('hits')
+        return board
+
+    stats.record('misses')
+    board = group_board(await aserialize_tasks(board_tasks(user)))
+    await cache.aset(key, board, get_timeout())
+    return board
+
+
+def invalidate_board(*user_ids):
+    """
+    Drops the cached boards of the given users.
+    """
+    cache = get_cache()
+    cache.set_many({version_key(user_id): time.time_ns() for user_id in user_ids}, get_timeout())
+    stats.record('invalidations', len(user_ids))
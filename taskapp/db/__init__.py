@@ -0,0 +1,11 @@
+"""
+Database backends tuned for serving the app, selected by `DATABASE_URL` in the settings.
+
+* `taskapp.db.sqlite3`: SQLite for single-node deployments. Connections use write-ahead
+  logging, so reads never wait for a writer, wait for locks instead of failing at once, and
+  start their transactions with `BEGIN IMMEDIATE`.
+* `taskapp.db.postgresql`: PostgreSQL, optionally drawing its connections from a pool kept by
+  the process (`OPTIONS['pool']`).
+
+Both behave like the Django backends they extend when their options are left out.
+"""
@@ -0,0 +1,140 @@
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel, is_psycopg3
+
+from .creation import DatabaseCreation
+
+if is_psycopg3:
+    raise ImproperlyConfigured("taskapp.db.postgresql pools psycopg2 connections, use Django 5.1's own pool with psycopg 3.")
+
+from psycopg2 import extras, pool
+
+
+class ConnectionPool(pool.ThreadedConnectionPool):
+    """
+    `ThreadedConnectionPool` that waits up to `timeout` seconds for a connection once `maxconn`
+    are in use, instead of failing at once.
+    """
+    def __init__(self, minconn, maxconn, timeout, **kwargs):
+        self.available = threading.BoundedSemaphore(maxconn)
+        self.timeout = timeout
+        super().__init__(minconn, maxconn, **kwargs)
+
+    def getconn(self, key=None):
+        if not self.available.acquire(timeout=self.timeout):
+            raise pool.PoolError(f"No database connection became available within {self.timeout}s.")
+        try:
+            return super().getconn(key)
+        except BaseException:
+            self.available.release()
+            raise
+
+    def putconn(self, conn, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self.available.release()
+
+
+# (alias, connection parameters) -> pool, shared by the threads of the process.
+pools = {}
+pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend that can draw its connections from a pool kept by the process.
+
+    Without `OPTIONS['pool']` it is the Django backend. With it, opening a connection takes one
+    from the pool and closing it puts it back, so requests skip the TCP handshake,
+    authentication and backend startup of a new connection. `min_size` connections are opened
+    with the pool and kept; up to `max_size` are opened under load and closed again when
+    returned, and beyond that requests wait up to `timeout` seconds for one.
+
+    Use it with `CONN_MAX_AGE = 0`, so each request returns its connection at the end. That
+    also suits ASGI, where persistent connections pile up in the threads running sync code.
+    With `CONN_HEALTH_CHECKS`, connections are tested when taken from the pool and replaced if
+    the server dropped them.
+
+    Example:
+        DATABASES = {'default': {
+            'ENGINE': 'taskapp.db.postgresql',
+            'NAME': 'tasks',
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {'pool': {'min_size': 4, 'max_size': 16, 'timeout': 10}},
+        }}
+    """
+    creation_class = DatabaseCreation
+
+    @property
+    def pool_options(self):
+        options = self.settings_dict['OPTIONS'].get('pool')
+        if not options:
+            return None
+        options = {} if options is True else options
+        max_size = options.get('max_size', 10)
+        return {'minconn': options.get('min_size', max_size), 'maxconn': max_size, 'timeout': options.get('timeout', 30)}
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_pool(self, conn_params):
+        key = (self.alias, repr(sorted(conn_params.items())))
+        with pools_lock:
+            if key not in pools:
+                pools[key] = ConnectionPool(**self.pool_options, **conn_params)
+            return pools[key]
+
+    def get_new_connection(self, conn_params):
+        if self.pool_options is None:
+            return super().get_new_connection(conn_params)
+        self.connection_pool = self.get_pool(conn_params)
+        connection = self.connection_pool.getconn()
+        while self.settings_dict['CONN_HEALTH_CHECKS'] and not self.is_pooled_connection_usable(connection):
+            self.connection_pool.putconn(connection, close=True)
+            connection = self.connection_pool.getconn()
+
+        # What the Django backend does to each new connection, minus connecting.
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        if isolation_level is None:
+            self.isolation_level = IsolationLevel.READ_COMMITTED
+        else:
+            try:
+                self.isolation_level = IsolationLevel(isolation_level)
+            except ValueError:
+                self.connection_pool.putconn(connection)
+                raise ImproperlyConfigured(f"Invalid transaction isolation level {isolation_level} specified.")
+            connection.isolation_level = self.isolation_level
+        extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        return connection
+
+    def is_pooled_connection_usable(self, connection):
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+        except self.Database.Error:
+            return False
+        return True
+
+    def _close(self):
+        if self.pool_options is None:
+            return super()._close()
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.connection_pool.putconn(self.connection)
+
+    def close_pool(self):
+        """
+        Closes every connection of the pools of this alias.
+        """
+        with pools_lock:
+            for key in [key for key in pools if key[0] == self.alias]:
+                pools.pop(key).closeall()
@@ -0,0 +1,8 @@
+from django.db.backends.postgresql import creation
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # PostgreSQL will not drop a database pooled connections are still open to.
+        self.connection.close_pool()
+        super()._destroy_test_db(test_database_name, verbosity)
@@ -0,0 +1,14 @@
+import os
+import tempfile
+
+from django.db.backends.sqlite3 import creation
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _get_test_db_name(self):
+        # Django's default in-memory test database shares one cache between connections, where
+        # concurrent writers fail at once with "database table is locked" instead of waiting
+        # out the busy timeout. A file makes tests see the locking of the database served.
+        if self.connection.settings_dict['TEST']['NAME'] is None:
+            return os.path.join(tempfile.gettempdir(), f'taskapp_test_{self.connection.alias}.sqlite3')
+        return super()._get_test_db_name()
@@ -0,0 +1,215 @@
+"""
+Per-user task change events for the live board.
+
+Changes are published to a broker selected by `TASKAPP_EVENT_BROKER` and streamed to the
+browser as Server-Sent Events by `task_events`. The default `InMemoryBroker` only delivers
+events published by the same process, which is enough for a single ASGI server. Deployments
+running several processes can plug in a broker that relays events through a shared channel
+(e.g. Redis pub/sub) by subclassing `BaseBroker`.
+
+Each event is encoded once when it is published and shared by every open stream of the user.
+Streams wait on an `asyncio.Queue`, so an idle connection costs a coroutine and a small buffer
+rather than a thread. `EventStreamApplication` serves them straight from the event loop, since
+Django keeps a thread per ASGI request for as long as its response streams.
+"""
+import asyncio
+import json
+import threading
+from importlib import import_module
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.http import parse_cookie
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+RESET = 'reset'
+
+
+def encode_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+class Subscription:
+    """
+    The queue of events waiting to be sent on one stream.
+
+    Must be created and read on the event loop serving the stream. A stream that falls more
+    than `max_size` events behind is sent a single 'reset' event, after which the client reloads
+    its board.
+    """
+    def __init__(self, user_id, max_size):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_size)
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(encode_event(RESET, {}))
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class BaseBroker:
+    """
+    Fans published events out to the subscriptions of a user.
+
+    Subclasses that relay events between processes should override `publish` to send the
+    encoded message to the shared channel and call `deliver` for each message received from it.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, getattr(settings, 'TASKAPP_EVENT_QUEUE_SIZE', 100))
+        with self.lock:
+            self.subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.user_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self.subscriptions.pop(subscription.user_id, None)
+
+    def has_subscribers(self, user_id):
+        """
+        Tells publishers whether encoding an event for the user is worth it.
+        """
+        return True
+
+    def publish(self, user_id, event, data):
+        raise NotImplementedError
+
+    def deliver(self, user_id, message):
+        """
+        Queues an encoded message on every local subscription of the user. Thread-safe.
+        """
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, message)
+            except RuntimeError:
+                # The loop serving the stream has been closed.
+                self.unsubscribe(subscription)
+
+
+class InMemoryBroker(BaseBroker):
+    """
+    Delivers events to the streams served by the current process.
+    """
+    def has_subscribers(self, user_id):
+        return user_id in self.subscriptions
+
+    def publish(self, user_id, event, data):
+        self.deliver(user_id, encode_event(event, data))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(getattr(settings, 'TASKAPP_EVENT_BROKER', 'taskapp.events.InMemoryBroker'))()
+        return _broker
+
+
+async def stream_events(user_id):
+    """
+    Yields the Server-Sent Events of the user until the client disconnects.
+
+    A comment line is sent after `TASKAPP_EVENT_HEARTBEAT` idle seconds so proxies keep the
+    connection open and dead clients are noticed.
+    """
+    broker = get_broker()
+    heartbeat = getattr(settings, 'TASKAPP_EVENT_HEARTBEAT', 15)
+    subscription = broker.subscribe(user_id)
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                yield await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def session_user_id(headers):
+    """
+    Returns the id of the user logged in with the session cookie in `headers`, or None.
+    """
+    cookies = parse_cookie(b'; '.join(value for name, value in headers if name == b'cookie').decode('latin-1'))
+    session_key = cookies.get(settings.SESSION_COOKIE_NAME)
+    if not session_key:
+        return None
+    try:
+        engine = import_module(settings.SESSION_ENGINE)
+        user = get_user(SimpleNamespace(session=engine.SessionStore(session_key)))
+        return user.pk if user.is_authenticated else None
+    finally:
+        close_old_connections()
+
+
+class EventStreamApplication:
+    """
+    ASGI middleware that serves the event streams of logged in users on the event loop.
+
+    Django runs each ASGI request in its own thread-sensitive context, which holds a thread
+    until the response has been sent, i.e. for the whole life of a stream. Authenticated GET
+    requests to the events URL are answered here instead, so an idle stream costs no thread.
+    Everything else, including requests without a valid session, goes to `application`.
+
+    Example:
+        application = EventStreamApplication(get_asgi_application())
+    """
+    def __init__(self, application):
+        self.application = application
+        self.path = None
+
+    async def __call__(self, scope, receive, send):
+        if self.path is None:
+            self.path = reverse('task-events')
+        if scope['type'] == 'http' and scope['method'] == 'GET' and scope['path'] == self.path:
+            user_id = await sync_to_async(session_user_id, thread_sensitive=False)(scope['headers'])
+            if user_id is not None:
+                return await self.stream(user_id, receive, send)
+        await self.application(scope, receive, send)
+
+    async def stream(self, user_id, receive, send):
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no')],
+        })
+
+        async def send_events():
+            async for message in stream_events(user_id):
+                await send({'type': 'http.response.body', 'body': message.encode(), 'more_body': True})
+
+        async def wait_for_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        tasks = [asyncio.create_task(wait_for_disconnect()), asyncio.create_task(send_events())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
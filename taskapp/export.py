@@ -0,0 +1,84 @@
+"""
+Incremental task exports.
+
+Rows are read with `.values_list().iterator(chunk_size)` and formatted by `TaskValuesSerializer`
+one chunk at a time, and each format yields the encoded text of a chunk as soon as it is
+ready. Memory therefore depends on the chunk size, not on the number of tasks exported.
+
+Under ASGI the encoded chunks are handed out by `aiter_chunks`, since Django reads a synchronous
+iterator into a list before sending any of it.
+"""
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from .serializers import TaskValuesSerializer
+
+
+def iter_task_chunks(queryset, chunk_size):
+    """
+    Yields the serialized tasks of `queryset` in lists of at most `chunk_size`.
+    """
+    serializer = TaskValuesSerializer()
+    rows = queryset.values_list(*serializer.columns).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        yield serializer.format(chunk)
+
+
+def dumps(task):
+    # Matches the API's JSON rendering: compact and without escaping non-ASCII characters.
+    return json.dumps(task, ensure_ascii=False, separators=(',', ':'))
+
+
+def export_ndjson(chunks):
+    for tasks in chunks:
+        yield ''.join(f'{dumps(task)}\n' for task in tasks)
+
+
+def export_json(chunks):
+    yield '['
+    separator = ''
+    for tasks in chunks:
+        yield separator + ','.join(dumps(task) for task in tasks)
+        separator = ','
+    yield ']'
+
+
+class Echo:
+    """
+    A file-like object handing back what is written to it, for `csv.writer`.
+    """
+    def write(self, value):
+        return value
+
+
+def export_csv(chunks):
+    writer = csv.writer(Echo())
+    yield writer.writerow(TaskValuesSerializer().names)
+    for tasks in chunks:
+        yield ''.join(writer.writerow(task.values()) for task in tasks)
+
+
+async def aiter_chunks(chunks):
+    """
+    Yields the items of the synchronous iterator `chunks`, fetching each one with `sync_to_async`.
+
+    The fetches are thread sensitive, so the database cursor is always used from the thread that
+    runs the view and owns its connection.
+    """
+    fetch = sync_to_async(next)
+    try:
+        while (chunk := await fetch(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
+
+
+# Format name: (writer, content type, file extension)
+EXPORT_FORMATS = {
+    'ndjson': (export_ndjson, 'application/x-ndjson', 'ndjson'),
+    'json': (export_json, 'application/json', 'json'),
+    'csv': (export_csv, 'text/csv', 'csv'),
+}
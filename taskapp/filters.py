@@ -0,0 +1,81 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
+
+from .models import Category, Task
+
+
+def day_start(day):
+    # Days are those of the default time zone, like the due days of the dashboard statistics.
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_default_timezone())
+
+
+class TaskFilterSet(filters.FilterSet):
+    """
+    Filters for the task lists.
+
+    `due_date` matches an exact date and time, and `due_date__gte`/`due_date__lte` a range of
+    them. `due_after` and `due_before` take plain dates and include the whole day, so passing
+    the same date to both returns the tasks due that day. All of them become a range on the
+    due_date column, which the (assigned_to, due_date) and (assigned_to, status, due_date)
+    indexes cover.
+
+    `status` and `priority` can be repeated to match any of the given values.
+
+    `category` takes a category name and matches it the way categories are matched when
+    tasks are saved, ignoring case and spacing.
+
+    Example:
+        curl -X GET "http://localhost:8000/tasks/?priority=HI&priority=ME&due_after=2024-03-01&due_before=2024-03-31"
+    """
+    status = filters.MultipleChoiceFilter(choices=Task.STATUS_CHOICES, method='filter_in')
+    priority = filters.MultipleChoiceFilter(choices=Task.PRIORITY_CHOICES, method='filter_priority')
+    due_after = filters.DateFilter(method='filter_due_after')
+    due_before = filters.DateFilter(method='filter_due_before')
+    category = filters.CharFilter(method='filter_category')
+
+    class Meta:
+        model = Task
+        fields = {'due_date': ['exact', 'gte', 'lte']}
+
+    def filter_in(self, queryset, name, value):
+        return queryset.filter(**{f'{name}__in': value})
+
+    def filter_priority(self, queryset, name, value):
+        # Matched on the rank so the (assigned_to, status, priority_rank) index serves both
+        # the filter and the priority ordering.
+        return queryset.filter(priority_rank__in=[Task.PRIORITY_RANKS[priority] for priority in value])
+
+    def filter_due_after(self, queryset, name, value):
+        return queryset.filter(due_date__gte=day_start(value))
+
+    def filter_due_before(self, queryset, name, value):
+        return queryset.filter(due_date__lt=day_start(value + timedelta(days=1)))
+
+    def filter_category(self, queryset, name, value):
+        # Matched on the key copied onto the tasks, which the (assigned_to, status, category_key)
+        # index covers along with the category ordering.
+        return queryset.filter(category_key=Category.normalize(value))
+
+
+class TaskOrderingFilter(OrderingFilter):
+    """
+    `OrderingFilter` that sorts `priority` from Low to High rather than alphabetically.
+
+    Clients keep passing `ordering=priority` (or `-priority` for High first); the tasks are
+    sorted on the stored `priority_rank` column instead, which is indexed with the user and
+    status like the other sortable columns. `ordering=category` likewise sorts on the
+    `category_key` copied onto the tasks rather than joining their categories.
+    """
+    aliases = {'priority': 'priority_rank', 'category': 'category_key'}
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return [
+            ('-' if field.startswith('-') else '') + self.aliases.get(field.lstrip('-'), field.lstrip('-'))
+            for field in ordering
+        ]
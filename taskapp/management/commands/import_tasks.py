@@ -0,0 +1,179 @@
+import csv
+import json
+import os
+import time
+from collections import Counter
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from taskapp.models import Category, Task, User
+from taskapp.serializers import TaskSerializer
+from taskapp.signals import tasks_bulk_changed
+from taskapp.summary import count_in, task_values
+
+
+class Command(BaseCommand):
+    """
+    Imports tasks from a CSV or NDJSON file, such as the ones written by /tasks/export/.
+
+    Each row holds the TaskSerializer fields and the username of its owner under `assigned_to`
+    (or `--user` gives the owner of every row). Rows are streamed from the file, validated with
+    the TaskSerializer rules, and written with one `bulk_create` per batch, each batch in its own
+    transaction. Titles already used by the owner, in the database or earlier in the file, are
+    rejected. Rejected rows are appended to the `--rejects` file with their errors.
+
+    After every batch the number of rows read is saved to the `--checkpoint` file, so an
+    interrupted import picks up where it stopped when run again. The checkpoint is removed once
+    the file has been imported.
+
+    Example:
+        python manage.py import_tasks tasks.csv --batch-size 5000
+        python manage.py import_tasks tasks.ndjson --user alice
+    """
+    help = "Imports tasks from a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="The CSV or NDJSON file to import.")
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help="The file format (by default guessed from the extension).")
+        parser.add_argument('--user', help="Username owning every row, for files without an assigned_to column.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Number of rows validated and inserted per transaction.")
+        parser.add_argument('--checkpoint', help="Where progress is saved (default: <path>.checkpoint).")
+        parser.add_argument('--rejects', help="Where rejected rows are written (default: <path>.rejects.ndjson).")
+        parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint and start from the first row.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        checkpoint_path = options['checkpoint'] or f'{path}.checkpoint'
+        rejects_path = options['rejects'] or f'{path}.rejects.ndjson'
+
+        progress = {'rows': 0, 'imported': 0, 'rejected': 0}
+        if os.path.exists(checkpoint_path) and not options['restart']:
+            with open(checkpoint_path) as checkpoint:
+                progress = json.load(checkpoint)
+            self.stdout.write(f"Resuming after row {progress['rows']}.")
+
+        self.serializer = TaskSerializer()
+        self.user_ids = {}
+        self.default_user = options['user']
+        if self.default_user and self.get_user_ids([self.default_user])[self.default_user] is None:
+            raise CommandError(f"Unknown user '{self.default_user}'.")
+
+        start = time.perf_counter()
+        imported = rejected = 0
+        with open(path, newline='', encoding='utf-8') as source, open(rejects_path, 'a', encoding='utf-8') as rejects:
+            rows = self.read_rows(source, file_format)
+            # Skip the rows handled by an earlier run.
+            for _ in islice(rows, progress['rows']):
+                pass
+            while batch := list(islice(rows, options['batch_size'])):
+                number = progress['rows'] + 1
+                accepted, errors = self.validate(batch, number)
+                try:
+                    # The categories are created in the transaction too, so a failed batch
+                    # leaves none behind.
+                    with transaction.atomic():
+                        tasks = self.create_tasks(accepted)
+                except IntegrityError as exc:
+                    raise CommandError(f"Rows {number}-{number + len(batch) - 1} conflict with tasks written meanwhile, run the command again to resume: {exc}")
+
+                for error in errors:
+                    rejects.write(json.dumps(error, ensure_ascii=False) + '\n')
+                rejects.flush()
+                imported += len(tasks)
+                rejected += len(errors)
+                progress = {
+                    'rows': progress['rows'] + len(batch),
+                    'imported': progress['imported'] + len(tasks),
+                    'rejected': progress['rejected'] + len(errors),
+                }
+                self.save_checkpoint(checkpoint_path, progress)
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"{progress['rows']} rows read, {progress['imported']} imported, {progress['rejected']} rejected.")
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        elapsed = time.perf_counter() - start
+        rate = (imported + rejected) / elapsed if elapsed else 0
+        self.stdout.write(f"Imported {imported} task(s), rejected {rejected} in {elapsed:.3f}s ({rate:.0f} rows/s).")
+        if progress['rejected']:
+            self.stdout.write(f"Rejected rows were written to {rejects_path}.")
+
+    def read_rows(self, source, file_format):
+        if file_format == 'csv':
+            yield from csv.DictReader(source)
+            return
+        for line in source:
+            if line.strip():
+                yield json.loads(line)
+
+    def get_user_ids(self, usernames):
+        """
+        Returns the ids of the given usernames (None for unknown ones), querying only the
+        usernames not seen before.
+        """
+        missing = set(usernames) - self.user_ids.keys()
+        if missing:
+            found = dict(User.objects.filter(username__in=missing).values_list('username', 'id'))
+            self.user_ids.update({username: found.get(username) for username in missing})
+        return self.user_ids
+
+    def validate(self, batch, number):
+        """
+        Validates a batch of rows, returning the (user id, category name, data) of the rows to
+        insert and the rejected rows.
+        """
+        user_ids = self.get_user_ids({row.get('assigned_to') or self.default_user for row in batch} - {None})
+        candidates, errors = [], []
+        for row_number, row in enumerate(batch, number):
+            username = row.get('assigned_to') or self.default_user
+            try:
+                if user_ids.get(username) is None:
+                    raise serializers.ValidationError({'assigned_to': [f"Unknown user '{username}'."]})
+                data = self.serializer.run_validation(row)
+            except serializers.ValidationError as exc:
+                errors.append({'row': row_number, 'errors': exc.detail, 'data': row})
+                continue
+            candidates.append((row_number, row, user_ids[username], data))
+
+        # One query finds the titles the owners already use.
+        taken = set(Task.objects.filter(
+            assigned_to_id__in={user_id for _, _, user_id, _ in candidates},
+            title__in={data['title'] for _, _, _, data in candidates},
+        ).values_list('assigned_to_id', 'title'))
+        accepted = []
+        for row_number, row, user_id, data in candidates:
+            key = (user_id, data['title'])
+            if key in taken:
+                errors.append({'row': row_number, 'errors': {'title': [f"{row.get('assigned_to') or self.default_user} already has a task with this title."]}, 'data': row})
+                continue
+            taken.add(key)
+            accepted.append((user_id, data.pop('category')['name'], data))
+        errors.sort(key=lambda error: error['row'])
+        return accepted, errors
+
+    def create_tasks(self, accepted):
+        """
+        Inserts the validated rows of a batch, returning the created tasks.
+        """
+        # One query finds the categories of the batch (two more create the new ones).
+        categories = Category.objects.for_names((user_id, name) for user_id, name, _ in accepted)
+        tasks = [
+            Task(assigned_to_id=user_id, category=categories[user_id, Category.normalize(name)], **data)
+            for user_id, name, data in accepted
+        ]
+        Task.objects.bulk_create(tasks)
+        summary_deltas = Counter()
+        for task in tasks:
+            count_in(summary_deltas, task_values(task), 1)
+        tasks_bulk_changed.send(sender=Task, user_ids={task.assigned_to_id for task in tasks}, summary_deltas=summary_deltas)
+        return tasks
+
+    def save_checkpoint(self, path, progress):
+        # Written to a temporary file first so a crash never leaves a truncated checkpoint.
+        with open(f'{path}.tmp', 'w') as checkpoint:
+            json.dump(progress, checkpoint)
+        os.replace(f'{path}.tmp', path)
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from taskapp.models import Task
+from taskapp.signals import tasks_bulk_changed
+from taskapp.summary import status_deltas
+
+
+class Command(BaseCommand):
+    """
+    Moves every in-progress task whose due date has passed to 'OV' (Overdue).
+
+    Expired tasks are found through the (status, due_date) index and moved with set based
+    UPDATE statements of at most `--batch-size` rows, each in its own short transaction, so
+    millions of rows can be processed without loading model instances or holding long locks.
+
+    Example:
+        python manage.py mark_overdue --batch-size 5000
+        python manage.py mark_overdue --loop --interval 60
+    """
+    help = "Marks in-progress tasks that are past their due date as overdue."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Maximum number of tasks updated per statement.")
+        parser.add_argument('--loop', action='store_true', help="Keep running, checking for expired tasks every --interval seconds.")
+        parser.add_argument('--interval', type=float, default=60, help="Seconds to wait between runs when --loop is given.")
+
+    def handle(self, *args, **options):
+        while True:
+            moved, elapsed = self.mark_overdue(options['batch_size'])
+            self.stdout.write(f"Marked {moved} task(s) as overdue in {elapsed:.3f}s.")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def mark_overdue(self, batch_size):
+        start = time.perf_counter()
+        now = timezone.now()
+        expired = Task.objects.filter(status='IP', due_date__lt=now)
+        moved = 0
+        while True:
+            with transaction.atomic():
+                # Locked, so the summary groups counted below are the ones the UPDATE moves.
+                rows = list(expired.select_for_update().order_by('due_date').values_list('id', 'assigned_to_id')[:batch_size])
+                if not rows:
+                    break
+                # Repeat the conditions so tasks changed since the SELECT are left alone.
+                batch = expired.filter(id__in=[task_id for task_id, _ in rows])
+                summary_deltas = status_deltas(batch, 'OV')
+                moved += batch.update(status='OV', updated_at=timezone.now())
+                tasks_bulk_changed.send(sender=Task, user_ids={user_id for _, user_id in rows}, summary_deltas=summary_deltas)
+        return moved, time.perf_counter() - start
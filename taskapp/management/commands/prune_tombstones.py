@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from taskapp.models import TaskTombstone
+
+
+class Command(BaseCommand):
+    """
+    Deletes the tombstones of tasks removed longer ago than `TASKAPP_TOMBSTONE_RETENTION`.
+
+    Clients whose sync token is older than the retention get a full reset from
+    /tasks/changes/, so these tombstones are no longer needed. Rows are deleted through the
+    deleted_at index in batches of at most `--batch-size`.
+
+    Example:
+        python manage.py prune_tombstones --batch-size 5000
+    """
+    help = "Deletes task tombstones older than the sync retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Maximum number of tombstones deleted per statement.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        expired = TaskTombstone.objects.filter(deleted_at__lt=timezone.now() - settings.TASKAPP_TOMBSTONE_RETENTION)
+        pruned = 0
+        while True:
+            ids = list(expired.order_by('deleted_at').values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            pruned += TaskTombstone.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(f"Pruned {pruned} tombstone(s) in {time.perf_counter() - start:.3f}s.")
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from taskapp.models import User
+from taskapp.summary import rebuild_summaries
+
+
+class Command(BaseCommand):
+    """
+    Recounts the task summaries behind /tasks/stats/ from the task table.
+
+    The summaries are maintained incrementally, so this is only needed to correct drift, e.g.
+    after tasks were changed with raw SQL. Users are recounted `--batch-size` at a time, each
+    batch in its own transaction, and the number of summary rows that were wrong is reported.
+
+    Example:
+        python manage.py rebuild_task_summaries
+        python manage.py rebuild_task_summaries --user alice
+    """
+    help = "Recounts the per-user task summaries used by the dashboard statistics."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', help="Only recount this user (may be repeated).")
+        parser.add_argument('--batch-size', type=int, default=500, help="Number of users recounted per transaction.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        users = User.objects.order_by('id')
+        if options['user']:
+            users = users.filter(username__in=options['user'])
+        user_ids = list(users.values_list('id', flat=True))
+
+        drift = 0
+        batch_size = options['batch_size']
+        for index in range(0, len(user_ids), batch_size):
+            drift += rebuild_summaries(user_ids[index:index + batch_size])
+        self.stdout.write(f"Recounted {len(user_ids)} user(s), fixed {drift} summary row(s) in {time.perf_counter() - start:.3f}s.")
@@ -0,0 +1,154 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from taskapp.models import Category, Task, User
+from taskapp.search import install_search_index, uninstall_search_index
+from taskapp.signals import tasks_bulk_changed
+
+WORDS = [
+    'report', 'review', 'deploy', 'invoice', 'meeting', 'design', 'budget', 'release', 'backup',
+    'interview', 'migration', 'roadmap', 'feedback', 'audit', 'training', 'support', 'cleanup',
+    'quarterly', 'weekly', 'client', 'server', 'garden', 'groceries', 'dentist', 'travel',
+]
+CATEGORIES = ['Work', 'Personal', 'Home', 'Finance', 'Health', 'Errands', 'Learning', 'Travel', 'Family', 'Side project']
+
+# Most tasks end up completed and few overdue; Medium is the default choice of most people.
+STATUS_WEIGHTS = {'CO': 55, 'IP': 35, 'OV': 10}
+PRIORITY_WEIGHTS = {'ME': 50, 'LO': 30, 'HI': 20}
+# Mean distance of the due dates from now, in days: in-progress tasks are due soon, completed
+# ones were due over the last months and overdue ones over the last days.
+DUE_DAYS = {'IP': 10, 'CO': -45, 'OV': -7}
+
+
+class Command(BaseCommand):
+    """
+    Generates users and tasks for load tests and benchmarks.
+
+    Creates `--users` users named `<prefix>1`, `<prefix>2`, ... sharing the `--password`, each
+    with `--tasks` tasks. Values are skewed like real boards: most tasks are completed and of
+    Medium priority, a few categories of each user hold most of their tasks, and due dates
+    cluster around the present according to the status. Users and categories are written with
+    `bulk_create` and tasks with `executemany()`, `--batch-size` tasks per transaction, and the
+    summaries of each batch of users are recounted once. The same `--seed` generates the same
+    data.
+
+    Tasks are indexed for search by the triggers as they are inserted. With
+    `--rebuild-search-index` the index is dropped during the load instead and rebuilt from the
+    whole table at the end, which on SQLite is about twice as fast, but searches made during
+    the load find nothing, so only use it on a database no server is using. The index is
+    rebuilt even if the load fails.
+
+    Example:
+        python manage.py seed_tasks --users 1000 --tasks 10000
+        python manage.py seed_tasks --users 10 --tasks 500 --prefix demo --password demo-password
+    """
+    help = "Generates users and tasks with a realistic distribution of values."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help="Number of users to create.")
+        parser.add_argument('--tasks', type=int, default=1000, help="Number of tasks per user.")
+        parser.add_argument('--prefix', default='loaduser', help="Prefix of the usernames.")
+        parser.add_argument('--password', default='loadtest-password', help="Password of every user.")
+        parser.add_argument('--batch-size', type=int, default=10000, help="Number of tasks inserted per transaction.")
+        parser.add_argument('--seed', type=int, default=0, help="Seed of the random generator.")
+        parser.add_argument('--rebuild-search-index', action='store_true', help="Drop the search index during the load and rebuild it at the end, breaking search meanwhile.")
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        usernames = [f'{prefix}{number}' for number in range(1, options['users'] + 1)]
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f"Users starting with '{prefix}' already exist, pick another --prefix.")
+
+        start = time.perf_counter()
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        # Picked from a pool: generating every description costs more than inserting it.
+        self.descriptions = [' '.join(self.rng.choices(WORDS, k=self.rng.randint(3, 20))) for _ in range(1000)]
+        # Hashing is deliberately slow, so every user gets the same hash.
+        password = make_password(options['password'])
+        users_per_batch = max(1, options['batch_size'] // max(1, options['tasks']))
+        self.updated_at = connection.ops.adapt_datetimefield_value(self.now)
+        created = 0
+        if options['rebuild_search_index']:
+            with connection.schema_editor() as editor:
+                uninstall_search_index(editor)
+        try:
+            for index in range(0, len(usernames), users_per_batch):
+                with transaction.atomic():
+                    users = User.objects.bulk_create([User(username=username, email=f'{username}@tasky.com', password=password) for username in usernames[index:index + users_per_batch]])
+                    categories = self.create_categories(users)
+                    for user in users:
+                        for batch_start in range(0, options['tasks'], options['batch_size']):
+                            batch_end = min(batch_start + options['batch_size'], options['tasks'])
+                            self.insert_tasks(self.generate_tasks(user, categories[user.pk], batch_start, batch_end))
+                            created += batch_end - batch_start
+                tasks_bulk_changed.send(sender=Task, user_ids=[user.pk for user in users])
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"{index + len(users)} users, {created} tasks.")
+        finally:
+            if options['rebuild_search_index']:
+                with connection.schema_editor() as editor:
+                    install_search_index(editor)
+
+        elapsed = time.perf_counter() - start
+        rate = created / elapsed if elapsed else 0
+        self.stdout.write(f"Created {len(usernames)} user(s) and {created} task(s) in {elapsed:.3f}s ({rate:.0f} tasks/s).")
+
+    def create_categories(self, users):
+        """
+        Gives each user 2 to 8 categories, returned with their weights: the nth category of a
+        user is picked 1/n as often as the first.
+        """
+        names = {user.pk: self.rng.sample(CATEGORIES, self.rng.randint(2, 8)) for user in users}
+        found = Category.objects.for_names((user_id, name) for user_id, user_names in names.items() for name in user_names)
+        return {
+            user_id: ([found[user_id, Category.normalize(name)] for name in user_names], [1 / rank for rank in range(1, len(user_names) + 1)])
+            for user_id, user_names in names.items()
+        }
+
+    def generate_tasks(self, user, categories, start, end):
+        """
+        Returns the column values of the tasks numbered `start` to `end` of the user.
+        """
+        rng = self.rng
+        categories, weights = categories
+        statuses = rng.choices(list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values()), k=end - start)
+        priorities = rng.choices(list(PRIORITY_WEIGHTS), list(PRIORITY_WEIGHTS.values()), k=end - start)
+        chosen = rng.choices(categories, weights, k=end - start)
+        adapt = connection.ops.adapt_datetimefield_value
+        return [
+            (
+                f'{rng.choice(WORDS)} {rng.choice(WORDS)} #{number}',
+                rng.choice(self.descriptions),
+                status,
+                priority,
+                adapt(self.due_date(status)),
+                category.pk,
+                category.key,
+                user.pk,
+                self.updated_at,
+            )
+            for number, status, priority, category in zip(range(start, end), statuses, priorities, chosen)
+        ]
+
+    def insert_tasks(self, rows):
+        # Building model instances and compiling bulk_create() SQL costs several times more than
+        # the inserts themselves, which matters at millions of rows.
+        fields = [Task._meta.get_field(name) for name in ['title', 'description', 'status', 'priority', 'due_date', 'category', 'category_key', 'assigned_to', 'updated_at']]
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {quote(Task._meta.db_table)} ({', '.join(quote(field.column) for field in fields)}) "
+                f"VALUES ({', '.join(['%s'] * len(fields))})",
+                rows,
+            )
+
+    def due_date(self, status):
+        days = self.rng.expovariate(1 / abs(DUE_DAYS[status]))
+        return self.now + timedelta(days=days if DUE_DAYS[status] > 0 else -days)
@@ -0,0 +1,248 @@
+"""
+Per-request performance metrics.
+
+When `TASKAPP_METRICS` is enabled, `PerformanceMiddleware` records for every request the number
+of SQL queries and the time spent running them, the time spent serializing tasks, the total time
+and the size of the response. They are sent back in a `Server-Timing` header, logged as one JSON
+line on the `taskapp.metrics` logger, and added to in-process histograms labelled with the URL
+name, which `/metrics/` exposes in the Prometheus text format.
+
+Queries are counted by a wrapper added to the `execute_wrappers` of every database connection as
+it is opened, like `connection.execute_wrapper()` does for the duration of a block. It records
+into the metrics of the current request, held in a context variable, so the queries the async
+views run through `sync_to_async` are counted too. Histograms are kept per process: scrape every
+worker, or run a single one, to see all requests.
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger('taskapp.metrics')
+
+current_metrics = ContextVar('taskapp_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    What one request cost so far. Times are in seconds.
+    """
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.size = 0
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def measure_serialization():
+    """
+    Adds the time spent in the block to the serialization time of the current request, leaving
+    out the queries run by querysets evaluated inside it.
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    start, db_time = time.perf_counter(), metrics.db_time
+    try:
+        yield
+    finally:
+        metrics.serialize_time += time.perf_counter() - start - (metrics.db_time - db_time)
+
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed buckets, one series per label value.
+    """
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            # label -> [count per bucket (plus +Inf), sum]
+            self.series = {}
+
+    def observe(self, label, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.setdefault(label, [[0] * (len(self.buckets) + 1), 0])
+            series[0][index] += 1
+            series[1] += value
+
+    def snapshot(self):
+        with self.lock:
+            return {label: (list(counts), total) for label, (counts, total) in self.series.items()}
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        for label, (counts, total) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip([*map(str, self.buckets), '+Inf'], counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{view="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{view="{label}"}} {total:g}')
+            lines.append(f'{self.name}_count{{view="{label}"}} {cumulative}')
+        return lines
+
+
+TIME_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+histograms = {
+    'duration': Histogram('taskapp_request_duration_seconds', 'Time taken to answer the request.', TIME_BUCKETS),
+    'db_time': Histogram('taskapp_request_db_seconds', 'Time spent running SQL queries.', TIME_BUCKETS),
+    'serialize_time': Histogram('taskapp_request_serialize_seconds', 'Time spent serializing tasks.', TIME_BUCKETS),
+    'queries': Histogram('taskapp_request_queries', 'Number of SQL queries run.', [0, 1, 2, 5, 10, 20, 50, 100]),
+    'size': Histogram('taskapp_response_size_bytes', 'Size of the response body.', [1_000, 10_000, 100_000, 1_000_000, 10_000_000]),
+}
+
+
+def reset():
+    for histogram in histograms.values():
+        histogram.reset()
+
+
+def render():
+    """
+    Returns the histograms in the Prometheus text exposition format.
+    """
+    return '\n'.join(line for histogram in histograms.values() for line in histogram.render()) + '\n'
+
+
+class PerformanceMiddleware:
+    """
+    Measures each request and reports it as described in the module docstring.
+
+    Put it first in `MIDDLEWARE` so the session and user queries are counted. Streamed responses
+    are recorded once the stream ends, so their queries and size are included, but their
+    `Server-Timing` header only covers what ran before the first chunk.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'TASKAPP_METRICS', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.process(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.process(request, response, metrics)
+
+    def process(self, request, response, metrics):
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f'serialize;dur={metrics.serialize_time * 1000:.1f}',
+            f'total;dur={(time.perf_counter() - metrics.start) * 1000:.1f}',
+        ])
+        if not response.streaming:
+            metrics.size = len(response.content)
+            self.record(request, response, metrics)
+        elif response.is_async:
+            response.streaming_content = self.astream(request, response, metrics, response.streaming_content)
+        else:
+            response.streaming_content = self.stream(request, response, metrics, response.streaming_content)
+        return response
+
+    def stream(self, request, response, metrics, content):
+        chunks = iter(content)
+        try:
+            while True:
+                token = current_metrics.set(metrics)
+                try:
+                    chunk = next(chunks, None)
+                finally:
+                    current_metrics.reset(token)
+                if chunk is None:
+                    break
+                metrics.size += len(chunk)
+                yield chunk
+        finally:
+            self.record(request, response, metrics)
+
+    async def astream(self, request, response, metrics, content):
+        chunks = aiter(content)
+        try:
+            while True:
+                token = current_metrics.set(metrics)
+                try:
+                    chunk = await anext(chunks, None)
+                finally:
+                    current_metrics.reset(token)
+                if chunk is None:
+                    break
+                metrics.size += len(chunk)
+                yield chunk
+        finally:
+            self.record(request, response, metrics)
+
+    def record(self, request, response, metrics):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        duration = time.perf_counter() - metrics.start
+        for name, value in [
+            ('duration', duration),
+            ('db_time', metrics.db_time),
+            ('serialize_time', metrics.serialize_time),
+            ('queries', metrics.queries),
+            ('size', metrics.size),
+        ]:
+            histograms[name].observe(view, value)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'serialize_ms': round(metrics.serialize_time * 1000, 2),
+            'total_ms': round(duration * 1000, 2),
+            'bytes': metrics.size,
+        }))
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.7 on 2026-10-18 15:40
+
+from django.db import migrations
+
+from taskapp.search import install_search_index, uninstall_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskapp', '0004_task_status_board_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-18 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskapp', '0005_task_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'due_date'], name='task_status_due_idx'),
+        ),
+    ]
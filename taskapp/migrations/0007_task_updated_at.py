@@ -0,0 +1,30 @@
+# Generated by Django 5.0.7 on 2026-10-18 15:33
+
+from django.db import migrations, models
+
+from taskapp.search import install_search_index
+
+
+def reinstall_search_index(apps, schema_editor):
+    # SQLite adds the column by rebuilding taskapp_task, which drops the search triggers.
+    install_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskapp', '0006_task_status_due_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'updated_at'], name='task_user_updated_idx'),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.0.7 on 2026-10-18 15:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def count_existing_tasks(apps, schema_editor):
+    Task = apps.get_model('taskapp', 'Task')
+    TaskSummary = apps.get_model('taskapp', 'TaskSummary')
+    TaskDueSummary = apps.get_model('taskapp', 'TaskDueSummary')
+    tasks = Task.objects.order_by()
+    TaskSummary.objects.bulk_create([
+        TaskSummary(user_id=row['assigned_to'], status=row['status'], priority=row['priority'], category=row['category'], count=row['count'])
+        for row in tasks.values('assigned_to', 'status', 'priority', 'category').annotate(count=Count('id'))
+    ], batch_size=1000)
+    TaskDueSummary.objects.bulk_create([
+        TaskDueSummary(user_id=row['assigned_to'], status=row['status'], due_day=row['due_day'], count=row['count'])
+        for row in tasks.annotate(due_day=TruncDate('due_date', tzinfo=timezone.get_default_timezone()))
+        .values('assigned_to', 'status', 'due_day').annotate(count=Count('id'))
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskapp', '0008_tasktombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDueSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('IP', 'In Progress'), ('CO', 'Completed'), ('OV', 'Overdue')], max_length=2)),
+                ('due_day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('IP', 'In Progress'), ('CO', 'Completed'), ('OV', 'Overdue')], max_length=2)),
+                ('priority', models.CharField(choices=[('LO', 'Low'), ('ME', 'Medium'), ('HI', 'High')], max_length=2)),
+                ('category', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='taskduesummary',
+            constraint=models.UniqueConstraint(fields=('user', 'status', 'due_day'), name='task_due_summary_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='tasksummary',
+            constraint=models.UniqueConstraint(fields=('user', 'status', 'priority', 'category'), name='task_summary_unique'),
+        ),
+        migrations.RunPython(count_existing_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,178 @@
+# Generated by Django 5.0.7 on 2026-10-18 16:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+from taskapp.search import install_search_index, uninstall_search_index
+
+
+def normalize(name):
+    # Same as Category.normalize, which historical models do not have.
+    return ' '.join(name.split()).casefold()
+
+
+def pick_name(counts):
+    """
+    Returns the spelling most tasks use, given {spelling: tasks}, with its whitespace collapsed.
+    Ties go to a spelling without stray whitespace, then to the first in sort order.
+    """
+    name = max(sorted(counts), key=lambda name: (counts[name], name == ' '.join(name.split())))
+    return ' '.join(name.split())
+
+
+def create_categories(apps, schema_editor):
+    """
+    Creates a category for every distinct (user, normalized name) of the existing tasks and
+    points the tasks at it, named after the spelling used by most of them.
+    """
+    Task = apps.get_model('taskapp', 'Task')
+    Category = apps.get_model('taskapp', 'Category')
+    spellings = {}
+    names = Task.objects.order_by().values_list('assigned_to', 'category_name').annotate(count=Count('id'))
+    for user_id, name, count in names.iterator():
+        spellings.setdefault((user_id, normalize(name)), {})[name] = count
+    Category.objects.bulk_create([
+        Category(user_id=user_id, key=key, name=pick_name(counts))
+        for (user_id, key), counts in spellings.items()
+    ], batch_size=1000)
+    for category in Category.objects.iterator():
+        Task.objects.filter(
+            assigned_to_id=category.user_id,
+            category_name__in=list(spellings[category.user_id, category.key]),
+        ).update(category=category)
+
+
+def restore_category_names(apps, schema_editor):
+    Task = apps.get_model('taskapp', 'Task')
+    Category = apps.get_model('taskapp', 'Category')
+    for category in Category.objects.iterator():
+        Task.objects.filter(category=category).update(category_name=category.name)
+
+
+def count_existing_tasks(apps, schema_editor):
+    Task = apps.get_model('taskapp', 'Task')
+    TaskSummary = apps.get_model('taskapp', 'TaskSummary')
+    TaskSummary.objects.bulk_create([
+        TaskSummary(user_id=row['assigned_to'], status=row['status'], priority=row['priority'], category_id=row['category'], count=row['count'])
+        for row in Task.objects.order_by().values('assigned_to', 'status', 'priority', 'category').annotate(count=Count('id'))
+    ], batch_size=1000)
+
+
+def count_existing_tasks_by_name(apps, schema_editor):
+    Task = apps.get_model('taskapp', 'Task')
+    TaskSummary = apps.get_model('taskapp', 'TaskSummary')
+    TaskSummary.objects.bulk_create([
+        TaskSummary(user_id=row['assigned_to'], status=row['status'], priority=row['priority'], category=row['category__name'], count=row['count'])
+        for row in Task.objects.order_by().values('assigned_to', 'status', 'priority', 'category__name').annotate(count=Count('id'))
+    ], batch_size=1000)
+
+
+def clear_summaries(apps, schema_editor):
+    apps.get_model('taskapp', 'TaskSummary').objects.all().delete()
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor)
+
+
+def install_before_categories(apps, schema_editor):
+    install_search_index(schema_editor, before_categories=True)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskapp', '0009_task_summaries'),
+    ]
+
+    operations = [
+        # The search triggers read the category column, which SQLite will not drop while they
+        # exist. They are put back once the tasks point at their categories.
+        migrations.RunPython(uninstall, install_before_categories),
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('key', models.CharField(max_length=255)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'categories',
+                'ordering': ['key'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(fields=('user', 'key'), name='category_user_key_unique'),
+        ),
+
+        # Tasks: move the names into categories.
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_user_status_cat_idx',
+        ),
+        migrations.RenameField(
+            model_name='task',
+            old_name='category',
+            new_name='category_name',
+        ),
+        # The default only lets the column be added back, empty, when unapplying.
+        migrations.AlterField(
+            model_name='task',
+            name='category_name',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='category',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.RESTRICT, to='taskapp.category'),
+        ),
+        migrations.RunPython(create_categories, restore_category_names),
+        migrations.RemoveField(
+            model_name='task',
+            name='category_name',
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, to='taskapp.category'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'status', 'category'], name='task_user_status_cat_idx'),
+        ),
+
+        # Summaries: recounted by category.
+        migrations.RemoveConstraint(
+            model_name='tasksummary',
+            name='task_summary_unique',
+        ),
+        migrations.RunPython(clear_summaries, count_existing_tasks_by_name),
+        migrations.RemoveField(
+            model_name='tasksummary',
+            name='category',
+        ),
+        migrations.AddField(
+            model_name='tasksummary',
+            name='category',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='taskapp.category'),
+        ),
+        migrations.RunPython(count_existing_tasks, clear_summaries),
+        migrations.AlterField(
+            model_name='tasksummary',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='taskapp.category'),
+        ),
+        migrations.AddConstraint(
+            model_name='tasksummary',
+            constraint=models.UniqueConstraint(fields=('user', 'status', 'priority', 'category'), name='task_summary_unique'),
+        ),
+        migrations.RunPython(install, uninstall),
+    ]
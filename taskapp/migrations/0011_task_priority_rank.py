@@ -0,0 +1,44 @@
+# Generated by Django 5.0.7 on 2026-10-18 16:19
+
+from django.db import migrations, models
+
+from taskapp.search import install_search_index, uninstall_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskapp', '0010_category'),
+    ]
+
+    operations = [
+        # SQLite adds a generated column by rebuilding taskapp_task, so the search triggers
+        # are taken down around it.
+        migrations.RunPython(uninstall, install),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_user_status_prio_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='priority_rank',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(priority='LO', then=models.Value(1)), models.When(priority='ME', then=models.Value(2)), models.When(priority='HI', then=models.Value(3)), output_field=models.PositiveSmallIntegerField()), output_field=models.PositiveSmallIntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'status', 'priority_rank'], name='task_user_status_prio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'due_date'], name='task_user_due_idx'),
+        ),
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:02
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+from taskapp.search import install_search_index, uninstall_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_index(schema_editor)
+
+
+def copy_category_keys(apps, schema_editor):
+    Category = apps.get_model('taskapp', 'Category')
+    Task = apps.get_model('taskapp', 'Task')
+    Task.objects.update(category_key=Subquery(Category.objects.filter(pk=OuterRef('category_id')).values('key')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskapp', '0011_task_priority_rank'),
+    ]
+
+    operations = [
+        # SQLite adds the column by rebuilding taskapp_task, so the search triggers are taken
+        # down around it.
+        migrations.RunPython(uninstall, install),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_user_status_cat_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='category_key',
+            field=models.CharField(default='', editable=False, max_length=255),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_category_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'status', 'category_key'], name='task_user_status_cat_idx'),
+        ),
+        migrations.RunPython(install, uninstall),
+    ]
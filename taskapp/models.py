@@ -1,10 +1,127 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import connections, models
 from django.contrib.auth.models import AbstractUser
 # Create your models here.
 
 class User(AbstractUser):
     pass
 
+class CategoryManager(models.Manager):
+    def for_name(self, user, name):
+        """
+        Returns the user's category matching `name`, creating it if needed.
+        """
+        return self.for_names([(user.pk, name)])[(user.pk, Category.normalize(name))]
+
+    def for_names(self, names):
+        """
+        Returns the categories matching a batch of (user id, name) pairs, creating the missing
+        ones, keyed by (user id, normalized name).
+
+        Costs one query when every category exists, and three otherwise. Raises ValidationError
+        for a name whose normalized key does not fit its column.
+        """
+        wanted = {}
+        max_length = Category.key_max_length()
+        for user_id, name in names:
+            key = Category.normalize(name)
+            if len(key) > max_length:
+                raise ValidationError(f"The category name {name!r} is longer than {max_length} characters once normalized.")
+            # A new category takes the first spelling of the batch.
+            wanted.setdefault((user_id, key), Category.clean_name(name))
+        if not wanted:
+            return {}
+        found = self.filter(
+            user_id__in={user_id for user_id, _ in wanted},
+            key__in={key for _, key in wanted},
+        )
+        categories = {(category.user_id, category.key): category for category in found}
+        missing = wanted.keys() - categories.keys()
+        if missing:
+            # Conflicts are categories created by a concurrent request in the meantime.
+            self.bulk_create([Category(user_id=user_id, key=key, name=wanted[user_id, key]) for user_id, key in missing], ignore_conflicts=True)
+            found = self.filter(user_id__in={user_id for user_id, _ in missing}, key__in={key for _, key in missing})
+            categories.update({(category.user_id, category.key): category for category in found})
+        return {key: categories[key] for key in wanted}
+
+    def with_prefix(self, user, prefix):
+        """
+        Returns the user's categories whose normalized name starts with `prefix`.
+        """
+        key = Category.normalize(prefix)
+        categories = self.filter(user=user)
+        if connections[self.db].vendor == 'sqlite':
+            # SQLite compares text as bytes, so a range over the (user, key) index finds the
+            # prefix. LIKE, which Django uses for `startswith`, cannot use that index.
+            return categories.filter(key__gte=key, key__lt=key + '\U0010ffff')
+        return categories.filter(key__startswith=key)
+
+class Category(models.Model):
+    """
+    A category of a user's tasks.
+
+    Names that only differ in case or spacing are the same category: tasks are matched to a
+    category by its normalized `key`, and the category keeps the spelling it was first given.
+
+    Attributes:
+        user (User): The owner of the category.
+        name (str): The name shown for the category.
+        key (str): The normalized name, unique per user.
+
+    Example:
+        >>> Category.objects.for_name(user, "  Work ") == Category.objects.for_name(user, "work")
+        True
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    name = models.CharField(max_length=255)
+    key = models.CharField(max_length=255)
+
+    objects = CategoryManager()
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def clean_name(name):
+        return ' '.join(name.split())
+
+    @staticmethod
+    def normalize(name):
+        # casefold() can make the name longer, e.g. 'ß' becomes 'ss'.
+        return Category.clean_name(name).casefold()
+
+    @classmethod
+    def key_max_length(cls):
+        return cls._meta.get_field('key').max_length
+
+    class Meta:
+        # Also the order of tasks sorted by category.
+        ordering = ["key"]
+        verbose_name_plural = "categories"
+        constraints = [
+            # Its index also answers the prefix lookups of the autocomplete.
+            models.UniqueConstraint(fields=["user", "key"], name="category_user_key_unique"),
+        ]
+
+class TaskManager(models.Manager):
+    def get_queryset(self):
+        # Every representation of a task includes its category name.
+        return super().get_queryset().select_related('category')
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for task in objs:
+            task.copy_category_key()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if 'category' in fields:
+            objs = list(objs)
+            for task in objs:
+                task.copy_category_key()
+            fields = [*fields, 'category_key']
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
 class Task(models.Model):
     """
     Represents a task assigned to a user.
@@ -14,12 +131,16 @@ class Task(models.Model):
         description (str): A brief description of the task.
         status (str): The status of the task, one of 'IP' (In Progress), 'CO' (Completed), or 'OV' (Overdue).
         priority (str): The priority of the task, one of 'LO' (Low), 'ME' (Medium), or 'HI' (High).
+        priority_rank (int): 1 to 3 from Low to High, computed by the database from `priority`.
         due_date (datetime): The date and time the task is due.
-        category (str): The category of the task.
+        category (Category): The category of the task.
+        category_key (str): The `key` of the category, copied on every save so the tasks can be
+            filtered and sorted by category through the (assigned_to, status, category_key) index.
         assigned_to (User): The user assigned to complete the task.
+        updated_at (datetime): When the task was created or last changed.
 
     Example:
-        >>> task = Task(title="My Task", description="This is a task", status="IP", priority="ME", due_date=datetime.date(2023, 3, 15), category="Work", assigned_to=user)
+        >>> task = Task(title="My Task", description="This is a task", status="IP", priority="ME", due_date=datetime.date(2023, 3, 15), category=Category.objects.for_name(user, "Work"), assigned_to=user)
         >>> print(task)
         My Task with ME priority
     """
@@ -35,17 +156,136 @@ class Task(models.Model):
         ('HI', 'High')
     ]
 
+    # Sort order of the priorities, as string ordering would put High before Low and Medium.
+    PRIORITY_RANKS = {'LO': 1, 'ME': 2, 'HI': 3}
+
     title = models.CharField(max_length=255)
     description = models.TextField()
     status = models.CharField(max_length=2, choices=STATUS_CHOICES, default='IP')
     priority = models.CharField(max_length=2, choices=PRIORITY_CHOICES)
+    priority_rank = models.GeneratedField(
+        expression=models.Case(
+            *[models.When(priority=priority, then=models.Value(rank)) for priority, rank in PRIORITY_RANKS.items()],
+            output_field=models.PositiveSmallIntegerField(),
+        ),
+        output_field=models.PositiveSmallIntegerField(),
+        db_persist=True,
+    )
     due_date = models.DateTimeField()
-    category = models.CharField(max_length=255)
+    category = models.ForeignKey(Category, on_delete=models.RESTRICT)
+    category_key = models.CharField(max_length=255, editable=False)
     assigned_to = models.ForeignKey(User, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TaskManager()
 
     
     def __str__(self):
         return f"{self.title} with {self.priority} priority"
+
+    def copy_category_key(self):
+        if self.category_id is not None:
+            self.category_key = self.category.key
+
+    def save(self, *args, **kwargs):
+        self.copy_category_key()
+        if kwargs.get('update_fields') is not None and 'category' in kwargs['update_fields']:
+            kwargs['update_fields'] = [*kwargs['update_fields'], 'category_key']
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so the summary counts can move a saved task out of its previous group. Kept
+        # as the row it came in, since most loaded tasks are only read, see summary.loaded_values.
+        instance._loaded_row = (field_names, values)
+        return instance
     
     class Meta:
-        unique_together = ["title", "assigned_to"]
\ No newline at end of file
+        unique_together = ["title", "assigned_to"]
+        # Composite indexes matching the status board access paths:
+        # filter on (assigned_to, status) then order by one of the sortable columns.
+        indexes = [
+            models.Index(fields=["assigned_to", "status", "due_date"], name="task_user_status_due_idx"),
+            models.Index(fields=["assigned_to", "status", "category_key"], name="task_user_status_cat_idx"),
+            models.Index(fields=["assigned_to", "status", "priority_rank"], name="task_user_status_prio_idx"),
+            # Due date ranges over every status of a user.
+            models.Index(fields=["assigned_to", "due_date"], name="task_user_due_idx"),
+            # Used by the `mark_overdue` command to find expired in-progress tasks of every user.
+            models.Index(fields=["status", "due_date"], name="task_status_due_idx"),
+            # Answers max(updated_at) per user for the conditional GET validators.
+            models.Index(fields=["assigned_to", "updated_at"], name="task_user_updated_idx"),
+        ]
+
+class TaskTombstone(models.Model):
+    """
+    Records that a task was deleted, so clients syncing through `/tasks/changes/` can drop it.
+
+    Attributes:
+        task_id (int): The primary key the deleted task had.
+        assigned_to (User): The user the task belonged to.
+        deleted_at (datetime): When the task was deleted.
+    """
+    task_id = models.BigIntegerField()
+    assigned_to = models.ForeignKey(User, on_delete=models.CASCADE)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Task {self.task_id} deleted at {self.deleted_at}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["assigned_to", "deleted_at"], name="tombstone_user_deleted_idx"),
+            models.Index(fields=["deleted_at"], name="tombstone_deleted_idx"),
+        ]
+
+class TaskSummary(models.Model):
+    """
+    The number of tasks a user has with a given status, priority and category.
+
+    Kept up to date by `taskapp.summary` as tasks are written, so the dashboard statistics never
+    have to group the task table.
+
+    Attributes:
+        user (User): The owner of the tasks.
+        status (str): The status of the tasks.
+        priority (str): The priority of the tasks.
+        category (Category): The category of the tasks.
+        count (int): How many tasks the user has in this group.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    status = models.CharField(max_length=2, choices=Task.STATUS_CHOICES)
+    priority = models.CharField(max_length=2, choices=Task.PRIORITY_CHOICES)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.count} {self.status}/{self.priority}/{self.category_id} task(s) of user {self.user_id}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "status", "priority", "category"], name="task_summary_unique"),
+        ]
+
+class TaskDueSummary(models.Model):
+    """
+    The number of tasks a user has with a given status that are due on a given day.
+
+    Attributes:
+        user (User): The owner of the tasks.
+        status (str): The status of the tasks.
+        due_day (date): The day the tasks are due, in the default time zone.
+        count (int): How many tasks the user has in this group.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    status = models.CharField(max_length=2, choices=Task.STATUS_CHOICES)
+    due_day = models.DateField()
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.count} {self.status} task(s) of user {self.user_id} due on {self.due_day}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "status", "due_day"], name="task_due_summary_unique"),
+        ]
@@ -0,0 +1,171 @@
+"""
+Read replica routing.
+
+The database aliases listed in `TASKAPP_REPLICAS` hold copies of `default` kept up to date by
+the database's own replication. `ReplicaMiddleware` picks one of them for each GET or HEAD
+request to a view marked with `replica_reads = True`, and `ReplicaRouter` sends the reads of
+that request there. Everything else, writes and the reads of every other request, management
+command or background job, goes to `default`.
+
+Replicas lag behind the primary, so a request that writes sets a cookie that keeps the reads
+of that browser on the primary for `TASKAPP_REPLICA_STICKY_SECONDS`, long enough for the
+write to reach the replicas. The board refreshed after dragging a task therefore always shows
+the move. The replica is picked round-robin, or with `TASKAPP_REPLICA_SELECTION =
+'least_loaded'` the one serving the fewest requests of this process.
+
+Only the views whose reads may lag are marked: the board and the cached columns fill a cache
+that outlives the request, and `/tasks/changes/` tokens must not skip unreplicated writes, so
+they read from the primary. Streamed responses (exports, events) also read from the primary, as
+their content is produced after the middleware returns.
+"""
+import threading
+from contextvars import ContextVar
+from itertools import count
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+
+current_routing = ContextVar('taskapp_replica_routing', default=None)
+
+STICKY_COOKIE = 'taskapp_primary'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class RequestRouting:
+    """
+    The replica the reads of the current request go to, None for the primary.
+    """
+    def __init__(self):
+        self.database = None
+
+
+class ReplicaRouter:
+    """
+    Sends the reads of a request to the replica its `RequestRouting` names, and writes to the
+    primary.
+    """
+    def db_for_read(self, model, **hints):
+        routing = current_routing.get()
+        return routing.database if routing is not None else None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        databases = {DEFAULT_DB_ALIAS, *settings.TASKAPP_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class RoundRobinSelector:
+    def __init__(self, replicas):
+        self.replicas = replicas
+        self.counter = count()
+
+    def acquire(self):
+        # next() on itertools.count is atomic under the GIL.
+        return self.replicas[next(self.counter) % len(self.replicas)]
+
+    def release(self, replica):
+        pass
+
+
+class LeastLoadedSelector:
+    """
+    Picks the replica with the fewest requests in flight in this process, the next one in
+    turn among equals.
+    """
+    def __init__(self, replicas):
+        self.replicas = replicas
+        self.lock = threading.Lock()
+        self.in_flight = dict.fromkeys(replicas, 0)
+        self.counter = count()
+
+    def acquire(self):
+        with self.lock:
+            start = next(self.counter)
+            order = self.replicas[start % len(self.replicas):] + self.replicas[:start % len(self.replicas)]
+            replica = min(order, key=self.in_flight.__getitem__)
+            self.in_flight[replica] += 1
+            return replica
+
+    def release(self, replica):
+        with self.lock:
+            self.in_flight[replica] -= 1
+
+
+SELECTORS = {
+    'round_robin': RoundRobinSelector,
+    'least_loaded': LeastLoadedSelector,
+}
+
+
+class ReplicaMiddleware:
+    """
+    Picks the replica of each request and sets the sticky cookie, as described in the module
+    docstring. Inactive unless `TASKAPP_REPLICAS` lists at least one alias.
+
+    Example:
+        class TaskDetailView(generics.RetrieveAPIView):
+            replica_reads = True
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        replicas = list(getattr(settings, 'TASKAPP_REPLICAS', []))
+        if not replicas:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.selector = SELECTORS[getattr(settings, 'TASKAPP_REPLICA_SELECTION', 'round_robin')](replicas)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        routing = RequestRouting()
+        token = current_routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+            self.release(routing)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        routing = RequestRouting()
+        token = current_routing.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_routing.reset(token)
+            self.release(routing)
+        return self.process_response(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'view_class', view_func)
+        routing = current_routing.get()
+        if (
+            routing is not None
+            and request.method in SAFE_METHODS
+            and STICKY_COOKIE not in request.COOKIES
+            and getattr(view, 'replica_reads', False)
+        ):
+            routing.database = self.selector.acquire()
+
+    def release(self, routing):
+        if routing.database is not None:
+            self.selector.release(routing.database)
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                STICKY_COOKIE, '1', max_age=getattr(settings, 'TASKAPP_REPLICA_STICKY_SECONDS', 5),
+                httponly=True, samesite='Lax',
+            )
+        return response
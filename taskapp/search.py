@@ -0,0 +1,192 @@
+"""
+Full text search over a user's tasks.
+
+The index is picked by database backend:
+
+* SQLite: an FTS5 table kept in sync with `taskapp_task` and `taskapp_category` by
+  triggers, so every write path (save, delete, bulk operations, raw SQL) updates it. The
+  owner of each task is indexed as a token so a search only ever visits the rows of one user.
+* PostgreSQL: a GIN index over a `tsvector` expression of the task title and description,
+  maintained by PostgreSQL itself. An expression index cannot read the category name from
+  its own table, so categories are matched separately, through the user's categories whose
+  name matches every word.
+
+Any other backend falls back to `icontains` lookups.
+"""
+import re
+
+from django.db import connections, models
+from django.db.models import prefetch_related_objects
+
+from .models import Task
+
+SEARCH_TABLE = 'taskapp_task_search'
+SEARCH_INDEX = 'taskapp_task_search_idx'
+MAX_TERMS = 8
+
+def sqlite_install(category, category_column, triggers=()):
+    """
+    Returns the statements (re)creating the SQLite index. `category` is the SQL of the category
+    name of the task row named by `{}`, and `category_column` the task column it depends on.
+    """
+    row = f"'u' || new.assigned_to_id, new.title, new.description, {category.format('new')}"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "owner, title, description, category, tokenize='unicode61 remove_diacritics 2')",
+        f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ai",
+        f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ad",
+        f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_au",
+        f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_cu",
+        f"""CREATE TRIGGER {SEARCH_TABLE}_ai AFTER INSERT ON taskapp_task BEGIN
+            INSERT INTO {SEARCH_TABLE}(rowid, owner, title, description, category) VALUES (new.id, {row});
+        END""",
+        f"""CREATE TRIGGER {SEARCH_TABLE}_ad AFTER DELETE ON taskapp_task BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+        END""",
+        f"""CREATE TRIGGER {SEARCH_TABLE}_au AFTER UPDATE OF title, description, {category_column}, assigned_to_id ON taskapp_task BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+            INSERT INTO {SEARCH_TABLE}(rowid, owner, title, description, category) VALUES (new.id, {row});
+        END""",
+        *triggers,
+        # (Re)build the index from the rows that already exist.
+        f"DELETE FROM {SEARCH_TABLE}",
+        f"""INSERT INTO {SEARCH_TABLE}(rowid, owner, title, description, category)
+            SELECT id, 'u' || assigned_to_id, title, description, {category.format('taskapp_task')} FROM taskapp_task""",
+    ]
+
+
+SQLITE_INSTALL = sqlite_install(
+    "(SELECT name FROM taskapp_category WHERE id = {}.category_id)", 'category_id',
+    triggers=[
+        # Renaming a category reindexes its tasks.
+        f"""CREATE TRIGGER {SEARCH_TABLE}_cu AFTER UPDATE OF name ON taskapp_category BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid IN (SELECT id FROM taskapp_task WHERE category_id = new.id);
+            INSERT INTO {SEARCH_TABLE}(rowid, owner, title, description, category)
+                SELECT id, 'u' || assigned_to_id, title, description, new.name FROM taskapp_task WHERE category_id = new.id;
+        END""",
+    ],
+)
+
+# Used by the migrations that ran while the category was a column of taskapp_task.
+SQLITE_INSTALL_BEFORE_CATEGORIES = sqlite_install("{}.category", 'category')
+
+SQLITE_UNINSTALL = [
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_cu",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE}",
+]
+
+SQLITE_QUERY = f"""
+    SELECT taskapp_task.* FROM {SEARCH_TABLE}
+    JOIN taskapp_task ON taskapp_task.id = {SEARCH_TABLE}.rowid
+    WHERE {SEARCH_TABLE} MATCH %s
+    ORDER BY {SEARCH_TABLE}.rank, taskapp_task.id
+    LIMIT %s
+"""
+
+# Must stay identical to the indexed expression for PostgreSQL to use the GIN index.
+POSTGRESQL_DOCUMENT = "to_tsvector('english', title || ' ' || description)"
+
+POSTGRESQL_INSTALL = [
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_INDEX} ON taskapp_task USING GIN ({POSTGRESQL_DOCUMENT})",
+]
+
+POSTGRESQL_INSTALL_BEFORE_CATEGORIES = [
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_INDEX} ON taskapp_task "
+    "USING GIN (to_tsvector('english', title || ' ' || description || ' ' || category))",
+]
+
+POSTGRESQL_UNINSTALL = [
+    f"DROP INDEX IF EXISTS {SEARCH_INDEX}",
+]
+
+POSTGRESQL_QUERY = f"""
+    SELECT taskapp_task.* FROM taskapp_task, to_tsquery('english', %s) query
+    WHERE taskapp_task.assigned_to_id = %s AND ({POSTGRESQL_DOCUMENT} @@ query OR taskapp_task.category_id IN (
+        SELECT id FROM taskapp_category WHERE user_id = taskapp_task.assigned_to_id AND to_tsvector('english', name) @@ query
+    ))
+    ORDER BY ts_rank({POSTGRESQL_DOCUMENT}, query) DESC, taskapp_task.id
+    LIMIT %s
+"""
+
+
+def has_category_names(connection):
+    """
+    Whether `taskapp_task` still holds the category name, as before `0010_category`.
+    """
+    with connection.cursor() as cursor:
+        columns = [column.name for column in connection.introspection.get_table_description(cursor, 'taskapp_task')]
+    return 'category_id' not in columns
+
+
+def install_search_index(schema_editor, before_categories=None):
+    """
+    Creates (or rebuilds) the search index for the current database backend.
+
+    Meant to be called from migrations. On SQLite it must be called again after any migration
+    that rebuilds `taskapp_task`, since dropping the table also drops its triggers. The index is
+    built for the schema the migration runs on, so the migrations older than `0010_category`,
+    which ran while the category name was a column of `taskapp_task`, still install it;
+    `before_categories` overrides the check.
+    """
+    vendor = schema_editor.connection.vendor
+    if before_categories is None:
+        before_categories = has_category_names(schema_editor.connection)
+    if before_categories:
+        statements = {'sqlite': SQLITE_INSTALL_BEFORE_CATEGORIES, 'postgresql': POSTGRESQL_INSTALL_BEFORE_CATEGORIES}.get(vendor, [])
+    else:
+        statements = {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRESQL_INSTALL}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def uninstall_search_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRESQL_UNINSTALL}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def with_categories(tasks):
+    # Raw querysets cannot select_related(), so the categories are fetched in one extra query.
+    tasks = list(tasks)
+    prefetch_related_objects(tasks, 'category')
+    return tasks
+
+
+def search_tasks(user, query, limit):
+    """
+    Returns up to `limit` of the user's tasks matching every word of `query`, best match first.
+
+    Words are matched as prefixes so results show up while the user is still typing.
+
+    Example:
+        >>> search_tasks(user, "quarterly rep", limit=20)
+        [<Task: Quarterly report with HI priority>]
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    tasks = Task.objects.all()
+    vendor = connections[tasks.db].vendor
+    if vendor == 'sqlite':
+        words = ' AND '.join(f'"{term}"*' for term in terms)
+        match = f'owner:u{int(user.pk)} AND {{title description category}}: ({words})'
+        return with_categories(tasks.raw(SQLITE_QUERY, [match, limit]))
+    if vendor == 'postgresql':
+        match = ' & '.join(f'{term}:*' for term in terms)
+        return with_categories(tasks.raw(POSTGRESQL_QUERY, [match, user.pk, limit]))
+
+    queryset = tasks.filter(assigned_to=user)
+    for term in terms:
+        queryset = queryset.filter(
+            models.Q(title__icontains=term) | models.Q(description__icontains=term) | models.Q(category__name__icontains=term)
+        )
+    return list(queryset.order_by('id')[:limit])
@@ -0,0 +1,141 @@
+from collections import Counter
+
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .auth import invalidate_user
+from .cache import invalidate_board
+from .events import RESET, get_broker
+from .models import Category, Task, TaskTombstone, User
+from .serializers import TaskSerializer
+from .summary import TRACKED_FIELDS, apply_deltas, count_in, rebuild_summaries, task_deleted, task_saved
+
+# Sent after bulk writes that bypass the per-instance model signals (bulk_create, bulk_update
+# and queryset update()). Receivers get `user_ids`, the users whose tasks were changed, and
+# `summary_deltas`, the summary count changes of the writes (see taskapp/summary.py) or None
+# when the sender does not know them. Senders inside the write's transaction keep the counts
+# in step with the tasks.
+tasks_bulk_changed = Signal()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, raw=False, **kwargs):
+    # Tasks keep a copy of the key to be sorted and filtered by category.
+    if not created and not raw:
+        Task.objects.filter(category=instance).exclude(category_key=instance.key).update(category_key=instance.key)
+
+
+@receiver(user_logged_out)
+def user_signed_out(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user(user.pk)
+
+
+def invalidate_board_on_commit(*user_ids):
+    # Bumped before the commit, the version would let a board read from the uncommitted rows
+    # be cached as the new one.
+    transaction.on_commit(lambda: invalidate_board(*user_ids))
+
+
+def delete_tasks(queryset):
+    """
+    Deletes the tasks of `queryset`, writing their tombstones with one INSERT and their summary
+    counts with one UPDATE per group, instead of the queries of each task's post_delete
+    receivers.
+
+    Returns:
+        The ids of the deleted tasks.
+    """
+    with transaction.atomic():
+        rows = list(queryset.select_for_update().values_list('id', *TRACKED_FIELDS))
+        if not rows:
+            return []
+        summary_deltas = Counter()
+        for task_id, *values in rows:
+            count_in(summary_deltas, dict(zip(TRACKED_FIELDS, values)), -1)
+        deleted = Task.objects.filter(id__in=[task_id for task_id, *_ in rows])
+        deleted.counted_in_bulk = True
+        deleted.delete()
+        TaskTombstone.objects.bulk_create([TaskTombstone(task_id=task_id, assigned_to_id=user_id) for task_id, user_id, *_ in rows])
+        tasks_bulk_changed.send(sender=Task, user_ids={user_id for _, user_id, *_ in rows}, summary_deltas=summary_deltas)
+    return [task_id for task_id, *_ in rows]
+
+
+def deleted_in_bulk(origin):
+    # delete_tasks() does the work of the post_delete receivers for the whole batch.
+    return getattr(origin, 'counted_in_bulk', False)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, origin=None, **kwargs):
+    if not deleted_in_bulk(origin):
+        invalidate_board_on_commit(instance.assigned_to_id)
+
+
+@receiver(post_delete, sender=Task)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    # Tasks removed along with their user have nobody left to sync them.
+    if isinstance(origin, User) or deleted_in_bulk(origin):
+        return
+    TaskTombstone.objects.create(task_id=instance.pk, assigned_to_id=instance.assigned_to_id)
+
+
+@receiver(tasks_bulk_changed)
+def tasks_changed(sender, user_ids, **kwargs):
+    invalidate_board_on_commit(*user_ids)
+
+
+@receiver(post_save, sender=Task)
+def count_task_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        task_saved(instance, created)
+
+
+@receiver(post_delete, sender=Task)
+def count_task_deleted(sender, instance, origin=None, **kwargs):
+    # The summaries of a deleted user go with it.
+    if not isinstance(origin, User) and not deleted_in_bulk(origin):
+        task_deleted(instance)
+
+
+@receiver(tasks_bulk_changed)
+def count_tasks_changed(sender, user_ids, summary_deltas=None, **kwargs):
+    if summary_deltas is None:
+        # The write did not say what changed, so the users' summaries are recounted.
+        rebuild_summaries(list(user_ids))
+    else:
+        apply_deltas(summary_deltas)
+
+
+def publish_on_commit(user_id, event, data):
+    broker = get_broker()
+    transaction.on_commit(lambda: broker.publish(user_id, event, data))
+
+
+@receiver(post_save, sender=Task)
+def publish_task_saved(sender, instance, **kwargs):
+    # Skip serializing the task when nobody is watching the board.
+    if get_broker().has_subscribers(instance.assigned_to_id):
+        publish_on_commit(instance.assigned_to_id, 'saved', TaskSerializer(instance).data)
+
+
+@receiver(post_delete, sender=Task)
+def publish_task_deleted(sender, instance, origin=None, **kwargs):
+    if not deleted_in_bulk(origin) and get_broker().has_subscribers(instance.assigned_to_id):
+        publish_on_commit(instance.assigned_to_id, 'deleted', {'id': instance.pk})
+
+
+@receiver(tasks_bulk_changed)
+def publish_tasks_changed(sender, user_ids, **kwargs):
+    for user_id in user_ids:
+        if get_broker().has_subscribers(user_id):
+            publish_on_commit(user_id, RESET, {})
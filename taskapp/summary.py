@@ -0,0 +1,194 @@
+"""
+Incrementally maintained task counts for the dashboard statistics.
+
+`TaskSummary` counts the tasks of each user by (status, priority, category) and
+`TaskDueSummary` by (status, due day). Saving or deleting a task moves one unit of count from
+the groups it was loaded in to the groups it is now in, so keeping the counts costs a couple
+of single-row UPDATEs per write. Bulk writes collect the same moves for their whole batch with
+`count_in` or `status_deltas` and apply them with one UPDATE per group (`apply_deltas`); those
+that do not are recounted with grouped queries. The `rebuild_task_summaries` command recounts
+everyone to correct any drift.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Task, TaskDueSummary, TaskSummary
+
+SUMMARY_FIELDS = ['status', 'priority', 'category_id']
+DUE_SUMMARY_FIELDS = ['status', 'due_day']
+TRACKED_FIELDS = ['assigned_to_id', 'status', 'priority', 'category_id', 'due_date']
+
+
+def due_day(due_date):
+    if timezone.is_naive(due_date):
+        due_date = timezone.make_aware(due_date)
+    return timezone.localtime(due_date, timezone.get_default_timezone()).date()
+
+
+def summary_keys(values):
+    """
+    Returns the summary model and group of each table a task with these values is counted in.
+    """
+    user_id = values['assigned_to_id']
+    return [
+        (TaskSummary, {'user_id': user_id, **{field: values[field] for field in SUMMARY_FIELDS}}),
+        (TaskDueSummary, {'user_id': user_id, 'status': values['status'], 'due_day': due_day(values['due_date'])}),
+    ]
+
+
+def loaded_values(task):
+    """
+    Returns the tracked fields of `task` as it was loaded, or {} if it was not.
+    """
+    field_names, values = getattr(task, '_loaded_row', ((), ()))
+    return {field: value for field, value in zip(field_names, values) if field in TRACKED_FIELDS}
+
+
+def task_values(task):
+    return {field: getattr(task, field) for field in TRACKED_FIELDS}
+
+
+def count_in(deltas, values, delta):
+    """
+    Adds `delta` to the count of each group a task with these values is in, in the `deltas`
+    Counter.
+    """
+    for model, key in summary_keys(values):
+        deltas[model, tuple(key.items())] += delta
+
+
+def status_deltas(tasks, status):
+    """
+    Returns the deltas of moving `tasks` to `status`, counted with two grouped queries.
+    """
+    deltas = Counter()
+    for model, fields, rows in zip([TaskSummary, TaskDueSummary], [SUMMARY_FIELDS, DUE_SUMMARY_FIELDS], count_tasks(tasks)):
+        for row in rows:
+            key = {'user_id': row.user_id, **{field: getattr(row, field) for field in fields}}
+            deltas[model, tuple(key.items())] -= row.count
+            deltas[model, tuple({**key, 'status': status}.items())] += row.count
+    return deltas
+
+
+def apply_deltas(deltas):
+    for (model, key), delta in deltas.items():
+        if delta:
+            add_to_count(model, dict(key), delta)
+
+
+def add_to_count(model, key, delta):
+    if model.objects.filter(**key).update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(count=delta, **key)
+    except IntegrityError:
+        # Created by a concurrent write in the meantime.
+        model.objects.filter(**key).update(count=F('count') + delta)
+
+
+def task_saved(task, created):
+    """
+    Counts a saved task in its new groups, and out of the groups it was loaded in.
+    """
+    new = task_values(task)
+    old = loaded_values(task)
+    if not created and not all(field in old for field in TRACKED_FIELDS):
+        # Saved without having been loaded, so the groups it used to be in are unknown.
+        rebuild_summaries({task.assigned_to_id, old.get('assigned_to_id')} - {None})
+    else:
+        old_keys = [None, None] if created else [key for _, key in summary_keys(old)]
+        for (model, new_key), old_key in zip(summary_keys(new), old_keys):
+            if new_key != old_key:
+                if old_key is not None:
+                    add_to_count(model, old_key, -1)
+                add_to_count(model, new_key, 1)
+    task._loaded_row = (TRACKED_FIELDS, [new[field] for field in TRACKED_FIELDS])
+
+
+def task_deleted(task):
+    values = loaded_values(task)
+    if not all(field in values for field in TRACKED_FIELDS):
+        values = task_values(task)
+    for model, key in summary_keys(values):
+        add_to_count(model, key, -1)
+
+
+def count_tasks(tasks):
+    """
+    Groups `tasks` into unsaved summary rows.
+    """
+    summaries = [
+        TaskSummary(user_id=row['assigned_to'], status=row['status'], priority=row['priority'], category_id=row['category_id'], count=row['count'])
+        for row in tasks.values('assigned_to', *SUMMARY_FIELDS).annotate(count=Count('id')).order_by()
+    ]
+    due_summaries = [
+        TaskDueSummary(user_id=row['assigned_to'], status=row['status'], due_day=row['due_day'], count=row['count'])
+        for row in tasks.annotate(due_day=TruncDate('due_date', tzinfo=timezone.get_default_timezone()))
+        .values('assigned_to', *DUE_SUMMARY_FIELDS).annotate(count=Count('id')).order_by()
+    ]
+    return summaries, due_summaries
+
+
+def rebuild_summaries(user_ids):
+    """
+    Recounts the summaries of the given users from their tasks.
+
+    Returns:
+        The number of summary rows that were missing or held a wrong count.
+    """
+    drift = 0
+    with transaction.atomic():
+        # Counted in the transaction, so a concurrent write is either counted or applied after.
+        summaries, due_summaries = count_tasks(Task.objects.filter(assigned_to_id__in=user_ids))
+        for model, fields, rows in [(TaskSummary, SUMMARY_FIELDS, summaries), (TaskDueSummary, DUE_SUMMARY_FIELDS, due_summaries)]:
+            existing = model.objects.filter(user_id__in=user_ids, count__gt=0)
+            before = set(existing.values_list('user_id', *fields, 'count'))
+            after = {(row.user_id, *(getattr(row, field) for field in fields), row.count) for row in rows}
+            drift += len(before ^ after)
+            model.objects.filter(user_id__in=user_ids).delete()
+            model.objects.bulk_create(rows)
+    return drift
+
+
+def get_stats(user, weeks=8):
+    """
+    Returns the dashboard statistics of the user, read from the summary tables only.
+
+    Example:
+        >>> get_stats(user)['by_status']
+        {'IP': 12, 'CO': 30, 'OV': 2}
+    """
+    today = timezone.localdate(timezone=timezone.get_default_timezone())
+    week_start = today - timedelta(days=today.weekday())
+    trend_start = week_start - timedelta(weeks=weeks - 1)
+
+    breakdown = [
+        {'status': status, 'priority': priority, 'category': category, 'count': count}
+        for status, priority, category, count in TaskSummary.objects.filter(user=user, count__gt=0)
+        .order_by('status', 'priority', 'category__key').values_list('status', 'priority', 'category__name', 'count')
+    ]
+    by_status = {status: 0 for status, _ in Task.STATUS_CHOICES}
+    for row in breakdown:
+        by_status[row['status']] += row['count']
+
+    due_this_week = 0
+    trend = {trend_start + timedelta(weeks=week): 0 for week in range(weeks)}
+    for status, day, count in TaskDueSummary.objects.filter(user=user, count__gt=0, due_day__gte=trend_start).values_list(*DUE_SUMMARY_FIELDS, 'count'):
+        if status == 'IP' and today <= day < today + timedelta(days=7):
+            due_this_week += count
+        elif status == 'OV' and day <= today:
+            trend[day - timedelta(days=day.weekday())] += count
+
+    return {
+        'total': sum(by_status.values()),
+        'by_status': by_status,
+        'breakdown': breakdown,
+        'due_this_week': due_this_week,
+        'overdue_trend': [{'week': week, 'count': count} for week, count in trend.items()],
+    }
@@ -1,9 +1,48 @@
-from django.test import TestCase, Client
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
+from django.test import AsyncClient, TestCase, TransactionTestCase, Client
+from django.db import IntegrityError, close_old_connections, connection, connections, transaction
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.core.management.base import CommandError
+from io import StringIO
+import importlib
+import threading
+import time
 import unittest
-from .models import User, Task
+import warnings
+from .models import User, Category, Task, TaskTombstone, TaskSummary
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from django.urls import reverse
-from .serializers import TaskSerializer
+from .serializers import TaskSerializer, TaskValuesSerializer, serialize_tasks
+from rest_framework.renderers import JSONRenderer
+import datetime
+import os
+import tempfile
+import csv
+import json
+from unittest import mock
+from .views import BulkTaskView, TaskExportView
+from .filters import TaskFilterSet
+from .cache import board_key, build_board, get_version, stats as board_cache_stats
+from .summary import count_tasks, get_stats, rebuild_summaries
+from .events import EventStreamApplication, get_broker, stream_events
+from .signals import tasks_bulk_changed
+from asgiref.sync import async_to_sync, sync_to_async
+import asyncio
+from django.core.cache import cache
+from django.test import override_settings
+from . import metrics
+from .replicas import LeastLoadedSelector
+from .auth import user_key
+from .throttling import CacheBucketStore, LocalMemoryBucketStore, get_store
+try:
+    import psycopg2
+    import psycopg2.pool
+except ImportError:
+    psycopg2 = None
 # Create your tests here.
 
 class TestTaskModel(TestCase):
@@ -18,7 +57,7 @@ class TestTaskModel(TestCase):
             status='IP',
             priority='ME',
             due_date=due_date,
-            category='Test Category',
+            category=Category.objects.for_name(self.user, 'Test Category'),
             assigned_to=self.user
         )
         self.assertEqual(task.title, 'Test Task')
@@ -26,7 +65,7 @@ class TestTaskModel(TestCase):
         self.assertEqual(task.status, 'IP')
         self.assertEqual(task.priority, 'ME')
         self.assertEqual(task.due_date, due_date)
-        self.assertEqual(task.category, 'Test Category')
+        self.assertEqual(task.category.name, 'Test Category')
         self.assertEqual(task.assigned_to, self.user)
 
     def test_task_str_representation(self):
@@ -37,7 +76,7 @@ class TestTaskModel(TestCase):
             status='IP',
             priority='ME',
             due_date=due_date,
-            category='Test Category',
+            category=Category.objects.for_name(self.user, 'Test Category'),
             assigned_to=self.user
         )
         self.assertEqual(str(task), 'Test Task with ME priority')
@@ -50,7 +89,7 @@ class TestTaskModel(TestCase):
             status='IP',
             priority='ME',
             due_date= due_date,
-            category='Test Category',
+            category=Category.objects.for_name(self.user, 'Test Category'),
             assigned_to=self.user
         )
         with self.assertRaises(Exception):
@@ -61,7 +100,7 @@ class TestTaskModel(TestCase):
                 status='IP',
                 priority='ME',
                 due_date=due_date,
-                category='Test Category',
+                category=Category.objects.for_name(self.user, 'Test Category'),
                 assigned_to=self.user
             )
 
@@ -99,41 +138,1631 @@ class TestTaskViews(TestCase):
         self.user = User.objects.create_user(self.username, "test@tasky.com", self.password)
         self.client.login(username=self.username, password=self.password)
         self.due_date = timezone.now() + timezone.timedelta(days=3)
+        self.category = Category.objects.for_name(self.user, "Work")
+        cache.clear()
 
     def test_task_list_view(self):
         response = self.client.get(reverse("task-list"))
         self.assertEqual(response.status_code, 200)
 
     def test_task_detail_view(self):
-        task = Task.objects.create(title="Test Task", assigned_to=self.user, description="sbibiiwbbb", status="IP", priority="HI", due_date=self.due_date)
+        task = Task.objects.create(title="Test Task", assigned_to=self.user, description="sbibiiwbbb", status="IP", priority="HI", due_date=self.due_date, category=self.category)
         response = self.client.get(reverse("task-detail", args=[task.id]))
         self.assertEqual(response.status_code, 200)
 
     def test_task_update_view(self):
-        task = Task.objects.create(title="Test Task", assigned_to=self.user, description="sbibiiwbbb", status="IP", priority="HI", due_date=self.due_date)
+        task = Task.objects.create(title="Test Task", assigned_to=self.user, description="sbibiiwbbb", status="IP", priority="HI", due_date=self.due_date, category=self.category)
         response = self.client.patch(reverse("task-update", args=[task.id]), {"title": "Updated Task"}, content_type="application/json",)
         self.assertEqual(response.status_code, 200)
 
     def test_task_delete_view(self):
-        task = Task.objects.create(title="Test Task", assigned_to=self.user, description="sbibiiwbbb", status="IP", priority="HI", due_date=self.due_date)
+        task = Task.objects.create(title="Test Task", assigned_to=self.user, description="sbibiiwbbb", status="IP", priority="HI", due_date=self.due_date, category=self.category)
         response = self.client.delete(reverse("task-delete", args=[task.id]))
         self.assertEqual(response.status_code, 204)
 
     def test_in_progress_task_list_view(self):
-        Task.objects.create(title="Test Task", assigned_to=self.user, description="sbibiiwbbb", status="IP", priority="HI", due_date=self.due_date)
+        Task.objects.create(title="Test Task", assigned_to=self.user, description="sbibiiwbbb", status="IP", priority="HI", due_date=self.due_date, category=self.category)
         response = self.client.get(reverse("inprogress-tasks"))
         self.assertEqual(response.status_code, 200)
 
     def test_completed_task_list_view(self):
-        Task.objects.create(title="Test Task", assigned_to=self.user, description="sbibiiwbbb", status="CO", priority="HI", due_date=self.due_date)
+        Task.objects.create(title="Test Task", assigned_to=self.user, description="sbibiiwbbb", status="CO", priority="HI", due_date=self.due_date, category=self.category)
         response = self.client.get(reverse("completed-tasks"))
         self.assertEqual(response.status_code, 200)
 
     def test_overdue_task_list_view(self):
-        Task.objects.create(title="Test Task", assigned_to=self.user, description="sbibiiwbbb", status="OV", priority="HI", due_date=self.due_date)
+        Task.objects.create(title="Test Task", assigned_to=self.user, description="sbibiiwbbb", status="OV", priority="HI", due_date=self.due_date, category=self.category)
         response = self.client.get(reverse("overdue-tasks"))
         self.assertEqual(response.status_code, 200)
 
+    def test_status_list_view_counts_fetched_rows(self):
+        Task.objects.create(title="Test Task", assigned_to=self.user, description="sbibiiwbbb", status="IP", priority="HI", due_date=self.due_date, category=self.category)
+        Task.objects.create(title="Other Task", assigned_to=self.user, description="sbibiiwbbb", status="IP", priority="LO", due_date=self.due_date, category=self.category)
+        # session + user + the conditional GET validators + the task list itself
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("inprogress-tasks"), {"priority": "HI"})
+        self.assertEqual(response.json()["inprogress_count"], 1)
+        self.assertEqual([task["title"] for task in response.json()["tasks"]], ["Test Task"])
+
+    def test_task_board_view(self):
+        Task.objects.create(title="Task A", assigned_to=self.user, description="sbibiiwbbb", status="IP", priority="HI", due_date=self.due_date, category=self.category)
+        Task.objects.create(title="Task B", assigned_to=self.user, description="sbibiiwbbb", status="IP", priority="LO", due_date=self.due_date, category=self.category)
+        Task.objects.create(title="Task C", assigned_to=self.user, description="sbibiiwbbb", status="CO", priority="HI", due_date=self.due_date, category=self.category)
+        other = User.objects.create_user("other", "other@tasky.com", "otherpassword")
+        Task.objects.create(title="Task D", assigned_to=other, description="sbibiiwbbb", status="OV", priority="HI", due_date=self.due_date, category=Category.objects.for_name(other, "Work"))
+
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("task-board"), {"ordering": "priority"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        # Low before High: priorities sort by rank, not alphabetically.
+        self.assertEqual([task["title"] for task in data["in_progress"]], ["Task B", "Task A"])
+        self.assertEqual([task["title"] for task in data["completed"]], ["Task C"])
+        self.assertEqual(data["overdue"], [])
+        self.assertEqual((data["inprogress_count"], data["completed_count"], data["overdue_count"]), (2, 1, 0))
+
+    def test_task_board_view_filters(self):
+        Task.objects.create(title="Task A", assigned_to=self.user, description="sbibiiwbbb", status="IP", priority="HI", due_date=self.due_date, category=self.category)
+        Task.objects.create(title="Task B", assigned_to=self.user, description="sbibiiwbbb", status="CO", priority="LO", due_date=self.due_date, category=self.category)
+        response = self.client.get(reverse("task-board"), {"priority": "LO"})
+        data = response.json()
+        self.assertEqual((data["inprogress_count"], data["completed_count"], data["overdue_count"]), (0, 1, 0))
+
+class TestBoardCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        board_cache_stats.reset()
+        self.client = Client()
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        self.due_date = timezone.now() + timezone.timedelta(days=3)
+        self.task = Task.objects.create(title="Task", assigned_to=self.user, description="desc", status="IP", priority="HI", due_date=self.due_date, category=Category.objects.for_name(self.user, "Work"))
+
+    def counts(self):
+        data = self.client.get(reverse("task-board")).json()
+        return data["inprogress_count"], data["completed_count"], data["overdue_count"]
+
+    def test_board_and_status_views_share_the_cached_board(self):
+        self.client.get(reverse("task-board"))
+        # Only the session, user and validator lookups of each request are left once the board is cached.
+        with self.assertNumQueries(6):
+            self.client.get(reverse("task-board"))
+            response = self.client.get(reverse("inprogress-tasks"))
+        self.assertEqual(response.json()["inprogress_count"], 1)
+        self.assertEqual(response.json()["tasks"][0]["title"], "Task")
+        self.assertEqual(board_cache_stats.snapshot()["hits"], 2)
+        self.assertEqual(board_cache_stats.snapshot()["misses"], 1)
+
+    def test_filtered_requests_bypass_the_cache(self):
+        self.client.get(reverse("completed-tasks"))
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("completed-tasks"), {"priority": "HI"})
+        self.assertEqual(response.json()["completed_count"], 0)
+
+    def test_writes_invalidate_the_cached_board(self):
+        self.assertEqual(self.counts(), (1, 0, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse("task-update", args=[self.task.id]), {"status": "CO"}, content_type="application/json")
+        self.assertEqual(self.counts(), (0, 1, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse("task-bulk"), [{"id": self.task.id, "status": "OV"}], content_type="application/json")
+        self.assertEqual(self.counts(), (0, 0, 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("task-delete", args=[self.task.id]))
+        self.assertEqual(self.counts(), (0, 0, 0))
+
+    def test_bulk_overdue_transition_invalidates_the_cached_board(self):
+        Task.objects.filter(id=self.task.id).update(due_date=timezone.now() - timezone.timedelta(days=1))
+        self.assertEqual(self.counts(), (1, 0, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("mark_overdue", stdout=StringIO())
+        self.assertEqual(self.counts(), (0, 0, 1))
+
+    def test_board_read_before_the_commit_is_not_cached_as_the_new_one(self):
+        self.assertEqual(self.counts(), (1, 0, 0))
+        before = build_board(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.status = "CO"
+            self.task.save()
+            # A concurrent request misses the cache and stores the board it read before the commit.
+            cache.set(board_key(self.user.pk, get_version(cache, self.user.pk)), before)
+        self.assertEqual(self.counts(), (0, 1, 0))
+
+    def test_cache_stats_view(self):
+        self.assertEqual(self.client.get(reverse("task-cache-stats")).status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        self.client.get(reverse("task-board"))
+        response = self.client.get(reverse("task-cache-stats"))
+        self.assertEqual(response.json()["misses"], 1)
+
+class TestConditionalGet(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        self.due_date = timezone.now() + timezone.timedelta(days=3)
+        self.task = Task.objects.create(title="Task", assigned_to=self.user, description="desc", status="IP", priority="HI", due_date=self.due_date, category=Category.objects.for_name(self.user, "Work"))
+
+    def test_updated_at_follows_writes(self):
+        updated_at = self.task.updated_at
+        self.client.patch(reverse("task-update", args=[self.task.id]), {"status": "CO"}, content_type="application/json")
+        self.task.refresh_from_db()
+        self.assertGreater(self.task.updated_at, updated_at)
+        self.client.patch(reverse("task-bulk"), [{"id": self.task.id, "status": "OV"}], content_type="application/json")
+        self.assertGreater(Task.objects.get(id=self.task.id).updated_at, self.task.updated_at)
+
+    def test_unchanged_lists_answer_304_without_running_the_list_query(self):
+        for name in ["task-list", "inprogress-tasks", "completed-tasks", "overdue-tasks", "task-board"]:
+            response = self.client.get(reverse(name), {"ordering": "due_date"})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("no-cache", response["Cache-Control"])
+            # session + user + the validators aggregate
+            with self.assertNumQueries(3):
+                response = self.client.get(reverse(name), {"ordering": "due_date"}, HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since(self):
+        response = self.client.get(reverse("task-board"))
+        response = self.client.get(reverse("task-board"), HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_produce_a_new_etag(self):
+        etag = self.client.get(reverse("task-list"))["ETag"]
+        self.client.patch(reverse("task-update", args=[self.task.id]), {"status": "CO"}, content_type="application/json")
+        response = self.client.get(reverse("task-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        other = Task.objects.create(title="Other", assigned_to=self.user, description="desc", status="IP", priority="HI", due_date=self.due_date, category=Category.objects.for_name(self.user, "Work"))
+        response = self.client.get(reverse("task-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        other.delete()
+        response = self.client.get(reverse("task-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_deletes_move_last_modified(self):
+        last_modified = self.client.get(reverse("task-list"))["Last-Modified"]
+        other = Task.objects.create(title="Other", assigned_to=self.user, description="desc", status="IP", priority="HI", due_date=self.due_date, category=Category.objects.for_name(self.user, "Work"))
+        Task.objects.filter(id=other.id).update(updated_at=self.task.updated_at)
+        time.sleep(1)
+        other.delete()
+        response = self.client.get(reverse("task-list"), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+class TestUniqueTitleWrites(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        self.due_date = timezone.now() + timezone.timedelta(days=3)
+
+    def task_data(self, title):
+        return {"title": title, "description": "desc", "status": "IP", "priority": "HI", "due_date": self.due_date.isoformat(), "category": "Work"}
+
+    def task_queries(self, queries):
+        # Leaves out the session and user lookups.
+        return [query["sql"] for query in queries.captured_queries if '"taskapp_task"' in query["sql"]]
+
+    def test_create_duplicate_title(self):
+        self.client.post(reverse("task-list"), self.task_data("Task"), content_type="application/json")
+        response = self.client.post(reverse("task-list"), self.task_data("Task"), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), ["You already have a task with this title."])
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_update_duplicate_title(self):
+        self.client.post(reverse("task-list"), self.task_data("First"), content_type="application/json")
+        second = self.client.post(reverse("task-list"), self.task_data("Second"), content_type="application/json").json()
+        response = self.client.patch(reverse("task-update", args=[second["id"]]), {"title": "First"}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), ["You already have a task with this title."])
+        self.assertEqual(Task.objects.get(id=second["id"]).title, "Second")
+
+    def test_other_integrity_errors_are_not_reported_as_duplicates(self):
+        task = self.client.post(reverse("task-list"), self.task_data("Task"), content_type="application/json").json()
+        error = IntegrityError("FOREIGN KEY constraint failed")
+        for method, url, data in [
+            ("post", reverse("task-list"), self.task_data("Other")),
+            ("patch", reverse("task-update", args=[task["id"]]), {"status": "CO"}),
+            ("post", reverse("async-task-list"), self.task_data("Other")),
+        ]:
+            with self.subTest(url=url), mock.patch("taskapp.models.Task.save", side_effect=error), self.assertRaises(IntegrityError):
+                getattr(self.client, method)(url, data, content_type="application/json")
+
+    def test_create_runs_a_single_task_query(self):
+        # Used to be an exists() check followed by the INSERT.
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("task-list"), self.task_data("Task"), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.task_queries(queries)), 1)
+
+    def test_update_runs_two_task_queries(self):
+        # Used to be two get_object() lookups and an exists() check before the UPDATE.
+        task = self.client.post(reverse("task-list"), self.task_data("Task"), content_type="application/json").json()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(reverse("task-update", args=[task["id"]]), {"status": "CO"}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.task_queries(queries)), 2)
+
+class TestConcurrentTaskCreation(TransactionTestCase):
+    def test_parallel_creates_with_same_title(self):
+        user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        due_date = (timezone.now() + timezone.timedelta(days=3)).isoformat()
+        data = {"title": "Task", "description": "desc", "status": "IP", "priority": "HI", "due_date": due_date, "category": "Work"}
+        Category.objects.for_name(user, "Work")
+        clients = []
+        for _ in range(2):
+            client = Client()
+            client.force_login(user)
+            clients.append(client)
+        barrier = threading.Barrier(len(clients))
+        status_codes = []
+        task_queries = []
+
+        def create(client):
+            barrier.wait()
+            try:
+                with CaptureQueriesContext(connection) as queries:
+                    status_codes.append(client.post(reverse("task-list"), data, content_type="application/json").status_code)
+                task_queries.append(len([query for query in queries.captured_queries if '"taskapp_task"' in query["sql"]]))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(status_codes), [201, 400])
+        self.assertEqual(Task.objects.filter(title="Task").count(), 1)
+        # Checking the title first took an exists() query before every INSERT. Now only the
+        # failed INSERT checks that the title was what it broke.
+        self.assertEqual(sorted(task_queries), [1, 2])
+
+class TestBulkTaskView(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        self.due_date = timezone.now() + timezone.timedelta(days=3)
+
+    def create_task(self, title, user=None, status="IP"):
+        return Task.objects.create(title=title, assigned_to=user or self.user, description="desc", status=status, priority="ME", due_date=self.due_date, category=Category.objects.for_name(user or self.user, "Work"))
+
+    def task_data(self, title):
+        return {"title": title, "description": "desc", "status": "IP", "priority": "HI", "due_date": self.due_date.isoformat(), "category": "Work"}
+
+    def test_bulk_create(self):
+        self.create_task("Existing")
+        payload = [self.task_data("New 1"), self.task_data("Existing"), self.task_data("New 2"), self.task_data("New 1"), {"title": "Missing fields"}]
+        response = self.client.post(reverse("task-bulk"), payload, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual([result["status"] for result in results], ["created", "error", "created", "error", "error"])
+        self.assertEqual(results[1]["errors"], {"title": ["You already have a task with this title."]})
+        self.assertIn("priority", results[4]["errors"])
+        self.assertEqual(results[0]["task"]["id"], Task.objects.get(title="New 1").id)
+        self.assertEqual(Task.objects.filter(assigned_to=self.user).count(), 3)
+
+    def test_bulk_create_is_one_insert(self):
+        payload = [self.task_data(f"Task {i}") for i in range(20)]
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse("task-bulk"), payload, content_type="application/json")
+        inserts = [query for query in queries.captured_queries if query["sql"].startswith("INSERT INTO \"taskapp_task\"")]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Task.objects.count(), 20)
+
+    def test_bulk_update(self):
+        first, second = self.create_task("First"), self.create_task("Second")
+        other = self.create_task("Not mine", user=User.objects.create_user("other", "other@tasky.com", "otherpassword"))
+        payload = [{"id": first.id, "status": "CO"}, {"id": second.id, "status": "OV", "priority": "LO"}, {"id": other.id, "status": "CO"}, {"id": first.id, "priority": "XX"}]
+        response = self.client.patch(reverse("task-bulk"), payload, content_type="application/json")
+        self.assertEqual([result["status"] for result in response.json()], ["updated", "updated", "not_found", "error"])
+        second.refresh_from_db()
+        self.assertEqual((Task.objects.get(id=first.id).status, second.status, second.priority), ("CO", "OV", "LO"))
+        self.assertEqual(Task.objects.get(id=other.id).status, "IP")
+
+    def test_bulk_update_title_conflicts(self):
+        first, second, third = self.create_task("First"), self.create_task("Second"), self.create_task("Third")
+        payload = [{"id": first.id, "title": "Third"}, {"id": second.id, "title": "New"}, {"id": third.id, "title": "New"}, {"id": third.id, "title": "Third"}]
+        response = self.client.patch(reverse("task-bulk"), payload, content_type="application/json")
+        self.assertEqual([result["status"] for result in response.json()], ["error", "updated", "error", "updated"])
+        self.assertEqual(list(Task.objects.order_by("id").values_list("title", flat=True)), ["First", "New", "Third"])
+
+    def test_bulk_create_title_taken_after_the_check(self):
+        self.create_task("Existing")
+        # As if another request created "Existing" between the title check and the insert.
+        with mock.patch.object(BulkTaskView, "get_queryset", return_value=Task.objects.none()):
+            response = self.client.post(reverse("task-bulk"), [self.task_data("New"), dict(self.task_data("Existing"), category="Fresh")], content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), ["You already have a task with this title."])
+        self.assertEqual(list(Task.objects.values_list("title", flat=True)), ["Existing"])
+        self.assertFalse(Category.objects.filter(name="Fresh").exists())
+
+    def test_bulk_create_other_integrity_errors_are_raised(self):
+        with mock.patch.object(Task.objects, "bulk_create", side_effect=IntegrityError), self.assertRaises(IntegrityError):
+            self.client.post(reverse("task-bulk"), [self.task_data("New")], content_type="application/json")
+
+    def test_rejected_bulk_update_creates_no_categories(self):
+        task = self.create_task("First")
+        # A title taken by another request between the check and the UPDATE.
+        with mock.patch.object(Task.objects, "bulk_update", side_effect=IntegrityError), mock.patch("taskapp.views.title_taken", return_value=True):
+            response = self.client.patch(reverse("task-bulk"), [{"id": task.id, "category": "Fresh"}], content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Category.objects.filter(name="Fresh").exists())
+
+    def test_bulk_delete(self):
+        first, second = self.create_task("First"), self.create_task("Second")
+        other = self.create_task("Not mine", user=User.objects.create_user("other", "other@tasky.com", "otherpassword"))
+        response = self.client.delete(reverse("task-bulk"), {"ids": [first.id, other.id, second.id]}, content_type="application/json")
+        self.assertEqual([result["status"] for result in response.json()], ["deleted", "not_found", "deleted"])
+        self.assertEqual(list(Task.objects.values_list("title", flat=True)), ["Not mine"])
+
+    def test_bulk_rejects_non_lists(self):
+        response = self.client.post(reverse("task-bulk"), self.task_data("Task"), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.delete(reverse("task-bulk"), {}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+class TestKeysetPagination(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        now = timezone.now()
+        for i in range(7):
+            # Pairs of tasks share a due date so the id tie-breaker is exercised.
+            Task.objects.create(title=f"Task {i}", assigned_to=self.user, description="desc", status="IP" if i < 5 else "CO",
+                                priority=["LO", "ME", "HI"][i % 3], due_date=now + timezone.timedelta(days=i // 2), category=Category.objects.for_name(self.user, "Work"))
+
+    def collect_pages(self, url, params):
+        titles, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            pages += 1
+            data = response.json()
+            titles += [task["title"] for task in data.get("results", data.get("tasks", []))]
+            if not data["next"]:
+                return titles, pages, data
+            response = self.client.get(data["next"])
+
+    def test_list_is_unpaginated_by_default(self):
+        response = self.client.get(reverse("task-list"))
+        self.assertEqual(len(response.json()), 7)
+
+    def test_pages_follow_due_date_then_id(self):
+        titles, pages, _ = self.collect_pages(reverse("task-list"), {"page_size": 2})
+        expected = list(Task.objects.order_by("due_date", "id").values_list("title", flat=True))
+        self.assertEqual(titles, expected)
+        self.assertEqual(pages, 4)
+
+    def test_pages_follow_requested_ordering(self):
+        titles, _, _ = self.collect_pages(reverse("task-list"), {"page_size": 3, "ordering": "-priority"})
+        expected = list(Task.objects.order_by("-priority_rank", "-id").values_list("title", flat=True))
+        self.assertEqual(titles, expected)
+
+    def test_pages_do_not_use_offset(self):
+        first = self.client.get(reverse("task-list"), {"page_size": 2}).json()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first["next"])
+        self.assertFalse(any("OFFSET" in query["sql"] for query in queries.captured_queries))
+
+    def test_status_view_count_covers_all_pages(self):
+        titles, pages, last = self.collect_pages(reverse("inprogress-tasks"), {"page_size": 2, "priority": "LO"})
+        self.assertEqual(titles, ["Task 0", "Task 3"])
+        self.assertEqual(last["inprogress_count"], 2)
+        response = self.client.get(reverse("inprogress-tasks"), {"page_size": 2})
+        self.assertEqual(len(response.json()["tasks"]), 2)
+        self.assertEqual(response.json()["inprogress_count"], 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("task-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+        first = self.client.get(reverse("task-list"), {"page_size": 2}).json()
+        response = self.client.get(first["next"] + "&ordering=category")
+        self.assertEqual(response.status_code, 404)
+
+class TestTaskFilters(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        category = Category.objects.for_name(self.user, "Work")
+        # Task 0 is due on the 1st at 23:30 and task 3 on the 4th at 23:30.
+        start = timezone.make_aware(datetime.datetime(2024, 3, 1, 23, 30))
+        for i, (status, priority) in enumerate([("IP", "HI"), ("IP", "LO"), ("CO", "ME"), ("OV", "LO")]):
+            Task.objects.create(title=f"Task {i}", assigned_to=self.user, description="desc", status=status, priority=priority,
+                                due_date=start + timezone.timedelta(days=i), category=category)
+
+    def titles(self, params, url="task-list"):
+        response = self.client.get(reverse(url), params)
+        self.assertEqual(response.status_code, 200)
+        return [task["title"] for task in response.json()]
+
+    def test_due_date_range(self):
+        self.assertEqual(self.titles({"due_date__gte": "2024-03-02T23:30:00Z", "due_date__lte": "2024-03-03T23:30:00Z"}), ["Task 1", "Task 2"])
+        self.assertEqual(self.titles({"due_date": "2024-03-01T23:30:00Z"}), ["Task 0"])
+
+    def test_due_dates_include_the_whole_day(self):
+        self.assertEqual(self.titles({"due_after": "2024-03-02", "due_before": "2024-03-03"}), ["Task 1", "Task 2"])
+        self.assertEqual(self.titles({"due_after": "2024-03-04", "due_before": "2024-03-04"}), ["Task 3"])
+        self.assertEqual(self.titles({"due_before": "2024-02-29"}), [])
+
+    def test_multiple_statuses_and_priorities(self):
+        self.assertEqual(self.titles({"status": ["CO", "OV"]}), ["Task 2", "Task 3"])
+        self.assertEqual(self.titles({"priority": ["HI", "ME"]}), ["Task 0", "Task 2"])
+        self.assertEqual(self.titles({"priority": "LO", "status": "OV"}), ["Task 3"])
+        response = self.client.get(reverse("task-list"), {"priority": "XX"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_priority_ordering_follows_rank(self):
+        response = self.client.get(reverse("task-list"), {"ordering": "priority"})
+        self.assertEqual([task["priority"] for task in response.json()], ["LO", "LO", "ME", "HI"])
+        response = self.client.get(reverse("task-list"), {"ordering": "-priority"})
+        self.assertEqual([task["priority"] for task in response.json()], ["HI", "ME", "LO", "LO"])
+        # Pages break the tie between the two Low tasks on the id.
+        response = self.client.get(reverse("task-list"), {"ordering": "-priority", "page_size": 3})
+        page = self.client.get(response.json()["next"]).json()
+        self.assertEqual([task["title"] for task in page["results"]], ["Task 1"])
+
+    def test_filters_apply_to_the_board_and_export(self):
+        board = self.client.get(reverse("task-board"), {"priority": ["LO", "ME"], "due_after": "2024-03-03"}).json()
+        self.assertEqual((board["inprogress_count"], board["completed_count"], board["overdue_count"]), (0, 1, 1))
+        export = self.client.get(reverse("task-export", args=["ndjson"]), {"status": ["IP"], "ordering": "priority"})
+        self.assertEqual([json.loads(line)["title"] for line in b"".join(export.streaming_content).splitlines()], ["Task 1", "Task 0"])
+
+class TestTaskSearch(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.other = User.objects.create_user("other", "other@tasky.com", "otherpassword")
+        self.client.login(username="testuser", password="testpassword")
+        self.due_date = timezone.now() + timezone.timedelta(days=3)
+
+    def create_task(self, title, description="", category="Work", user=None):
+        return Task.objects.create(title=title, description=description, status="IP", priority="ME",
+                                   due_date=self.due_date, category=Category.objects.for_name(user or self.user, category), assigned_to=user or self.user)
+
+    def search(self, query, **params):
+        response = self.client.get(reverse("task-search"), {"q": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [task["title"] for task in response.json()]
+
+    def test_search_matches_title_description_and_category(self):
+        self.create_task("Quarterly report", "numbers for finance")
+        self.create_task("Groceries", "milk and eggs", category="Home")
+        self.create_task("Call plumber", "kitchen sink", category="Home")
+        self.assertEqual(self.search("quarterly"), ["Quarterly report"])
+        self.assertEqual(self.search("finance"), ["Quarterly report"])
+        self.assertEqual(sorted(self.search("home")), ["Call plumber", "Groceries"])
+        self.assertEqual(self.search("home milk"), ["Groceries"])
+
+    def test_search_matches_prefixes(self):
+        self.create_task("Quarterly report")
+        self.assertEqual(self.search("quart rep"), ["Quarterly report"])
+        self.assertEqual(self.search(""), [])
+
+    def test_search_only_returns_own_tasks(self):
+        self.create_task("Quarterly report", user=self.other)
+        self.assertEqual(self.search("quarterly"), [])
+        self.assertEqual(self.search("u"), [])
+
+    def test_search_ranks_and_limits(self):
+        self.create_task("Garden", "water the plants")
+        self.create_task("Plants plants plants", "plants everywhere")
+        self.create_task("Buy plants")
+        self.assertEqual(self.search("plants")[0], "Plants plants plants")
+        self.assertEqual(len(self.search("plants", limit=2)), 2)
+
+    def test_search_index_follows_updates_and_deletes(self):
+        task = self.create_task("Quarterly report")
+        task.title = "Annual report"
+        task.save()
+        self.assertEqual(self.search("quarterly"), [])
+        self.assertEqual(self.search("annual"), ["Annual report"])
+        task.delete()
+        self.assertEqual(self.search("annual"), [])
+
+class TestMarkOverdueCommand(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345678', email='test@tasky.com')
+        now = timezone.now()
+        for i in range(5):
+            Task.objects.create(title=f"Expired {i}", assigned_to=self.user, description="desc", status="IP", priority="ME", due_date=now - timezone.timedelta(days=i + 1), category=Category.objects.for_name(self.user, "Work"))
+        Task.objects.create(title="Future", assigned_to=self.user, description="desc", status="IP", priority="ME", due_date=now + timezone.timedelta(days=1), category=Category.objects.for_name(self.user, "Work"))
+        Task.objects.create(title="Done", assigned_to=self.user, description="desc", status="CO", priority="ME", due_date=now - timezone.timedelta(days=1), category=Category.objects.for_name(self.user, "Work"))
+
+    def test_mark_overdue_moves_expired_in_progress_tasks(self):
+        out = StringIO()
+        call_command("mark_overdue", batch_size=2, stdout=out)
+        self.assertIn("Marked 5 task(s) as overdue", out.getvalue())
+        self.assertEqual(Task.objects.filter(status="OV").count(), 5)
+        self.assertEqual(Task.objects.get(title="Future").status, "IP")
+        self.assertEqual(Task.objects.get(title="Done").status, "CO")
+
+        out = StringIO()
+        call_command("mark_overdue", stdout=out)
+        self.assertIn("Marked 0 task(s) as overdue", out.getvalue())
+
+class TestTaskChanges(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        self.due_date = timezone.now() + timezone.timedelta(days=3)
+        self.tasks = [Task.objects.create(title=f"Task {i}", assigned_to=self.user, description="desc", status="IP", priority="HI", due_date=self.due_date, category=Category.objects.for_name(self.user, "Work")) for i in range(3)]
+
+    def changes(self, since=None):
+        response = self.client.get(reverse("task-changes"), {"since": since} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_sync_returns_everything(self):
+        data = self.changes()
+        self.assertTrue(data["reset"])
+        self.assertEqual(len(data["tasks"]), 3)
+        self.assertEqual(data["deleted"], [])
+
+    def test_delta_returns_changes_and_deletions(self):
+        token = self.changes()["token"]
+        with self.settings(TASKAPP_SYNC_OVERLAP=timezone.timedelta(0)):
+            token = self.changes(token)["token"]
+        self.client.patch(reverse("task-update", args=[self.tasks[0].id]), {"status": "CO"}, content_type="application/json")
+        self.client.delete(reverse("task-delete", args=[self.tasks[1].id]))
+
+        data = self.changes(token)
+        self.assertFalse(data["reset"])
+        self.assertEqual([task["id"] for task in data["tasks"]], [self.tasks[0].id])
+        self.assertEqual(data["deleted"], [self.tasks[1].id])
+
+    def test_expired_and_invalid_tokens(self):
+        token = self.changes()["token"]
+        with self.settings(TASKAPP_TOMBSTONE_RETENTION=timezone.timedelta(0)):
+            self.assertTrue(self.changes(token)["reset"])
+        response = self.client.get(reverse("task-changes"), {"since": "not a token"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_deleting_a_user_leaves_no_tombstones(self):
+        self.user.delete()
+        self.assertFalse(TaskTombstone.objects.exists())
+
+    def test_prune_tombstones(self):
+        first_id = self.tasks[0].id
+        for task in self.tasks:
+            task.delete()
+        TaskTombstone.objects.filter(task_id=first_id).update(deleted_at=timezone.now() - timezone.timedelta(days=31))
+        out = StringIO()
+        call_command("prune_tombstones", stdout=out)
+        self.assertIn("Pruned 1 tombstone(s)", out.getvalue())
+        self.assertEqual(TaskTombstone.objects.count(), 2)
+
+class TestTaskEvents(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.due_date = timezone.now() + timezone.timedelta(days=3)
+
+    def create_task(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Task.objects.create(title="Task", assigned_to=self.user, description="desc", status="IP", priority="HI", due_date=self.due_date, category=Category.objects.for_name(self.user, "Work"))
+
+    def delete_task(self, task):
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+
+    async def test_stream_receives_the_user_changes(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("task-events"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 5000\n\n")
+
+        task = await sync_to_async(self.create_task)()
+        message = await asyncio.wait_for(anext(stream), 1)
+        self.assertTrue(message.startswith(b"event: saved\n"))
+        self.assertIn(b'"title": "Task"', message)
+
+        await sync_to_async(self.delete_task)(task)
+        message = await asyncio.wait_for(anext(stream), 1)
+        self.assertTrue(message.startswith(b"event: deleted\n"))
+
+        await stream.aclose()
+
+    async def test_closed_streams_unsubscribe(self):
+        stream = stream_events(self.user.pk)
+        await anext(stream)
+        self.assertTrue(get_broker().has_subscribers(self.user.pk))
+        await stream.aclose()
+        self.assertFalse(get_broker().has_subscribers(self.user.pk))
+
+    def test_requires_login_and_asgi(self):
+        response = self.client.get(reverse("task-events"))
+        self.assertEqual(response.status_code, 403)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("task-events"))
+        self.assertEqual(response.status_code, 204)
+
+    def test_nothing_is_published_without_subscribers(self):
+        with mock.patch.object(get_broker(), "publish") as publish, self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(title="Task", assigned_to=self.user, description="desc", status="IP", priority="HI", due_date=self.due_date, category=Category.objects.for_name(self.user, "Work"))
+        publish.assert_not_called()
+
+class TestEventStreamApplication(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.client.force_login(self.user)
+        self.passed_on = []
+
+    async def application(self, scope, receive, send):
+        self.passed_on.append(scope["path"])
+
+    def scope(self, cookie=b""):
+        return {"type": "http", "method": "GET", "path": reverse("task-events"), "headers": [(b"cookie", cookie)]}
+
+    async def test_streams_for_logged_in_users(self):
+        messages = []
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+
+        cookie = f"sessionid={self.client.cookies['sessionid'].value}".encode()
+        task = asyncio.create_task(EventStreamApplication(self.application)(self.scope(cookie), receive, send))
+        while len(messages) < 2:
+            await asyncio.sleep(0.01)
+        self.assertEqual(messages[0]["status"], 200)
+        self.assertEqual(messages[1]["body"], b"retry: 5000\n\n")
+        disconnected.set()
+        await asyncio.wait_for(task, 1)
+        self.assertFalse(get_broker().has_subscribers(self.user.pk))
+        self.assertEqual(self.passed_on, [])
+
+    async def test_passes_anonymous_requests_on(self):
+        await EventStreamApplication(self.application)(self.scope(b"sessionid=unknown"), None, None)
+        self.assertEqual(self.passed_on, [reverse("task-events")])
+
+class TestAsyncTaskViews(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.client.force_login(self.user)
+        self.due_date = timezone.now() + timezone.timedelta(days=3)
+        self.tasks = [
+            Task.objects.create(title=f"Task {i}", assigned_to=self.user, description="desc", status="IP", priority=["HI", "LO"][i % 2], due_date=self.due_date + timezone.timedelta(hours=i), category=Category.objects.for_name(self.user, "Work"))
+            for i in range(5)
+        ]
+        other = User.objects.create_user("other", "other@tasky.com", "otherpassword")
+        self.other_task = Task.objects.create(title="Other", assigned_to=other, description="desc", status="IP", priority="HI", due_date=self.due_date, category=Category.objects.for_name(other, "Work"))
+
+    async def test_lists_match_the_sync_views(self):
+        await self.async_client.aforce_login(self.user)
+        for name, params in [
+            ("task-list", {}),
+            ("task-list", {"priority": "HI", "ordering": "-due_date"}),
+            ("task-list", {"page_size": 2, "ordering": "due_date"}),
+            ("inprogress-tasks", {}),
+            ("inprogress-tasks", {"priority": "LO"}),
+            ("inprogress-tasks", {"page_size": 2}),
+            ("completed-tasks", {}),
+        ]:
+            expected = (await sync_to_async(self.client.get)(reverse(name), params)).json()
+            response = await self.async_client.get(reverse(f"async-{name}"), params)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            if isinstance(data, dict) and data.get("next"):
+                data["next"] = data["next"].replace("/async/", "/")
+            self.assertEqual(data, expected)
+
+    async def test_detail_update_and_delete(self):
+        await self.async_client.aforce_login(self.user)
+        task = self.tasks[0]
+        response = await self.async_client.get(reverse("async-task-detail", args=[task.id]))
+        self.assertEqual(response.json()["title"], "Task 0")
+        response = await self.async_client.get(reverse("async-task-detail", args=[self.other_task.id]))
+        self.assertEqual(response.status_code, 404)
+
+        response = await self.async_client.patch(reverse("async-task-update", args=[task.id]), {"status": "CO"}, content_type="application/json")
+        self.assertEqual(response.json()["status"], "CO")
+        self.assertEqual((await Task.objects.aget(id=task.id)).status, "CO")
+        response = await self.async_client.patch(reverse("async-task-update", args=[task.id]), {"title": "Task 1"}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.patch(reverse("async-task-update", args=[task.id]), {"status": "XX"}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.async_client.delete(reverse("async-task-delete", args=[task.id]))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(await Task.objects.filter(id=task.id).aexists())
+        response = await self.async_client.delete(reverse("async-task-delete", args=[self.other_task.id]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_create(self):
+        await self.async_client.aforce_login(self.user)
+        data = {"title": "New", "description": "desc", "status": "IP", "priority": "HI", "due_date": self.due_date.isoformat(), "category": "Work"}
+        response = await self.async_client.post(reverse("async-task-list"), data, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(await Task.objects.filter(id=response.json()["id"], assigned_to=self.user).aexists())
+        response = await self.async_client.post(reverse("async-task-list"), data, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    async def test_requires_login(self):
+        response = await self.async_client.get(reverse("async-task-list"))
+        self.assertEqual(response.status_code, 403)
+
+class TestTaskValuesSerializer(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.client.force_login(self.user)
+        due_dates = [
+            datetime.datetime(2024, 7, 1, 9, 30, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2024, 12, 31, 23, 59, 59, 123456, tzinfo=datetime.timezone.utc),
+            timezone.now(),
+        ]
+        for i, due_date in enumerate(due_dates):
+            Task.objects.create(title=f"Tâsk \"{i}\"", assigned_to=self.user, description="émoji 🚀\nline", status=["IP", "CO", "OV"][i], priority=["HI", "ME", "LO"][i], due_date=due_date, category=Category.objects.for_name(self.user, ""))
+
+    def test_output_is_identical_to_task_serializer(self):
+        queryset = Task.objects.filter(assigned_to=self.user).order_by("id")
+        for zone in ["UTC", "Asia/Kolkata", "America/New_York"]:
+            with timezone.override(zone), self.settings(TASKAPP_FAST_SERIALIZER=True):
+                expected = JSONRenderer().render(TaskSerializer(queryset, many=True).data)
+                self.assertEqual(JSONRenderer().render(serialize_tasks(queryset)), expected)
+
+    def test_columns_follow_the_serializer_fields(self):
+        serializer = TaskValuesSerializer()
+        self.assertEqual(serializer.names, TaskSerializer.Meta.fields)
+        self.assertEqual(serializer.columns[-1], "category__name")
+
+    def test_views_return_the_same_bytes(self):
+        for name, params in [("task-list", {}), ("task-list", {"ordering": "-due_date"}), ("inprogress-tasks", {"priority": "HI"}), ("task-board", {"ordering": "priority"}), ("task-list", {"ordering": "category"})]:
+            expected = self.client.get(reverse(name), params).content
+            with self.settings(TASKAPP_FAST_SERIALIZER=True):
+                self.assertEqual(self.client.get(reverse(name), params).content, expected)
+
+class TestTaskExport(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.client.force_login(self.user)
+        due_date = timezone.now() + timezone.timedelta(days=3)
+        for i in range(5):
+            Task.objects.create(title=f"Task, \"{i}\"", assigned_to=self.user, description="multi\nline", status="IP", priority=["HI", "LO"][i % 2], due_date=due_date, category=Category.objects.for_name(self.user, "Work"))
+        self.expected = TaskSerializer(Task.objects.filter(assigned_to=self.user).order_by("id"), many=True).data
+
+    def export(self, export_format, **params):
+        response = self.client.get(reverse("task-export", args=[export_format]), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_formats(self):
+        with mock.patch.object(TaskExportView, "chunk_size", 2):
+            self.assertEqual([json.loads(line) for line in self.export("ndjson").splitlines()], self.expected)
+            self.assertEqual(json.loads(self.export("json")), self.expected)
+            rows = list(csv.DictReader(StringIO(self.export("csv"))))
+        self.assertEqual([row["title"] for row in rows], [task["title"] for task in self.expected])
+        self.assertEqual(rows[0]["description"], "multi\nline")
+
+    def test_filters_and_empty_exports(self):
+        self.assertEqual(len(json.loads(self.export("json", priority="HI"))), 3)
+        self.assertEqual(json.loads(self.export("json", category="None")), [])
+        self.assertEqual(self.export("csv", category="None").strip(), ",".join(TaskSerializer.Meta.fields))
+
+    def test_unknown_format(self):
+        response = self.client.get(reverse("task-export", args=["xml"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_streams_under_asgi(self):
+        messages = []
+        cookie = f"sessionid={self.client.cookies['sessionid'].value}".encode()
+        scope = {"type": "http", "method": "GET", "path": reverse("task-export", args=["ndjson"]), "query_string": b"", "headers": [(b"host", b"testserver"), (b"cookie", cookie)]}
+        received = asyncio.Event()
+
+        async def receive():
+            if received.is_set():
+                await asyncio.Event().wait()
+            received.set()
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            messages.append(message)
+
+        # Like the test client, keep the handler from closing the test's connection.
+        for signal in [request_started, request_finished]:
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+        with mock.patch.object(TaskExportView, "chunk_size", 2), warnings.catch_warnings():
+            # Django warns before it buffers a synchronous iterator
+            warnings.filterwarnings("error", "StreamingHttpResponse must consume")
+            async_to_sync(ASGIHandler())(scope, receive, send)
+        self.assertEqual(messages[0]["status"], 200)
+        bodies = [message["body"] for message in messages[1:] if message.get("body")]
+        self.assertEqual(len(bodies), 3)
+        self.assertEqual([json.loads(line) for line in b"".join(bodies).decode().splitlines()], self.expected)
+
+class TestImportTasksCommand(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", "alice@tasky.com", "testpassword")
+        self.other = User.objects.create_user("bob", "bob@tasky.com", "testpassword")
+        Task.objects.create(title="Existing", assigned_to=self.user, description="desc", status="IP", priority="HI", due_date=timezone.now(), category=Category.objects.for_name(self.user, "Work"))
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def import_tasks(self, path, **options):
+        out = StringIO()
+        call_command("import_tasks", path, stdout=out, **options)
+        return out.getvalue()
+
+    def test_csv_import_validates_rows(self):
+        path = self.write("tasks.csv", "\n".join([
+            "title,description,status,priority,due_date,category,assigned_to",
+            "One,desc,IP,HI,2030-01-01T10:00:00Z,Work,alice",
+            "Two,desc,XX,HI,2030-01-01T10:00:00Z,Work,alice",
+            "Existing,desc,IP,HI,2030-01-01T10:00:00Z,Work,alice",
+            "One,desc,CO,LO,2030-01-01T10:00:00Z,Home,alice",
+            "One,desc,CO,LO,2030-01-01T10:00:00Z,Home,bob",
+            "Three,desc,IP,HI,2030-01-01T10:00:00Z,Work,carol",
+            "Four,desc,IP,HI,not a date,Work,alice",
+        ]))
+        with self.assertNumQueries(21):
+            # users, titles taken, the categories (one of them new), the insert inside its
+            # savepoint, and an UPDATE per summary group, with an INSERT for the three new ones
+            out = self.import_tasks(path, batch_size=100)
+        self.assertIn("Imported 2 task(s), rejected 5", out)
+        self.assertEqual(sorted(Task.objects.filter(title="One").values_list("assigned_to__username", flat=True)), ["alice", "bob"])
+        with open(f"{path}.rejects.ndjson") as rejects:
+            rejected = [json.loads(line) for line in rejects]
+        self.assertEqual([error["row"] for error in rejected], [2, 3, 4, 6, 7])
+        self.assertIn("status", rejected[0]["errors"])
+        self.assertFalse(os.path.exists(f"{path}.checkpoint"))
+
+    def test_failed_batch_leaves_no_categories(self):
+        path = self.write("tasks.ndjson", json.dumps({"title": "One", "description": "desc", "status": "IP", "priority": "ME", "due_date": "2030-01-01T10:00:00Z", "category": "Fresh"}) + "\n")
+        with mock.patch.object(Task.objects, "bulk_create", side_effect=IntegrityError), self.assertRaises(CommandError):
+            self.import_tasks(path, user="bob")
+        self.assertFalse(Category.objects.filter(name="Fresh").exists())
+
+    def test_ndjson_import_resumes_from_checkpoint(self):
+        rows = [{"title": f"Task {i}", "description": "desc", "status": "IP", "priority": "ME", "due_date": "2030-01-01T10:00:00Z", "category": "Work"} for i in range(5)]
+        path = self.write("tasks.ndjson", "".join(json.dumps(row) + "\n" for row in rows))
+        with open(f"{path}.checkpoint", "w") as checkpoint:
+            json.dump({"rows": 3, "imported": 3, "rejected": 0}, checkpoint)
+        out = self.import_tasks(path, user="bob", batch_size=1)
+        self.assertIn("Resuming after row 3", out)
+        self.assertEqual(sorted(Task.objects.filter(assigned_to=self.other).values_list("title", flat=True)), ["Task 3", "Task 4"])
+
+class TestSeedTasksCommand(TransactionTestCase):
+    # With --rebuild-search-index the search index is dropped and rebuilt, which SQLite does
+    # not allow inside the transaction of a TestCase.
+    def seed(self, **options):
+        out = StringIO()
+        call_command("seed_tasks", stdout=out, **{"users": 3, "tasks": 40, "prefix": "seed", "batch_size": 50, **options})
+        return out.getvalue()
+
+    def test_creates_users_and_tasks(self):
+        out = self.seed()
+        self.assertIn("Created 3 user(s) and 120 task(s)", out)
+        users = User.objects.filter(username__startswith="seed")
+        self.assertEqual(sorted(users.values_list("username", flat=True)), ["seed1", "seed2", "seed3"])
+        self.assertTrue(users[0].check_password("loadtest-password"))
+        for user in users:
+            tasks = Task.objects.filter(assigned_to=user)
+            self.assertEqual(tasks.count(), 40)
+            self.assertTrue(2 <= Category.objects.filter(user=user).count() <= 8)
+            self.assertEqual(sum(TaskSummary.objects.filter(user=user).values_list("count", flat=True)), 40)
+        self.client.force_login(users[0])
+        title = Task.objects.filter(assigned_to=users[0]).first().title
+        self.assertIn(title, [task["title"] for task in self.client.get(reverse("task-search"), {"q": title}).json()])
+
+    def search(self, user, title):
+        self.client.force_login(user)
+        return [task["title"] for task in self.client.get(reverse("task-search"), {"q": title}).json()]
+
+    def test_search_index_is_kept_by_default(self):
+        with mock.patch("taskapp.management.commands.seed_tasks.uninstall_search_index") as uninstall_search_index:
+            self.seed(users=1)
+        uninstall_search_index.assert_not_called()
+
+    def test_rebuilt_search_index_survives_a_failed_load(self):
+        self.seed(users=1)
+        user = User.objects.get(username="seed1")
+        title = Task.objects.filter(assigned_to=user).first().title
+        with mock.patch("taskapp.management.commands.seed_tasks.Command.insert_tasks", side_effect=RuntimeError), self.assertRaises(RuntimeError):
+            self.seed(users=1, prefix="failed", rebuild_search_index=True)
+        self.assertIn(title, self.search(user, title))
+        self.seed(users=1, prefix="rebuilt", rebuild_search_index=True)
+        user = User.objects.get(username="rebuilt1")
+        title = Task.objects.filter(assigned_to=user).first().title
+        self.assertIn(title, self.search(user, title))
+
+    def test_same_seed_generates_same_tasks(self):
+        self.seed(users=1)
+        first = list(Task.objects.order_by("id").values_list("title", "status", "priority", "category__name"))
+        Task.objects.all().delete()
+        self.seed(users=1, prefix="again")
+        self.assertEqual(list(Task.objects.order_by("id").values_list("title", "status", "priority", "category__name")), first)
+
+    def test_existing_prefix_is_rejected(self):
+        self.seed(users=1)
+        with self.assertRaisesMessage(CommandError, "Users starting with 'seed' already exist"):
+            self.seed(users=1)
+
+class TestTaskSummaries(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345678', email='test@tasky.com')
+        self.client = Client()
+        self.client.login(username='testuser', password='12345678')
+        self.due_date = timezone.now() + timezone.timedelta(days=3)
+        self.task = Task.objects.create(title="Task", assigned_to=self.user, description="desc", status="IP", priority="HI", due_date=self.due_date, category=Category.objects.for_name(self.user, "Work"))
+
+    def assertSummariesMatchTasks(self):
+        summaries, due_summaries = count_tasks(Task.objects.filter(assigned_to=self.user))
+        self.assertEqual(
+            set(TaskSummary.objects.filter(user=self.user, count__gt=0).values_list('status', 'priority', 'category', 'count')),
+            {(row.status, row.priority, row.category_id, row.count) for row in summaries},
+        )
+        self.assertEqual(
+            set(self.user.taskduesummary_set.filter(count__gt=0).values_list('status', 'due_day', 'count')),
+            {(row.status, row.due_day, row.count) for row in due_summaries},
+        )
+
+    def test_saves_and_deletes_update_counts(self):
+        other = Task.objects.create(title="Other", assigned_to=self.user, description="desc", status="IP", priority="HI", due_date=self.due_date, category=Category.objects.for_name(self.user, "Work"))
+        self.assertSummariesMatchTasks()
+        self.client.patch(reverse("task-update", args=[other.id]), {"status": "CO", "category": "Home"}, content_type="application/json")
+        self.assertSummariesMatchTasks()
+        self.client.delete(reverse("task-delete", args=[self.task.id]))
+        self.assertSummariesMatchTasks()
+        self.assertEqual(get_stats(self.user)['by_status'], {'IP': 0, 'CO': 1, 'OV': 0})
+
+    def test_save_of_an_unloaded_task_recounts(self):
+        Task(id=self.task.id, title="Task", assigned_to=self.user, description="desc", status="CO", priority="LO", due_date=self.due_date, category=Category.objects.for_name(self.user, "Home")).save()
+        self.assertSummariesMatchTasks()
+
+    def test_bulk_writes_apply_their_deltas(self):
+        with mock.patch("taskapp.signals.rebuild_summaries") as rebuild_summaries:
+            self.client.patch(reverse("task-bulk"), [{"id": self.task.id, "status": "CO", "priority": "LO", "category": "Home"}], content_type="application/json")
+            self.assertSummariesMatchTasks()
+            self.client.post(reverse("task-bulk"), [
+                {"title": f"Bulk {number}", "description": "desc", "status": "IP", "priority": "HI", "due_date": "2024-01-01T00:00:00Z", "category": "Work"}
+                for number in range(3)
+            ], content_type="application/json")
+            self.assertSummariesMatchTasks()
+            call_command("mark_overdue", stdout=StringIO())
+            self.assertSummariesMatchTasks()
+            self.client.delete(reverse("task-bulk"), {"ids": list(Task.objects.filter(title__in=["Bulk 0", "Bulk 1"]).values_list("id", flat=True))}, content_type="application/json")
+            self.assertSummariesMatchTasks()
+        rebuild_summaries.assert_not_called()
+        self.assertEqual(get_stats(self.user)['by_status'], {'IP': 0, 'CO': 1, 'OV': 1})
+
+    def test_bulk_writes_without_deltas_recount(self):
+        Task.objects.filter(id=self.task.id).update(status="OV")
+        tasks_bulk_changed.send(sender=Task, user_ids=[self.user.pk])
+        self.assertSummariesMatchTasks()
+
+    def test_rebuild_command_fixes_drift(self):
+        Task.objects.filter(id=self.task.id).update(priority="LO")
+        out = StringIO()
+        call_command("rebuild_task_summaries", stdout=out)
+        self.assertIn("Recounted 1 user(s), fixed 2 summary row(s)", out.getvalue())
+        self.assertSummariesMatchTasks()
+
+    def test_stats_endpoint(self):
+        now = timezone.now()
+        Task.objects.create(title="Late", assigned_to=self.user, description="desc", status="OV", priority="LO", due_date=now - timezone.timedelta(days=1), category=Category.objects.for_name(self.user, "Home"))
+        Task.objects.create(title="Later", assigned_to=self.user, description="desc", status="IP", priority="LO", due_date=now + timezone.timedelta(days=30), category=Category.objects.for_name(self.user, "Home"))
+        with self.assertNumQueries(4):
+            # session, user, and one query per summary table
+            response = self.client.get(reverse("task-stats"))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(data['by_status'], {'IP': 2, 'CO': 0, 'OV': 1})
+        self.assertIn({'status': 'IP', 'priority': 'HI', 'category': 'Work', 'count': 1}, data['breakdown'])
+        self.assertEqual(data['due_this_week'], 1)
+        self.assertEqual(len(data['overdue_trend']), 8)
+        self.assertEqual(sum(week['count'] for week in data['overdue_trend']), 1)
+
+    def test_stats_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("task-stats")).status_code, 403)
+
+
+class TestCategories(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.other = User.objects.create_user("other", "other@tasky.com", "otherpassword")
+        self.client.login(username="testuser", password="testpassword")
+        self.due_date = timezone.now() + timezone.timedelta(days=3)
+
+    def create(self, title, category):
+        data = {"title": title, "description": "desc", "status": "IP", "priority": "HI", "due_date": self.due_date.isoformat(), "category": category}
+        return self.client.post(reverse("task-list"), data, content_type="application/json")
+
+    def test_migrated_categories_take_the_most_used_spelling(self):
+        pick_name = importlib.import_module("taskapp.migrations.0010_category").pick_name
+        self.assertEqual(pick_name({" work ": 1, "Work": 2}), "Work")
+        self.assertEqual(pick_name({" Work ": 1, "work": 1}), "work")
+        self.assertEqual(pick_name({"  home  office ": 3, "Home office": 1}), "home office")
+
+    def test_spellings_share_a_category(self):
+        self.create("First", "Work")
+        response = self.create("Second", "  work ")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["category"], "Work")
+        self.assertEqual(list(Category.objects.filter(user=self.user).values_list("name", flat=True)), ["Work"])
+
+    def test_names_longer_once_normalized_are_rejected(self):
+        # Valid as a name, but casefold() turns each 'ß' into 'ss'.
+        response = self.create("First", "ß" * 200)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("category", response.json())
+        with self.assertRaises(ValidationError):
+            Category.objects.for_names([(self.user.pk, "ß" * 200)])
+        self.assertEqual(self.create("Second", "ß" * 127).status_code, 201)
+
+    def test_categories_are_per_user(self):
+        self.create("First", "Work")
+        Task.objects.create(title="Other", assigned_to=self.other, description="desc", status="IP", priority="HI", due_date=self.due_date, category=Category.objects.for_name(self.other, "work"))
+        self.assertEqual(Category.objects.filter(key="work").count(), 2)
+        response = self.client.get(reverse("task-list"), {"category": "WORK"})
+        self.assertEqual([task["title"] for task in response.json()], ["First"])
+
+    def test_update_and_bulk_writes_set_categories(self):
+        task_id = self.create("First", "Work").json()["id"]
+        response = self.client.patch(reverse("task-update", args=[task_id]), {"category": "Home"}, content_type="application/json")
+        self.assertEqual(response.json()["category"], "Home")
+        results = self.client.patch(reverse("task-bulk"), [{"id": task_id, "category": "home office"}], content_type="application/json").json()
+        self.assertEqual(results[0]["task"]["category"], "home office")
+        results = self.client.post(reverse("task-bulk"), [
+            {"title": "A", "description": "desc", "status": "IP", "priority": "HI", "due_date": self.due_date.isoformat(), "category": "Errands"},
+            {"title": "B", "description": "desc", "status": "IP", "priority": "HI", "due_date": self.due_date.isoformat(), "category": "errands"},
+        ], content_type="application/json").json()
+        self.assertEqual([result["task"]["category"] for result in results], ["Errands", "Errands"])
+
+    def test_ordering_by_category_pages_by_name(self):
+        for title, category in [("A", "beta"), ("B", "Alpha"), ("C", "gamma"), ("D", "alpha")]:
+            self.create(title, category)
+        response = self.client.get(reverse("task-list"), {"ordering": "category"})
+        self.assertEqual([task["title"] for task in response.json()], ["B", "D", "A", "C"])
+        titles, url, params = [], reverse("task-list"), {"ordering": "-category", "page_size": 1}
+        while url:
+            page = self.client.get(url, params).json()
+            titles += [task["title"] for task in page["results"]]
+            url, params = page["next"], {}
+        self.assertEqual(titles, ["C", "A", "D", "B"])
+
+    def test_tasks_keep_the_key_of_their_category(self):
+        task = Task.objects.get(id=self.create("First", " Home  Office ").json()["id"])
+        self.assertEqual(task.category_key, "home office")
+        self.client.patch(reverse("task-update", args=[task.id]), {"category": "Work"}, content_type="application/json")
+        self.client.patch(reverse("task-bulk"), [{"id": task.id, "category": "Garden"}], content_type="application/json")
+        task.refresh_from_db()
+        self.assertEqual(task.category_key, "garden")
+        task.category.key = "yard"
+        task.category.save()
+        task.refresh_from_db()
+        self.assertEqual(task.category_key, "yard")
+
+    def test_autocomplete(self):
+        for title, category in [("A", "Work"), ("B", "Workshop"), ("C", "Home"), ("D", "Old")]:
+            self.create(title, category)
+        Task.objects.get(title="D").delete()
+        Category.objects.for_name(self.other, "Workout")
+        response = self.client.get(reverse("category-list"), {"prefix": " wo"})
+        self.assertEqual(response.json(), ["Work", "Workshop"])
+        self.assertEqual(self.client.get(reverse("category-list")).json(), ["Home", "Work", "Workshop"])
+        self.assertEqual(self.client.get(reverse("category-list"), {"limit": 1}).json(), ["Home"])
+
+    def test_search_follows_category_renames(self):
+        self.create("First", "Work")
+        Category.objects.filter(user=self.user).update(name="Job")
+        response = self.client.get(reverse("task-search"), {"q": "job"})
+        self.assertEqual([task["title"] for task in response.json()], ["First"])
+        self.assertEqual(response.json()[0]["category"], "Job")
+
+
+class TestTaskIndexes(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345678', email='test@tasky.com')
+        due_date = timezone.now() + timezone.timedelta(days=3)
+        for i, status in enumerate(['IP', 'CO', 'OV'] * 5):
+            Task.objects.create(title=f"Task {i}", assigned_to=self.user, description="desc", status=status, priority="ME", due_date=due_date, category=Category.objects.for_name(self.user, "Work"))
+
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables always favour a sequential scan on PostgreSQL.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+        if connection.vendor == 'sqlite':
+            self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", plan)
+
+    def test_status_board_ordered_by_due_date_uses_index(self):
+        queryset = Task.objects.filter(assigned_to=self.user, status='IP').order_by('due_date')
+        self.assertUsesIndex(queryset, 'task_user_status_due_idx')
+
+    def test_status_board_ordered_by_category_uses_index(self):
+        queryset = Task.objects.filter(assigned_to=self.user, status='CO').order_by('category_key')
+        self.assertUsesIndex(queryset, 'task_user_status_cat_idx')
+
+    def test_status_board_filtered_by_category_uses_index(self):
+        queryset = TaskFilterSet({'category': 'work'}, queryset=Task.objects.filter(assigned_to=self.user, status='CO')).qs
+        self.assertUsesIndex(queryset, 'task_user_status_cat_idx')
+
+    def test_category_prefix_lookup_uses_index(self):
+        queryset = Category.objects.with_prefix(self.user, 'Wo')
+        self.assertUsesIndex(queryset, 'category_user_key_unique' if connection.vendor == 'postgresql' else 'sqlite_autoindex_taskapp_category')
+
+    def test_status_board_ordered_by_priority_uses_index(self):
+        queryset = Task.objects.filter(assigned_to=self.user, status='OV').order_by('priority_rank')
+        self.assertUsesIndex(queryset, 'task_user_status_prio_idx')
+
+    def test_status_board_filtered_by_priorities_uses_index(self):
+        queryset = TaskFilterSet({'priority': ['HI', 'ME']}, queryset=Task.objects.filter(assigned_to=self.user, status='IP')).qs
+        self.assertUsesIndex(queryset.order_by('priority_rank'), 'task_user_status_prio_idx')
+
+    def test_due_date_range_uses_index(self):
+        queryset = TaskFilterSet({'due_after': '2024-03-01', 'due_before': '2024-03-31'}, queryset=Task.objects.filter(assigned_to=self.user)).qs
+        self.assertUsesIndex(queryset.order_by('due_date'), 'task_user_due_idx')
+
+    def test_expired_tasks_lookup_uses_index(self):
+        queryset = Task.objects.filter(status='IP', due_date__lt=timezone.now()).order_by('due_date').values_list('id', flat=True)
+        self.assertUsesIndex(queryset, 'task_status_due_idx')
+
+class TestSQLiteBackend(TransactionTestCase):
+    @unittest.skipUnless(connection.vendor == 'sqlite', "Tests the SQLite backend.")
+    def test_connections_are_tuned(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 5000)
+        with CaptureQueriesContext(connection) as queries, transaction.atomic():
+            Task.objects.exists()
+        self.assertEqual(queries[0]["sql"], "BEGIN IMMEDIATE")
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', "Tests the SQLite backend.")
+    def test_test_database_is_a_file(self):
+        self.assertFalse(connection.creation.is_in_memory_db(connection.settings_dict["NAME"]))
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "wal")
+
+
+@unittest.skipUnless(psycopg2, "psycopg2 is not installed.")
+class TestConnectionPool(unittest.TestCase):
+    def test_waits_for_a_free_connection(self):
+        from .db.postgresql.base import ConnectionPool
+        with mock.patch("psycopg2.connect", side_effect=lambda *args, **kwargs: mock.Mock(closed=False, info=mock.Mock(transaction_status=0))):
+            pool = ConnectionPool(1, 1, timeout=0.1)
+            first = pool.getconn()
+            with self.assertRaises(psycopg2.pool.PoolError):
+                pool.getconn()
+            threading.Timer(0.05, pool.putconn, [first]).start()
+            pool.timeout = 1
+            self.assertIs(pool.getconn(), first)
+
+@override_settings(TASKAPP_REPLICAS=["replica1", "replica2"], SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+class TestReplicaRouting(TransactionTestCase):
+    # Two SQLite files stand in for the replicas, and "replication" copies the test database
+    # into them. They are added once the test class is set up, as the test runner only knows
+    # about `default`.
+    replicas = ["replica1", "replica2"]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        for alias in cls.replicas:
+            connections.settings[alias] = {**connections.settings["default"], "NAME": os.path.join(cls.directory.name, f"{alias}.sqlite3")}
+
+    @classmethod
+    def tearDownClass(cls):
+        for alias in cls.replicas:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.task = Task.objects.create(title="Primary", assigned_to=self.user, description="desc", status="IP", priority="HI", due_date=timezone.now(), category=Category.objects.for_name(self.user, "Work"))
+        connection.ensure_connection()
+        for alias in self.replicas:
+            connections[alias].ensure_connection()
+            connection.connection.backup(connections[alias].connection)
+            # Tells the copies apart.
+            Task.objects.using(alias).filter(pk=self.task.pk).update(title=f"Copy in {alias}")
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def get_title(self, name="task-detail"):
+        response = self.client.get(reverse(name, args=[self.task.pk]))
+        self.assertEqual(response.status_code, 200)
+        return response.json()["title"]
+
+    def test_reads_go_to_the_replicas_in_turn(self):
+        self.assertEqual({self.get_title() for _ in range(4)}, {"Copy in replica1", "Copy in replica2"})
+        self.assertEqual(self.client.get(reverse("async-task-detail", args=[self.task.pk])).json()["title"][:7], "Copy in")
+        self.assertEqual(Task.objects.get(pk=self.task.pk).title, "Primary")
+
+    def test_writes_keep_the_browser_on_the_primary(self):
+        response = self.client.patch(reverse("task-update", args=[self.task.pk]), {"title": "Renamed"}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cookies["taskapp_primary"]["max-age"], 5)
+        self.assertEqual(self.get_title(), "Renamed")
+        del self.client.cookies["taskapp_primary"]
+        self.assertTrue(self.get_title().startswith("Copy in"))
+
+    def test_unmarked_views_read_from_the_primary(self):
+        board = self.client.get(reverse("task-board")).json()
+        self.assertEqual([task["title"] for task in board["in_progress"]], ["Primary"])
+
+    def test_least_loaded_selection(self):
+        selector = LeastLoadedSelector(self.replicas)
+        first, second = selector.acquire(), selector.acquire()
+        self.assertEqual({first, second}, set(self.replicas))
+        selector.release(second)
+        self.assertEqual(selector.acquire(), second)
+
+@override_settings(SESSION_ENGINE="django.contrib.sessions.backends.cached_db", TASKAPP_USER_CACHE_TIMEOUT=60)
+class TestCachedAuthentication(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.task = Task.objects.create(title="Task", assigned_to=self.user, description="desc", status="IP", priority="HI", due_date=timezone.now(), category=Category.objects.for_name(self.user, "Work"))
+        self.client = Client()
+        self.client.login(username="testuser", password="testpassword")
+        self.url = reverse("task-detail", args=[self.task.id])
+
+    def test_session_and_user_come_from_the_cache(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            # only the task
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_sessions_started_with_model_backend_stay_signed_in(self):
+        client = Client()
+        client.force_login(self.user, backend="django.contrib.auth.backends.ModelBackend")
+        self.assertEqual(client.get(self.url).status_code, 200)
+
+    def test_wrong_password_is_checked_once(self):
+        with mock.patch.object(User, "check_password", autospec=True, return_value=False) as check_password:
+            self.assertFalse(Client().login(username="testuser", password="wrong"))
+        self.assertEqual(check_password.call_count, 1)
+
+    def test_saving_the_user_drops_the_cached_copy(self):
+        self.client.get(self.url)
+        self.user.first_name = "Test"
+        self.user.save()
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_password_change_signs_out_other_sessions(self):
+        other = Client()
+        other.login(username="testuser", password="testpassword")
+        self.assertEqual(other.get(self.url).status_code, 200)
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password("newpassword")
+        user.save()
+        self.assertEqual(other.get(self.url).status_code, 403)
+
+    def test_logout_drops_the_cached_copy(self):
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(user_key(self.user.pk)))
+        self.client.logout()
+        self.assertIsNone(cache.get(user_key(self.user.pk)))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+class TestThrottling(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', email='test@tasky.com', password='password')
+        self.client.login(username='testuser', password='password')
+        get_store().clear()
+
+    def tearDown(self):
+        get_store().clear()
+
+    @override_settings(TASKAPP_THROTTLE_RATES={'task_list': '3/minute'})
+    def test_burst_then_429_with_retry_after(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(reverse('task-list')).status_code, 200)
+        response = self.client.get(reverse('task-list'))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+        # Refused requests spend no token and run no query.
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('task-list')).status_code, 429)
+        self.assertEqual(len(queries), 2)  # session and user
+
+    @override_settings(TASKAPP_THROTTLE_RATES={'task_list': '1/minute', 'task_column': '1/minute'})
+    def test_buckets_are_per_user_and_scope(self):
+        self.client.get(reverse('task-list'))
+        self.assertEqual(self.client.get(reverse('task-list')).status_code, 429)
+        self.assertEqual(self.client.get(reverse('inprogress-tasks')).status_code, 200)
+        User.objects.create_user(username='other', password='password')
+        other = Client()
+        other.login(username='other', password='password')
+        self.assertEqual(other.get(reverse('task-list')).status_code, 200)
+
+    @override_settings(TASKAPP_THROTTLE_RATES={'task_board': '2/minute', 'task_detail': '1/minute'})
+    def test_only_the_board_and_list_views_are_throttled(self):
+        task = Task.objects.create(
+            title='Task', status='IP', priority='ME', due_date=timezone.now(),
+            category=Category.objects.for_name(self.user, 'Work'), assigned_to=self.user,
+        )
+        for _ in range(2):
+            self.assertEqual(self.client.get(reverse('task-board')).status_code, 200)
+        response = self.client.get(reverse('task-board'))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        for _ in range(3):
+            self.assertEqual(self.client.get(reverse('task-detail', args=[task.pk])).status_code, 200)
+            self.assertEqual(self.client.get(reverse('async-task-detail', args=[task.pk])).status_code, 200)
+
+    @override_settings(TASKAPP_THROTTLE_RATES={'task_list': '2/second'})
+    def test_tokens_refill_over_time(self):
+        with mock.patch('taskapp.throttling.time.monotonic', return_value=100.0) as clock:
+            self.client.get(reverse('task-list'))
+            self.client.get(reverse('task-list'))
+            self.assertEqual(self.client.get(reverse('task-list')).status_code, 429)
+            clock.return_value = 100.5
+            self.assertEqual(self.client.get(reverse('task-list')).status_code, 200)
+            self.assertEqual(self.client.get(reverse('task-list')).status_code, 429)
+
+    @override_settings(TASKAPP_THROTTLE_RATES={'task_column': '1/minute'})
+    async def test_async_views_share_the_buckets(self):
+        await self.async_client.aforce_login(self.user)
+        await sync_to_async(self.client.get)(reverse('inprogress-tasks'))
+        response = await self.async_client.get(reverse('async-completed-tasks'))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+
+    def test_local_memory_store_forgets_the_least_recently_used(self):
+        store = LocalMemoryBucketStore()
+        store.max_entries = 2
+        store.take('a', 1, 1)
+        store.take('b', 1, 1)
+        store.take('a', 1, 1)
+        store.take('c', 1, 1)
+        self.assertEqual(list(store.buckets), ['a', 'c'])
+
+    def test_cache_store(self):
+        cache.clear()
+        store = CacheBucketStore()
+        self.assertEqual(store.take('list:1', 1, 0.5), 0)
+        self.assertAlmostEqual(store.take('list:1', 1, 0.5), 2, places=1)
+        self.assertEqual(store.take('list:2', 1, 0.5), 0)
+
+@override_settings(TASKAPP_METRICS=True, TASKAPP_METRICS_TOKEN="secret")
+class TestRequestMetrics(TestCase):
+    def setUp(self):
+        metrics.reset()
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user("testuser", "test@tasky.com", "testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        Task.objects.create(title="Task", assigned_to=self.user, description="desc", status="IP", priority="HI",
+                            due_date=timezone.now(), category=Category.objects.for_name(self.user, "Work"))
+
+    def test_server_timing_header_and_log_line(self):
+        with self.assertLogs("taskapp.metrics", "INFO") as logs, CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("inprogress-tasks"), {"priority": "HI"})
+        timing = response["Server-Timing"]
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        self.assertRegex(timing, r"^db;dur=[\d.]+;desc=\"\d+ queries\", serialize;dur=[\d.]+, total;dur=[\d.]+$")
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record["view"], record["status"], record["queries"]), ("inprogress-tasks", 200, len(queries)))
+        self.assertEqual(record["bytes"], len(response.content))
+
+    def test_streamed_responses_are_recorded_when_they_end(self):
+        with self.assertLogs("taskapp.metrics", "INFO") as logs:
+            response = self.client.get(reverse("task-export", args=["ndjson"]))
+            self.assertEqual(logs.records, [])
+            body = b"".join(response.streaming_content)
+            response.close()
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["bytes"], len(body))
+        # The tasks are read while streaming.
+        self.assertGreaterEqual(record["queries"], 3)
+
+    def test_histograms_per_url_name(self):
+        self.client.get(reverse("task-list"))
+        self.client.get(reverse("task-list"))
+        self.client.get(reverse("task-board"))
+        exposition = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret").content.decode()
+        self.assertIn('taskapp_request_duration_seconds_count{view="task-list"} 2', exposition)
+        self.assertIn('taskapp_request_queries_count{view="task-board"} 1', exposition)
+        self.assertIn('taskapp_response_size_bytes_bucket{view="task-list",le="+Inf"} 2', exposition)
+
+    def test_metrics_endpoint_requires_staff_or_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        with mock.patch("taskapp.views.constant_time_compare", wraps=constant_time_compare) as compare:
+            self.assertEqual(Client().get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret").status_code, 200)
+        compare.assert_called_once_with("Bearer secret", "Bearer secret")
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+        with self.settings(TASKAPP_METRICS=False):
+            self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+
+    def test_disabled_by_default(self):
+        with self.settings(TASKAPP_METRICS=False):
+            response = Client().get(reverse("task-list"))
+        self.assertNotIn("Server-Timing", response)
+
+# Scales the response time ceilings of TestQueryBudgets, for slow CI machines.
+TIME_CEILING_FACTOR = float(os.environ.get("TASKAPP_TIME_CEILING_FACTOR", "1"))
+
+class TestQueryBudgets(TestCase):
+    """
+    Exact query counts and response time ceilings of every endpoint.
+
+    Six users own 300 tasks each, spread over the statuses, priorities, four categories and
+    six weeks of due dates. Every read costs the session and user lookups, plus the
+    conditional GET validators on the list views, plus its own queries, whatever the number of
+    tasks: a query added per task or per request fails here like a functional bug would.
+    Writes are also checked with batches of different sizes.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        start = datetime.datetime(2026, 1, 5, tzinfo=datetime.timezone.utc)
+        cls.users = [User.objects.create_user(f"user{i}", f"user{i}@tasky.com", "testpassword") for i in range(6)]
+        tasks = []
+        for user in cls.users:
+            categories = [Category.objects.for_name(user, name) for name in ["Work", "Home", "Errands", "Health"]]
+            for i in range(300):
+                tasks.append(Task(title=f"Task {i}", description="desc " * 10, status=["IP", "CO", "OV"][i % 3], priority=["LO", "ME", "HI"][i % 5 % 3],
+                                  due_date=start + timezone.timedelta(hours=3 * i), category=categories[i % 4], assigned_to=user))
+        Task.objects.bulk_create(tasks)
+        rebuild_summaries([user.pk for user in cls.users])
+
+    def setUp(self):
+        cache.clear()
+        self.user = self.users[0]
+        self.client.force_login(self.user)
+        self.task = Task.objects.filter(assigned_to=self.user).order_by("id").first()
+
+    def assertBudget(self, queries, seconds, method, url, data=None):
+        with self.assertNumQueries(queries):
+            start = time.perf_counter()
+            if method == "get":
+                response = self.client.get(url, data)
+            else:
+                response = getattr(self.client, method)(url, data, content_type="application/json")
+            if response.streaming:
+                b"".join(response.streaming_content)
+            elapsed = time.perf_counter() - start
+        self.assertLess(response.status_code, 300)
+        self.assertLess(elapsed, seconds * TIME_CEILING_FACTOR)
+        return response
+
+    def test_task_list(self):
+        for params, queries in [
+            # session + user + validators + tasks (categories are joined)
+            ({}, 4),
+            ({"ordering": "-priority"}, 4),
+            ({"priority": ["HI", "ME"], "status": "IP", "category": "work"}, 4),
+            ({"due_after": "2026-02-01", "due_before": "2026-02-28", "ordering": "due_date"}, 4),
+            ({"due_date__gte": "2026-02-01T00:00:00Z", "ordering": "category"}, 4),
+            # a page is fetched with the same single task query
+            ({"page_size": 50}, 4),
+            ({"page_size": 50, "ordering": "-priority", "priority": "HI"}, 4),
+        ]:
+            with self.subTest(**params):
+                self.assertBudget(queries, 0.5, "get", reverse("task-list"), params)
+
+    def test_next_pages(self):
+        for ordering in ["due_date", "-priority", "category"]:
+            with self.subTest(ordering=ordering):
+                first = self.client.get(reverse("task-list"), {"page_size": 50, "ordering": ordering}).json()
+                self.assertBudget(4, 0.25, "get", first["next"])
+
+    def test_status_views(self):
+        for name in ["inprogress-tasks", "completed-tasks", "overdue-tasks"]:
+            for params, queries in [
+                # session + user + validators + the board, which is then cached
+                ({}, 4),
+                # the filtered columns count the rows they fetched
+                ({"priority": "HI", "ordering": "-priority"}, 4),
+                ({"category": "home", "due_after": "2026-02-01"}, 4),
+                # paged columns add a COUNT for the tasks on the other pages
+                ({"page_size": 20}, 5),
+            ]:
+                with self.subTest(name=name, **params):
+                    cache.clear()
+                    self.assertBudget(queries, 0.5, "get", reverse(name), params)
+
+    def test_board(self):
+        # session + user + validators + the board
+        self.assertBudget(4, 0.5, "get", reverse("task-board"))
+        # then only the validators, the board coming from the cache
+        self.assertBudget(3, 0.1, "get", reverse("task-board"))
+        self.assertBudget(4, 0.5, "get", reverse("task-board"), {"priority": "HI", "ordering": "due_date"})
+        self.assertBudget(4, 0.5, "get", reverse("task-board"), {"status": ["IP", "OV"], "ordering": "-priority"})
+
+    def test_other_reads(self):
+        for name, args, params, queries in [
+            ("task-detail", [self.task.id], {}, 3),
+            ("task-search", [], {"q": "task"}, 4),
+            ("task-changes", [], {}, 3),
+            ("category-list", [], {"prefix": "h"}, 3),
+            ("task-stats", [], {}, 4),
+            ("task-export", ["ndjson"], {}, 3),
+            ("task-export", ["csv"], {"priority": "HI", "ordering": "-due_date"}, 3),
+        ]:
+            with self.subTest(name=name, **params):
+                self.assertBudget(queries, 0.5, "get", reverse(name, args=args), params)
+
+    def test_async_views(self):
+        client = AsyncClient()
+        client.force_login(self.user)
+        for name, params, queries in [
+            # session + user + tasks: the async views have no conditional GET
+            ("async-task-list", {}, 3),
+            ("async-task-list", {"page_size": 50, "ordering": "-priority"}, 3),
+            ("async-inprogress-tasks", {}, 3),
+            ("async-completed-tasks", {"priority": "HI"}, 3),
+        ]:
+            with self.subTest(name=name, **params), self.assertNumQueries(queries):
+                response = async_to_sync(client.get)(reverse(name), params)
+            self.assertEqual(response.status_code, 200)
+
+    def test_single_writes(self):
+        payload = {"title": "New", "description": "desc", "status": "IP", "priority": "HI", "due_date": "2026-02-01T09:00:00Z", "category": "Work"}
+        # session + user + category + insert + one UPDATE per summary table, in a savepoint
+        self.assertBudget(8, 0.25, "post", reverse("task-list"), payload)
+        # session + user + task + update + moving the task between groups of both summaries
+        self.assertBudget(10, 0.25, "patch", reverse("task-update", args=[self.task.id]), {"status": "CO"})
+        # a new category costs three queries, and its summary group an INSERT in a savepoint
+        self.assertBudget(14, 0.25, "patch", reverse("task-update", args=[self.task.id]), {"category": "Garden"})
+        # session + user + task + delete + tombstone + one UPDATE per summary table
+        self.assertBudget(7, 0.25, "delete", reverse("task-delete", args=[self.task.id]))
+
+    def test_bulk_writes_do_not_grow_with_the_batch(self):
+        for size in [5, 100]:
+            with self.subTest(size=size):
+                created = [
+                    {"title": f"Bulk {size} {i}", "description": "desc", "status": "IP", "priority": "HI", "due_date": "2026-02-01T09:00:00Z", "category": "Work"}
+                    for i in range(size)
+                ]
+                # Each one is a few statements for the batch, then one UPDATE per summary group
+                # the batch moves tasks in or out of.
+                # session + user + titles + category + savepoint + insert + 2 groups + release
+                response = self.assertBudget(9, 1, "post", reverse("task-bulk"), created)
+                # session + user + tasks + savepoint + update + 2 groups left + 2 joined + release
+                created_ids = [result["task"]["id"] for result in response.json()]
+                self.assertBudget(10, 1, "patch", reverse("task-bulk"), [{"id": task_id, "status": "CO"} for task_id in created_ids])
+
+    def test_bulk_delete(self):
+        for size in [5, 100]:
+            with self.subTest(size=size):
+                created = [
+                    {"title": f"Deleted {size} {i}", "description": "desc", "status": "IP", "priority": "HI", "due_date": "2026-02-01T09:00:00Z", "category": "Work"}
+                    for i in range(size)
+                ]
+                ids = [result["task"]["id"] for result in self.client.post(reverse("task-bulk"), created, content_type="application/json").json()]
+                # session + user + savepoint + tasks + tasks for the delete signals + delete
+                # + tombstones + 2 groups + release
+                self.assertBudget(10, 1, "delete", reverse("task-bulk"), {"ids": ids})
+                self.assertEqual(TaskTombstone.objects.filter(task_id__in=ids).count(), size)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,141 @@
+"""
+Per-user token-bucket throttling of the task API.
+
+Views opt in with `throttle_classes = [TokenBucketThrottle]`, which the board, the task list and
+the status columns do. Each user gets a bucket per throttle scope, the `throttle_scope` of a view. A bucket
+holds up to `N` tokens for a `TASKAPP_THROTTLE_RATES` rate of `'N/period'` and refills
+continuously at `N` tokens per period. A request takes one token, or is answered
+`429 Too Many Requests` with a `Retry-After` header giving the seconds until the next token.
+Rates are set so that the bursts of the page itself pass, while a client looping on an endpoint
+is held to the rate.
+
+A bucket is two numbers, the tokens left and when they were counted, and checking it reads and
+writes them once, so the check costs the same however many users there are. Buckets are kept by
+the store selected with `TASKAPP_THROTTLE_STORE`:
+
+* `LocalMemoryBucketStore` keeps them in a dictionary of the process, evicting the least
+  recently used beyond `TASKAPP_THROTTLE_MAX_ENTRIES`. Each process throttles on its own, so
+  `n` workers let a user through `n` times the rate.
+* `CacheBucketStore` keeps them in the Django cache `TASKAPP_THROTTLE_CACHE`, shared by every
+  process with Redis or Memcached. Its read and write are not atomic, so concurrent requests
+  of the same user may both spend the same token.
+
+Other stores subclass `BucketStore`. Anonymous requests and scopes without a rate are never
+throttled; the first are refused by the permission checks anyway.
+"""
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@lru_cache
+def parse_rate(rate):
+    """
+    Returns the capacity and the refill rate per second of a `'N/period'` rate.
+    """
+    tokens, period = rate.split('/')
+    return int(tokens), int(tokens) / PERIODS[period[0]]
+
+
+def refill(bucket, capacity, per_second, now):
+    """
+    Takes a token from `bucket`, a (tokens, counted at) pair or None for a full bucket.
+
+    Returns the new bucket and 0, or the bucket and the seconds until a token is available.
+    """
+    if bucket is None:
+        tokens = capacity
+    else:
+        tokens, counted_at = bucket
+        tokens = min(capacity, tokens + (now - counted_at) * per_second)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / per_second
+
+
+class BucketStore:
+    def take(self, key, capacity, per_second):
+        """
+        Takes a token from the bucket `key`, returning 0 or the seconds to wait for one.
+        """
+        raise NotImplementedError
+
+
+class LocalMemoryBucketStore(BucketStore):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.max_entries = getattr(settings, 'TASKAPP_THROTTLE_MAX_ENTRIES', 10000)
+
+    def take(self, key, capacity, per_second):
+        now = time.monotonic()
+        with self.lock:
+            # Popping and reinserting keeps the dictionary in least recently used order.
+            self.buckets[key], wait = refill(self.buckets.pop(key, None), capacity, per_second, now)
+            if len(self.buckets) > self.max_entries:
+                # A forgotten bucket is a full one, which only favours idle users.
+                del self.buckets[next(iter(self.buckets))]
+        return wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBucketStore(BucketStore):
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'TASKAPP_THROTTLE_CACHE', 'default')]
+
+    def take(self, key, capacity, per_second):
+        key = f'taskapp:throttle:{key}'
+        bucket, wait = refill(self.cache.get(key), capacity, per_second, time.time())
+        # Expires once it would have refilled, as a missing bucket is a full one.
+        self.cache.set(key, bucket, int(capacity / per_second) + 1)
+        return wait
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(getattr(settings, 'TASKAPP_THROTTLE_STORE', 'taskapp.throttling.LocalMemoryBucketStore'))()
+    return _store
+
+
+def throttle_wait(scope, user):
+    """
+    Takes a token from the bucket of `user` for `scope`, returning 0 or the seconds to wait.
+    """
+    rate = getattr(settings, 'TASKAPP_THROTTLE_RATES', {}).get(scope)
+    if rate is None or not user.is_authenticated:
+        return 0
+    return get_store().take(f'{scope}:{user.pk}', *parse_rate(rate))
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttles each user per `throttle_scope` of the view, as described in the module docstring.
+
+    Example:
+        class TaskListView(generics.ListCreateAPIView):
+            throttle_classes = [TokenBucketThrottle]
+            throttle_scope = 'task_list'
+    """
+    def allow_request(self, request, view):
+        self.wait_time = throttle_wait(getattr(view, 'throttle_scope', None), request.user)
+        return not self.wait_time
+
+    def wait(self):
+        return self.wait_time
@@ -1,5 +1,6 @@
 from django.urls import path
 from .views import *
+from .async_views import *
 
 urlpatterns = [
     path("tasks/", TaskListView.as_view(), name="task-list"),
@@ -9,4 +10,22 @@ urlpatterns = [
     path('tasks/in_progress/', InProgressTaskListView.as_view(), name='inprogress-tasks'),
     path('tasks/completed/', CompletedTaskListView.as_view(), name='completed-tasks'),
     path('tasks/overdue/', OverdueTaskListView.as_view(), name='overdue-tasks'),
+    path('tasks/board/', TaskBoardView.as_view(), name='task-board'),
+    path('tasks/search/', TaskSearchView.as_view(), name='task-search'),
+    path('tasks/bulk/', BulkTaskView.as_view(), name='task-bulk'),
+    path('tasks/export/<slug:export_format>/', TaskExportView.as_view(), name='task-export'),
+    path('tasks/changes/', TaskChangesView.as_view(), name='task-changes'),
+    path('tasks/events/', task_events, name='task-events'),
+    path('categories/', CategoryListView.as_view(), name='category-list'),
+    path('tasks/stats/', TaskStatsView.as_view(), name='task-stats'),
+    path('tasks/cache/stats/', TaskCacheStatsView.as_view(), name='task-cache-stats'),
+    path('metrics/', task_metrics, name='metrics'),
+    # Async variants of the views above, for the ASGI deployment.
+    path("async/tasks/", AsyncTaskListView.as_view(), name="async-task-list"),
+    path("async/tasks/<int:pk>/", AsyncTaskDetailView.as_view(), name="async-task-detail"),
+    path("async/tasks/<int:pk>/update/", AsyncUpdateTaskView.as_view(), name="async-task-update"),
+    path("async/tasks/<int:pk>/delete/", AsyncDeleteTaskView.as_view(), name="async-task-delete"),
+    path('async/tasks/in_progress/', AsyncInProgressTaskListView.as_view(), name='async-inprogress-tasks'),
+    path('async/tasks/completed/', AsyncCompletedTaskListView.as_view(), name='async-completed-tasks'),
+    path('async/tasks/overdue/', AsyncOverdueTaskListView.as_view(), name='async-overdue-tasks'),
 ]
@@ -1,15 +1,41 @@
+import base64
+import binascii
+from collections import Counter
+from datetime import datetime
+
 from django.shortcuts import render
 from django.contrib.auth import authenticate, login, logout
-from django.http import HttpResponseRedirect
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
 from django.urls import reverse
-from django.db import IntegrityError
-from .models import User, Task
-from .serializers import TaskSerializer
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+from .models import User, Category, Task, TaskTombstone
+from .filters import TaskFilterSet, TaskOrderingFilter
+from .serializers import TaskSerializer, serialize_tasks, set_categories
+from .pagination import KeysetPagination
+from .search import search_tasks
+from .summary import count_in, get_stats, task_values
+from .cache import get_board, stats as board_cache_stats
+from .signals import delete_tasks, tasks_bulk_changed
+from .events import stream_events
+from .export import EXPORT_FORMATS, aiter_chunks, iter_task_chunks
+from .throttling import TokenBucketThrottle
+from . import metrics
 from rest_framework import generics, serializers
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import OrderingFilter
+
+DUPLICATE_TITLE_MESSAGE = "You already have a task with this title."
 
 # Create your views here.
 def login_view(request):
@@ -100,11 +126,80 @@ def register(request):
             return render(request, "frontend/register.html", {
                 "message": "Username already taken."
             })
-        login(request, user)
+        login(request, user, backend="taskapp.auth.CachedModelBackend")
         return HttpResponseRedirect(reverse("index"))
     else:
         return render(request, "frontend/register.html")
 
+def save_task(serializer, **kwargs):
+    """
+        Saves a task serializer, reporting a duplicate title as a validation error.
+
+        The (title, assigned_to) unique constraint is what guards against duplicates, so the
+        write is attempted directly instead of checking for an existing title first, which
+        would cost an extra query and still race with concurrent requests.
+
+        Args:
+            serializer: A validated task serializer.
+            **kwargs: Extra attributes passed on to `serializer.save()`.
+
+        Returns:
+            The saved task.
+    """
+    try:
+        with transaction.atomic():
+            return serializer.save(**kwargs)
+    except IntegrityError:
+        task = serializer.instance
+        title = serializer.validated_data.get('title', task and task.title)
+        user = kwargs.get('assigned_to', task and task.assigned_to)
+        if not title_taken(user.pk, [title], exclude=[task.pk] if task else []):
+            raise
+        raise serializers.ValidationError(DUPLICATE_TITLE_MESSAGE)
+
+def title_taken(user_id, titles, exclude=()):
+    """
+        Returns whether another task of the user has one of `titles`.
+
+        Called after a write failed with an IntegrityError, to tell the (title, assigned_to)
+        unique constraint from the other constraints.
+    """
+    return Task.objects.filter(assigned_to_id=user_id, title__in=titles).exclude(id__in=exclude).exists()
+
+def get_task_validators(request):
+    """
+        Returns the number of tasks of the user and when the last of them changed or was deleted.
+
+        Computed with one query over the (assigned_to, updated_at) and (assigned_to, deleted_at)
+        indexes and kept on the request, since the ETag and Last-Modified functions both need it.
+    """
+    if not hasattr(request, '_task_validators'):
+        tasks = Task.objects.filter(assigned_to=OuterRef('pk'))
+        tombstones = TaskTombstone.objects.filter(assigned_to=OuterRef('pk'))
+        request._task_validators = User.objects.filter(pk=request.user.pk).values(
+            count=Subquery(tasks.values('assigned_to').annotate(count=Count('id')).values('count')),
+            last_updated=Subquery(tasks.order_by('-updated_at').values('updated_at')[:1]),
+            last_deleted=Subquery(tombstones.order_by('-deleted_at').values('deleted_at')[:1]),
+        ).get()
+    return request._task_validators
+
+def task_list_etag(request, *args, **kwargs):
+    validators = get_task_validators(request)
+    last_modified = task_list_last_modified(request)
+    return f'"{request.user.pk}-{validators["count"] or 0}-{last_modified.timestamp() if last_modified else 0}"'
+
+def task_list_last_modified(request, *args, **kwargs):
+    validators = get_task_validators(request)
+    timestamps = [value for value in (validators['last_updated'], validators['last_deleted']) if value]
+    return max(timestamps, default=None)
+
+# Answers If-None-Match/If-Modified-Since with 304 before the list is queried or serialized,
+# and makes browsers revalidate instead of reusing a response heuristically.
+conditional_task_list = method_decorator([
+    cache_control(private=True, no_cache=True),
+    condition(etag_func=task_list_etag, last_modified_func=task_list_last_modified),
+], name='get')
+
 class TaskDetailView(generics.RetrieveAPIView):
     """
         Retrieves a single task.
@@ -118,10 +213,14 @@ class TaskDetailView(generics.RetrieveAPIView):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    replica_reads = True
+@conditional_task_list
 class TaskListView(generics.ListCreateAPIView):
     """
         Lists all tasks or creates a new task.
 
+        Pass `page_size` (and then the returned `next` link) to page through the list.
+
         Args:
             request: The HTTP request object.
 
@@ -131,24 +230,28 @@ class TaskListView(generics.ListCreateAPIView):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
     queryset = Task.objects.all()
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
-    filterset_fields = ['priority', 'due_date', 'category']
+    filter_backends = [DjangoFilterBackend, TaskOrderingFilter]
+    pagination_class = KeysetPagination
+    filterset_class = TaskFilterSet
     ordering_fields = ['priority', 'due_date', 'category']
+    replica_reads = True
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'task_list'
 
     def get_queryset(self):
         user = self.request.user
         return Task.objects.filter(assigned_to=user)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(serialize_tasks(queryset))
     
     def perform_create(self, serializer):
         user = self.request.user
-        title = serializer.validated_data.get('title')
-        if Task.objects.filter(title=title, assigned_to=user).exists():
-            raise serializers.ValidationError("You already have a task with this title.")
-        
-        if serializer.is_valid():
-            return serializer.save(assigned_to=user)
-        else:
-            return serializer.errors()
+        return save_task(serializer, assigned_to=user)
 
 class DeleteTaskView(generics.DestroyAPIView):
     """
@@ -185,101 +288,514 @@ class UpdateTaskView(generics.RetrieveUpdateAPIView):
 
     def perform_update(self, serializer):
         user = self.request.user
-        title = serializer.validated_data.get('title')
-        instance_id = self.get_object().id
+        save_task(serializer, assigned_to=user)
 
-        if Task.objects.filter(title=title, assigned_to=user).exclude(id=instance_id).exists():
-            raise serializers.ValidationError("You already have a task with this title.")
-        
-        serializer.save(assigned_to=user)
+@conditional_task_list
+class StatusTaskListView(generics.ListAPIView):
+    """
+        Base view for a single status column of the board.
+
+        Lists the user's tasks with the given status along with how many there are.
+        The count is taken from the rows already fetched, so each request runs a single query,
+        and the unfiltered column comes from the per-user board cache.
+        When a page is requested with `page_size`/`cursor` the count still covers every
+        matching task and the link to the following page is returned under 'next'.
+
+        Args:
+            request: The HTTP request object.
 
-class InProgressTaskListView(generics.ListAPIView):
+        Returns:
+            The serialized tasks under 'tasks' and their number under `count_key`.
+    """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
-    filterset_fields = ['priority', 'due_date', 'category']
+    filter_backends = [DjangoFilterBackend, TaskOrderingFilter]
+    pagination_class = KeysetPagination
+    filterset_class = TaskFilterSet
     ordering_fields = ['priority', 'due_date', 'category']
+    replica_reads = True
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'task_column'
+    status = None
+    count_key = None
 
     def get_queryset(self):
         user = self.request.user
-        tasks = Task.objects.filter(assigned_to=user, status='IP')
-        return tasks
-    
+        return Task.objects.filter(assigned_to=user, status=self.status)
+
     def list(self, request, *args, **kwargs):
-        
-        queryset = self.get_queryset()
-        # serializer = self.get_serializer(queryset, many=True)
-        user = request.user
-        inprogress_count = Task.objects.filter(assigned_to=user, status='IP').count()
-        filtered_queryset = self.filter_queryset(queryset)
-        # print(filtered_queryset.query)  # Print the SQL query for debugging
+        if not request.query_params:
+            # The unfiltered column is served from the cached board.
+            tasks = get_board(request.user)[self.status]
+            return Response({'tasks': tasks, self.count_key: len(tasks)})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            tasks = self.get_serializer(page, many=True).data
+            return Response({
+                'tasks': tasks,
+                self.count_key: queryset.count(),
+                'next': self.paginator.get_next_link()
+            })
 
-        serializer = self.get_serializer(filtered_queryset, many=True)
-        
-        inprogress_count = filtered_queryset.count()
+        tasks = serialize_tasks(queryset)
 
         # Create a response structure that includes both tasks and the count
         response_data = {
-            'tasks': serializer.data,
-            'inprogress_count': inprogress_count
+            'tasks': tasks,
+            self.count_key: len(tasks)
         }
         return Response(response_data)
 
-class CompletedTaskListView(generics.ListAPIView):
+class InProgressTaskListView(StatusTaskListView):
+    status = 'IP'
+    count_key = 'inprogress_count'
+
+class CompletedTaskListView(StatusTaskListView):
+    status = 'CO'
+    count_key = 'completed_count'
+
+class OverdueTaskListView(StatusTaskListView):
+    status = 'OV'
+    count_key = 'overdue_count'
+
+@conditional_task_list
+class TaskBoardView(generics.ListAPIView):
+    """
+        Lists every status column of the board in one response.
+
+        Fetches all of the user's tasks with a single query, honouring the same filter and
+        ordering parameters as the status views, and groups them by status. Without any
+        parameters the board is served from the per-user cache in `taskapp.cache`.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            The serialized tasks of each column and the column counts.
+
+        Example:
+            curl -X GET "http://localhost:8000/tasks/board/?priority=HI&ordering=due_date"
+    """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
-    filterset_fields = ['priority', 'due_date', 'category']
+    filter_backends = [DjangoFilterBackend, TaskOrderingFilter]
+    filterset_class = TaskFilterSet
     ordering_fields = ['priority', 'due_date', 'category']
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'task_board'
+    columns = [
+        (InProgressTaskListView.status, 'in_progress', InProgressTaskListView.count_key),
+        (CompletedTaskListView.status, 'completed', CompletedTaskListView.count_key),
+        (OverdueTaskListView.status, 'overdue', OverdueTaskListView.count_key),
+    ]
 
     def get_queryset(self):
         user = self.request.user
-        return Task.objects.filter(assigned_to=user, status='CO')
-    
+        return Task.objects.filter(assigned_to=user)
+
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        user = request.user
-        completed_count = Task.objects.filter(assigned_to=user, status='CO').count()
-        filtered_queryset = self.filter_queryset(queryset)  # Print the SQL query for debugging
+        if not request.query_params:
+            grouped = get_board(request.user)
+        else:
+            queryset = self.filter_queryset(self.get_queryset())
+            grouped = {status: [] for status, _, _ in self.columns}
+            for task in serialize_tasks(queryset):
+                grouped[task['status']].append(task)
+
+        response_data = {}
+        for status, key, count_key in self.columns:
+            response_data[key] = grouped[status]
+            response_data[count_key] = len(grouped[status])
+        return Response(response_data)
 
-        serializer = self.get_serializer(filtered_queryset, many=True)
-        
-        completed_count = filtered_queryset.count()
+class TaskExportView(generics.GenericAPIView):
+    """
+        Streams all of the user's tasks as NDJSON, CSV or a JSON array.
 
-        # Create a response structure that includes both tasks and the count
-        response_data = {
-            'tasks': serializer.data,
-            'completed_count': completed_count
-        }
-        return Response(response_data)
+        Rows are fetched with a server side iterator and written out a chunk at a time, so the
+        memory used does not grow with the number of tasks. Under ASGI each chunk is fetched
+        through `sync_to_async`, so the response streams instead of being buffered. Accepts the same filter and ordering
+        parameters as the task list.
+
+        Args:
+            export_format: 'ndjson', 'csv' or 'json'.
+
+        Returns:
+            A streaming download of the serialized tasks.
 
-class OverdueTaskListView(generics.ListAPIView):
+        Example:
+            curl -X GET "http://localhost:8000/tasks/export/ndjson/?priority=HI" -o tasks.ndjson
+    """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
-    filterset_fields = ['priority', 'due_date', 'category']
+    filter_backends = [DjangoFilterBackend, TaskOrderingFilter]
+    filterset_class = TaskFilterSet
     ordering_fields = ['priority', 'due_date', 'category']
+    ordering = ['id']
+    chunk_size = 2000
+
+    def get_queryset(self):
+        user = self.request.user
+        return Task.objects.filter(assigned_to=user)
+
+    def get(self, request, export_format):
+        if export_format not in EXPORT_FORMATS:
+            raise NotFound(f"Unknown export format '{export_format}'.")
+        writer, content_type, extension = EXPORT_FORMATS[export_format]
+        queryset = self.filter_queryset(self.get_queryset())
+        content = writer(iter_task_chunks(queryset, self.chunk_size))
+        if isinstance(request._request, ASGIRequest):
+            content = aiter_chunks(content)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="tasks.{extension}"'
+        return response
+
+class TaskSearchView(generics.ListAPIView):
+    """
+        Searches the user's tasks by title, description and category.
+
+        Uses the full text index from `taskapp.search`, so the cost depends on the number of
+        matches rather than on how many tasks the user has.
+
+        Args:
+            q: The words to look for. Each word is matched as a prefix.
+            limit: The maximum number of results (default 20, at most 100).
+
+        Returns:
+            A list of serialized task objects, best match first.
+
+        Example:
+            curl -X GET "http://localhost:8000/tasks/search/?q=quarterly%20rep"
+    """
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    default_limit = 20
+    max_limit = 100
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            return self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def list(self, request, *args, **kwargs):
+        tasks = search_tasks(request.user, request.query_params.get('q', ''), self.get_limit())
+        serializer = self.get_serializer(tasks, many=True)
+        return Response(serializer.data)
+
+class CategoryListView(generics.ListAPIView):
+    """
+        Lists the names of the user's categories in use, for the category filter and for
+        autocompleting the category of a task.
+
+        Categories are matched on their normalized name through the (user, key) index, so the
+        cost depends on the number of matches rather than on how many tasks the user has.
+
+        Args:
+            prefix: Only return the categories starting with this text, ignoring case.
+            limit: The maximum number of results (default 20, at most 100).
+
+        Returns:
+            A list of category names in alphabetical order.
+
+        Example:
+            curl -X GET "http://localhost:8000/categories/?prefix=wo"
+    """
+    permission_classes = [IsAuthenticated]
+    default_limit = 20
+    max_limit = 100
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            return self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def get_queryset(self):
+        categories = Category.objects.with_prefix(self.request.user, self.request.query_params.get('prefix', ''))
+        # Categories are kept when their last task goes, but only the ones in use are listed.
+        return categories.filter(Exists(Task.objects.filter(category=OuterRef('pk'))))
+
+    def list(self, request, *args, **kwargs):
+        return Response(list(self.get_queryset().values_list('name', flat=True)[:self.get_limit()]))
+
+class BulkTaskView(generics.GenericAPIView):
+    """
+        Creates, updates or deletes many tasks in one request.
+
+        Every operation runs in a single transaction with one statement for the writes, and
+        duplicate titles are detected for the whole batch with one query. The response has
+        one result per item, in the order they were sent, so a bad item does not stop the
+        others from being applied.
+
+        POST takes a list of tasks, PATCH a list of partial tasks that each include their `id`,
+        and DELETE an object with the list of `ids` to delete.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            A list of per-item results with a 'status' of 'created', 'updated', 'deleted',
+            'not_found' or 'error'.
+
+        Example:
+            curl -X PATCH -H "Content-Type: application/json" -d '[{"id": 1, "status": "CO"}, {"id": 2, "status": "CO"}]' http://localhost:8000/tasks/bulk/
+    """
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    max_batch_size = 500
 
     def get_queryset(self):
         user = self.request.user
-        return Task.objects.filter(assigned_to=user, status='OV')
+        return Task.objects.filter(assigned_to=user)
+
+    def get_items(self, items):
+        if not isinstance(items, list):
+            raise serializers.ValidationError("Expected a list.")
+        if len(items) > self.max_batch_size:
+            raise serializers.ValidationError(f"At most {self.max_batch_size} items can be sent at once.")
+        return items
+
+    def duplicate_title_error(self):
+        return {'status': 'error', 'errors': {'title': [DUPLICATE_TITLE_MESSAGE]}}
+
+    def post(self, request, *args, **kwargs):
+        user = request.user
+        items = self.get_items(request.data)
+        results = [None] * len(items)
+
+        valid = []
+        for index, item in enumerate(items):
+            serializer = self.get_serializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = {'status': 'error', 'errors': serializer.errors}
+
+        taken = set(self.get_queryset().filter(title__in=[data['title'] for _, data in valid]).values_list('title', flat=True))
+        new_data = []
+        for index, data in valid:
+            if data['title'] in taken:
+                results[index] = self.duplicate_title_error()
+                continue
+            taken.add(data['title'])
+            new_data.append((index, data))
+
+        try:
+            with transaction.atomic():
+                set_categories(user.pk, [data for _, data in new_data])
+                new_tasks = [(index, Task(assigned_to=user, **data)) for index, data in new_data]
+                Task.objects.bulk_create([task for _, task in new_tasks])
+                if new_tasks:
+                    summary_deltas = Counter()
+                    for _, task in new_tasks:
+                        count_in(summary_deltas, task_values(task), 1)
+                    tasks_bulk_changed.send(sender=Task, user_ids=[user.pk], summary_deltas=summary_deltas)
+        except IntegrityError:
+            if not title_taken(user.pk, [data['title'] for _, data in new_data]):
+                raise
+            # Another request took one of the titles after we checked them.
+            raise serializers.ValidationError(DUPLICATE_TITLE_MESSAGE)
+        for index, task in new_tasks:
+            results[index] = {'status': 'created', 'task': self.get_serializer(task).data}
+        return Response(results)
+
+    def patch(self, request, *args, **kwargs):
+        items = self.get_items(request.data)
+        results = [None] * len(items)
+        ids = [item.get('id') for item in items if isinstance(item, dict) and isinstance(item.get('id'), int)]
+        tasks = self.get_queryset().in_bulk(ids)
+
+        pending = []
+        for index, item in enumerate(items):
+            task = tasks.get(item.get('id')) if isinstance(item, dict) else None
+            if task is None:
+                results[index] = {'status': 'not_found'}
+                continue
+            serializer = self.get_serializer(task, data=item, partial=True)
+            if serializer.is_valid():
+                pending.append((index, task, serializer.validated_data))
+            else:
+                results[index] = {'status': 'error', 'errors': serializer.errors}
+
+        # The unique constraint is checked row by row while the UPDATE runs, so a new title must
+        # not be held by any task at that point, including the tasks of this batch.
+        new_titles = {data['title'] for _, task, data in pending if data.get('title', task.title) != task.title}
+        taken = set(self.get_queryset().filter(title__in=new_titles).values_list('title', flat=True))
+
+        fields = set()
+        updated = []
+        for index, task, data in pending:
+            title = data.get('title', task.title)
+            if title != task.title:
+                if title in taken:
+                    results[index] = self.duplicate_title_error()
+                    continue
+                taken.add(title)
+            fields.update(data)
+            updated.append((index, task, data))
+
+        if fields:
+            fields.add('updated_at')
+            try:
+                with transaction.atomic():
+                    # Inside the transaction, so a rejected batch creates no categories.
+                    set_categories(request.user.pk, [data for _, _, data in updated])
+                    summary_deltas = Counter()
+                    for _, task, data in updated:
+                        count_in(summary_deltas, task_values(task), -1)
+                        for field, value in data.items():
+                            setattr(task, field, value)
+                        count_in(summary_deltas, task_values(task), 1)
+                        # bulk_update() does not apply auto_now.
+                        task.updated_at = timezone.now()
+                    Task.objects.bulk_update([task for _, task, _ in updated], sorted(fields))
+                    tasks_bulk_changed.send(sender=Task, user_ids=[request.user.pk], summary_deltas=summary_deltas)
+            except IntegrityError:
+                if not title_taken(request.user.pk, new_titles, exclude=[task.pk for _, task, _ in updated]):
+                    raise
+                # Another request took one of the titles after we checked them.
+                raise serializers.ValidationError(DUPLICATE_TITLE_MESSAGE)
+        for index, task, _ in updated:
+            results[index] = {'status': 'updated', 'task': self.get_serializer(task).data}
+        return Response(results)
+
+    def delete(self, request, *args, **kwargs):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        ids = self.get_items(ids)
+        existing = set(delete_tasks(self.get_queryset().filter(id__in=[task_id for task_id in ids if isinstance(task_id, int)])))
+        results = [{'id': task_id, 'status': 'deleted' if task_id in existing else 'not_found'} for task_id in ids]
+        return Response(results)
+
+class TaskStatsView(APIView):
+    """
+        Returns the dashboard statistics of the user.
+
+        Read from the summary tables maintained by `taskapp.summary`, so the cost does not
+        depend on how many tasks the user has.
+
+        Returns:
+            The total and per status counts, the counts by status, priority and category, the
+            number of in-progress tasks due in the next 7 days, and the number of overdue tasks
+            by due week over the last 8 weeks.
+
+        Example:
+            curl -X GET "http://localhost:8000/tasks/stats/"
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_stats(request.user))
+
+class TaskCacheStatsView(APIView):
+    """
+        Reports the board cache hit/miss counters of the serving process.
+
+        Returns:
+            The number of hits, misses and invalidations and the hit ratio.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(board_cache_stats.snapshot())
+
+class TaskChangesView(generics.ListAPIView):
+    """
+        Lists the tasks changed and deleted since a sync token.
+
+        Without `since`, or with a token older than the tombstone retention, every task is
+        returned with 'reset' set, and the client should replace what it holds. Otherwise only
+        the tasks created or modified since the token and the ids of the deleted ones are
+        returned, so a refresh costs as much as the changes rather than the whole list.
+        Tokens overlap slightly so the same task may come back twice.
+
+        Args:
+            since: The token returned by the previous call.
+
+        Returns:
+            The changed tasks, the deleted task ids and the token for the next call.
+
+        Example:
+            curl -X GET "http://localhost:8000/tasks/changes/?since=MjAyNi0xMC0xOFQxNTo0MDowMCswMDowMA"
+    """
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+
+    def encode_token(self, timestamp):
+        return base64.urlsafe_b64encode(timestamp.isoformat().encode()).decode().rstrip('=')
+
+    def decode_token(self, token):
+        try:
+            timestamp = datetime.fromisoformat(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode())
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise serializers.ValidationError({'since': "Invalid sync token."})
+        if timezone.is_naive(timestamp):
+            raise serializers.ValidationError({'since': "Invalid sync token."})
+        return timestamp
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
         user = request.user
-        overdue_count = Task.objects.filter(assigned_to=user, status='OV').count()
-        filtered_queryset = self.filter_queryset(queryset)
+        now = timezone.now()
+        token = request.query_params.get('since')
+        since = self.decode_token(token) if token else None
+        reset = since is None or since < now - settings.TASKAPP_TOMBSTONE_RETENTION
+
+        tasks = Task.objects.filter(assigned_to=user)
+        deleted = []
+        if not reset:
+            tasks = tasks.filter(updated_at__gte=since)
+            deleted = list(TaskTombstone.objects.filter(assigned_to=user, deleted_at__gte=since).values_list('task_id', flat=True))
+
+        return Response({
+            'reset': reset,
+            'tasks': self.get_serializer(tasks, many=True).data,
+            'deleted': deleted,
+            'token': self.encode_token(now - settings.TASKAPP_SYNC_OVERLAP),
+        })
+
+@require_GET
+async def task_events(request):
+    """
+        Streams the changes to the tasks of the logged in user as Server-Sent Events.
 
-        serializer = self.get_serializer(filtered_queryset, many=True)
-        
-        overdue_count = filtered_queryset.count()
+        'saved' events carry the serialized task, 'deleted' events its id and 'reset' events ask
+        the client to reload the board (after bulk changes, or when it fell behind). The view is
+        async so an ASGI server can hold thousands of idle streams on one event loop. Under WSGI
+        it answers 204, which tells EventSource not to reconnect, since each stream would hold
+        a worker thread.
 
-        # Create a response structure that includes both tasks and the count
-        response_data = {
-            'tasks': serializer.data,
-            'overdue_count': overdue_count
-        }
-        return Response(response_data)
-    
+        Example:
+            curl -N -H "Cookie: sessionid=..." "http://localhost:8000/tasks/events/"
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'detail': "Authentication credentials were not provided."}, status=403)
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    return StreamingHttpResponse(
+        stream_events(user.pk),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+@require_GET
+def task_metrics(request):
+    """
+        Exposes the request histograms of the serving process in the Prometheus text format.
+
+        Only served when `TASKAPP_METRICS` is enabled, to staff users or to scrapers sending
+        `TASKAPP_METRICS_TOKEN` as a bearer token.
+
+        Example:
+            curl -H "Authorization: Bearer $TASKAPP_METRICS_TOKEN" "http://localhost:8000/metrics/"
+    """
+    if not getattr(settings, 'TASKAPP_METRICS', False):
+        return HttpResponse(status=404)
+    token = getattr(settings, 'TASKAPP_METRICS_TOKEN', None)
+    if not (request.user.is_staff or token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')):
+        return JsonResponse({'detail': "You do not have permission to perform this action."}, status=403)
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4')